@@ -0,0 +1,307 @@
+import http.client
+import queue
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Idle time a bucket may bank, as seconds of its rate
+BURST_SECONDS = 0.25
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket measured in bytes
+
+    A rate of None means unlimited; consume() then returns immediately.
+    The bucket starts empty and banks at most burst bytes while idle, so
+    a transfer never runs ahead of the rate by more than that - bytes are
+    usually charged after they arrived, and a full initial bucket would
+    let every download's first second through unthrottled.
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.burst = burst or (rate or 0) * BURST_SECONDS
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def consume(self, amount):
+        """
+        Take amount tokens, sleeping until enough have accumulated
+
+        Requests larger than the burst size are allowed to drive the bucket
+        negative, so a big chunk is paid for by waiting afterwards.
+
+        Args:
+            amount (int): Number of bytes about to be (or just) transferred
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        if not self.rate or amount <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+class JobThrottle:
+    """Per-job handle of a BandwidthScheduler"""
+
+    def __init__(self, scheduler, name, rate=None):
+        self.scheduler = scheduler
+        self.name = name
+        self.bucket = TokenBucket(rate)
+        self.bytes = 0
+        self.waited = 0.0
+        self.started = time.monotonic()
+
+    def consume(self, amount):
+        """
+        Account for amount bytes against the job cap and the global cap
+
+        Args:
+            amount (int): Number of bytes transferred
+        """
+        waited = self.bucket.consume(amount)
+        waited += self.scheduler.bucket.consume(amount)
+        with self.scheduler._lock:
+            self.bytes += amount
+            self.waited += waited
+            self.scheduler.bytes += amount
+
+    def throughput(self):
+        """Return the average bytes/sec of this job so far"""
+        elapsed = time.monotonic() - self.started
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+
+class BandwidthScheduler:
+    """
+    Shares a global bandwidth cap between downloads running in one process
+
+    Every job gets its own token bucket (the per-job cap) and also draws
+    from the scheduler-wide bucket (the global cap).
+    """
+
+    def __init__(self, global_rate=None, job_rate=None):
+        self.bucket = TokenBucket(global_rate)
+        self.job_rate = job_rate
+        self.jobs = {}
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def job(self, name, rate=None):
+        """
+        Return the throttle for a job, creating it on first use
+
+        Args:
+            name (str): Job name, e.g. the playlist URL
+            rate (int): Per-job cap in bytes/sec (defaults to the scheduler's job_rate)
+
+        Returns:
+            JobThrottle: Handle passed to hooks and fetchers
+        """
+        with self._lock:
+            if name not in self.jobs:
+                self.jobs[name] = JobThrottle(self, name, rate or self.job_rate)
+            return self.jobs[name]
+
+    def stats(self):
+        """
+        Return aggregate and per-job throughput
+
+        Returns:
+            dict: Total bytes, bytes/sec and per-job details
+        """
+        elapsed = time.monotonic() - self.started
+        return {
+            'bytes': self.bytes,
+            'bytes_per_sec': self.bytes / elapsed if elapsed > 0 else 0.0,
+            'jobs': {
+                name: {'bytes': job.bytes, 'bytes_per_sec': job.throughput(), 'waited': job.waited}
+                for name, job in self.jobs.items()
+            },
+        }
+
+
+def throttle_hook(job):
+    """
+    Build a yt-dlp progress hook that charges downloaded bytes to job
+
+    The hook runs on the download thread, so blocking in it slows the
+    transfer down to the allowed rate.
+
+    Args:
+        job (JobThrottle): Throttle to charge
+
+    Returns:
+        callable: Progress hook for the 'progress_hooks' option
+    """
+    seen = {}
+    lock = threading.Lock()
+
+    def hook(d):
+        if d.get('status') not in ('downloading', 'finished'):
+            return
+        downloaded = d.get('downloaded_bytes') or 0
+        with lock:
+            delta = downloaded - seen.get(d.get('filename'), 0)
+            seen[d.get('filename')] = downloaded
+            if d['status'] == 'finished':
+                seen.pop(d.get('filename'), None)
+        if delta > 0:
+            job.consume(delta)
+
+    return hook
+
+
+def add_throttle(ydl_opts, job):
+    """
+    Return a copy of ydl_opts with a throttle hook for job appended
+
+    Args:
+        ydl_opts (dict): yt-dlp options
+        job (JobThrottle): Throttle to charge, or None to leave the options unchanged
+
+    Returns:
+        dict: yt-dlp options
+    """
+    if job is None:
+        return ydl_opts
+    return dict(ydl_opts, progress_hooks=list(ydl_opts.get('progress_hooks', [])) + [throttle_hook(job)])
+
+
+class ConnectionPool:
+    """
+    Keep-alive HTTP connections pooled per (scheme, host, port)
+
+    Connections are returned to the pool once a response body has been
+    fully read, so consecutive requests to the same host skip the TCP/TLS
+    handshake.
+    """
+
+    def __init__(self, max_per_host=4, timeout=30):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def _key(self, url):
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        return parts.scheme, parts.hostname, port
+
+    def _acquire(self, key):
+        with self._lock:
+            idle = self._idle.setdefault(key, queue.LifoQueue())
+        try:
+            conn = idle.get_nowait()
+            with self._lock:
+                self.reused += 1
+            return conn
+        except queue.Empty:
+            pass
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+        with self._lock:
+            self.created += 1
+        return cls(host, port, timeout=self.timeout)
+
+    def _release(self, key, conn):
+        idle = self._idle[key]
+        if idle.qsize() < self.max_per_host:
+            idle.put(conn)
+        else:
+            conn.close()
+
+    def request(self, method, url, headers=None):
+        """
+        Send a request and return (status, headers, body iterator)
+
+        The body must be consumed to completion for the connection to be
+        reused.
+
+        Args:
+            method (str): HTTP method
+            url (str): Absolute http(s) URL
+            headers (dict): Extra request headers
+
+        Returns:
+            tuple: (status code, response headers, iterator of body chunks)
+        """
+        key = self._key(url)
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        conn = self._acquire(key)
+        try:
+            conn.request(method, path, headers=headers or {})
+            response = conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # Stale keep-alive connection; retry once on a fresh one
+            conn.close()
+            conn = self._acquire(key)
+            conn.request(method, path, headers=headers or {})
+            response = conn.getresponse()
+
+        def body(chunk_size=64 * 1024):
+            try:
+                while True:
+                    chunk = response.read(chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(key, conn)
+
+        return response.status, dict(response.getheaders()), body
+
+    def fetch(self, url, sink, job=None, headers=None, chunk_size=64 * 1024):
+        """
+        Stream url into sink, charging every chunk to job
+
+        Args:
+            url (str): Absolute http(s) URL
+            sink (callable): Called with each chunk of the body
+            job (JobThrottle): Throttle to charge, or None for unlimited
+            headers (dict): Extra request headers
+            chunk_size (int): Bytes read per chunk
+
+        Returns:
+            tuple: (status code, bytes received)
+        """
+        status, _, body = self.request('GET', url, headers)
+        received = 0
+        for chunk in body(chunk_size):
+            if job is not None:
+                job.consume(len(chunk))
+            sink(chunk)
+            received += len(chunk)
+        return status, received
+
+    def close(self):
+        with self._lock:
+            for idle in self._idle.values():
+                while not idle.empty():
+                    idle.get_nowait().close()
+            self._idle.clear()
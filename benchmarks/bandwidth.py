@@ -0,0 +1,81 @@
+"""
+Aggregate throughput under the bandwidth scheduler, pooled vs fresh connections
+
+Usage: python -m benchmarks.bandwidth [--jobs 3] [--fragments 40] [--global-rate 8e6] [--job-rate 4e6]
+"""
+import argparse
+import threading
+import time
+
+from bandwidth import BandwidthScheduler, ConnectionPool
+from benchmarks.stubs import FragmentServer
+
+
+def run(jobs=3, fragments=40, fragment_size=256 * 1024, global_rate=None, job_rate=None, pooled=True):
+    """
+    Download fragments for several concurrent jobs from a local server
+
+    Args:
+        jobs (int): Number of concurrent jobs, one thread each
+        fragments (int): Fragments fetched per job
+        fragment_size (int): Size of each fragment in bytes
+        global_rate (float): Global cap in bytes/sec, None for unlimited
+        job_rate (float): Per-job cap in bytes/sec, None for unlimited
+        pooled (bool): Share one ConnectionPool instead of a fresh connection per fragment
+
+    Returns:
+        dict: Throughput and connection counts
+    """
+    scheduler = BandwidthScheduler(global_rate, job_rate)
+    shared = ConnectionPool(max_per_host=jobs)
+
+    with FragmentServer(fragment_size) as server:
+        def worker(name):
+            job = scheduler.job(name)
+            for index in range(fragments):
+                pool = shared if pooled else ConnectionPool()
+                pool.fetch(f'{server.url}/{name}/frag{index}', lambda chunk: None, job)
+                if not pooled:
+                    pool.close()
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(f'job{n}',)) for n in range(jobs)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        shared.close()
+        connections = server.connections
+
+    stats = scheduler.stats()
+    return {
+        'elapsed': elapsed,
+        'mb_per_sec': stats['bytes'] / elapsed / 1e6,
+        'job_mb_per_sec': {name: job['bytes'] / elapsed / 1e6 for name, job in stats['jobs'].items()},
+        'connections': connections,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=3)
+    parser.add_argument('--fragments', type=int, default=40)
+    parser.add_argument('--global-rate', type=float, default=8e6)
+    parser.add_argument('--job-rate', type=float, default=4e6)
+    args = parser.parse_args()
+
+    scenarios = [
+        ('unlimited, fresh connections', dict(pooled=False)),
+        ('unlimited, pooled', dict(pooled=True)),
+        ('capped, pooled', dict(pooled=True, global_rate=args.global_rate, job_rate=args.job_rate)),
+    ]
+    for label, options in scenarios:
+        r = run(args.jobs, args.fragments, **options)
+        per_job = ', '.join(f'{v:.1f}' for v in r['job_mb_per_sec'].values())
+        print(f"{label:<30} {r['mb_per_sec']:>8.1f} MB/s  per job [{per_job}]  "
+              f"{r['connections']} connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Answer-sheet grading: per-question shuffle-and-compare loop vs grading.py
+
+Usage: python -m benchmarks.grading [--sheets 1000000] [--questions 10]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from grading import answer_key, correct_by_id, grade_sheets, grade_submissions, leaderboard
+
+
+def make_questions(count, rng):
+    """Build raw API-style questions plus their pre-encoded counterparts"""
+    raw, encoded = [], []
+    for i in range(count):
+        correct_answer = f"answer {i}"
+        incorrect = [f"wrong {i}.{j}" for j in range(3)]
+        raw.append({'question': f"Question {i}?", 'correct_answer': correct_answer,
+                    'incorrect_answers': incorrect})
+        options = incorrect + [correct_answer]
+        rng.shuffle(options)
+        encoded.append({'question': f"Question {i}?", 'options': options,
+                        'correct': options.index(correct_answer)})
+    return raw, encoded
+
+
+def grade_loop(raw, answers, rng):
+    """Grade the way the original run_quiz did: shuffle, then compare strings"""
+    scores = []
+    for sheet in answers:
+        score = 0
+        for q, answer in zip(raw, sheet):
+            options = q['incorrect_answers'] + [q['correct_answer']]
+            rng.shuffle(options)
+            if options[answer] == q['correct_answer']:
+                score += 1
+        scores.append(score)
+    return scores
+
+
+def run(sheets=1000000, questions=10, players=10000, loop_sheets=100000):
+    """
+    Grade many answer sheets with both approaches and recompute a leaderboard
+
+    Args:
+        sheets (int): Answer sheets graded by grade_sheets
+        questions (int): Questions per sheet
+        players (int): Distinct players owning the sheets
+        loop_sheets (int): Sheets graded by the Python loop (scaled up in the report)
+
+    Returns:
+        dict: Sheets/sec per approach and the leaderboard recompute time
+    """
+    rng = random.Random(0)
+    raw, encoded = make_questions(questions, rng)
+    answers = np.random.default_rng(0).integers(0, 4, size=(sheets, questions), dtype=np.int8)
+    results = {}
+
+    start = time.perf_counter()
+    grade_loop(raw, answers[:loop_sheets].tolist(), rng)
+    elapsed = time.perf_counter() - start
+    results['per-question loop'] = {'sheets_per_sec': loop_sheets / elapsed}
+
+    start = time.perf_counter()
+    scores = grade_sheets(answer_key(encoded), answers)
+    elapsed = time.perf_counter() - start
+    results['grade_sheets'] = {'sheets_per_sec': sheets / elapsed}
+
+    # The same submissions stored as one row per answered question
+    lookup = correct_by_id(enumerate(q['correct'] for q in encoded))
+    sheet_ids = np.repeat(np.arange(sheets), questions)
+    question_ids = np.tile(np.arange(questions), sheets)
+    start = time.perf_counter()
+    stored = grade_submissions(sheet_ids, question_ids, answers.ravel(), lookup, sheets)
+    player_ids = np.arange(sheets) % players
+    leaders = leaderboard(player_ids, stored)
+    elapsed = time.perf_counter() - start
+    results['grade_submissions'] = {'sheets_per_sec': sheets / elapsed, 'leader': leaders[0]}
+    assert np.array_equal(stored, scores)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sheets', type=int, default=1000000)
+    parser.add_argument('--questions', type=int, default=10)
+    parser.add_argument('--players', type=int, default=10000)
+    parser.add_argument('--loop-sheets', type=int, default=100000)
+    args = parser.parse_args()
+
+    results = run(args.sheets, args.questions, args.players, min(args.loop_sheets, args.sheets))
+    baseline = results['per-question loop']['sheets_per_sec']
+    print(f"{'approach':<20} {'sheets/s':>14} {'speed-up':>9}")
+    for name, r in results.items():
+        print(f"{name:<20} {r['sheets_per_sec']:>14,.0f} {r['sheets_per_sec'] / baseline:>8.1f}x")
+    print(f"Leaderboard recomputed from {args.sheets * args.questions:,} stored answers; "
+          f"leader: player {results['grade_submissions']['leader'][0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Questions/sec: bare requests.get per batch vs the pooled OpenTriviaClient
+
+Usage: python -m benchmarks.opentdb_client [--batches 48] [--amount 10] [--latency 0.02]
+"""
+import argparse
+import time
+
+import requests
+
+from benchmarks.stubs import FakeOpenTDB
+from opentdb import OpenTriviaClient
+
+
+def old_fetch(base_url, amount, category_id, difficulty):
+    # The request pattern TriviaQuizApp.fetch_questions used originally
+    params = {"amount": amount, "type": "multiple", "category": category_id, "difficulty": difficulty}
+    data = requests.get(f"{base_url}/api.php", params=params).json()
+    return data['results'] if data['response_code'] == 0 else None
+
+
+def run(batches=48, amount=10, latency=0.02, workers=8):
+    """
+    Fetch the same batches through both code paths against a local stub
+
+    Args:
+        batches (int): Number of (category, difficulty) batches
+        amount (int): Questions per batch
+        latency (float): Simulated server latency per request in seconds
+        workers (int): Concurrent requests for the pooled client
+
+    Returns:
+        dict: Questions/sec and connections opened for each path
+    """
+    results = {}
+    with FakeOpenTDB(latency=latency) as server:
+        combos = [{'amount': amount, 'category_id': category['id'], 'difficulty': difficulty}
+                  for category in server.categories for difficulty in ('easy', 'medium', 'hard')]
+        work = (combos * (batches // len(combos) + 1))[:batches]
+
+        connections = server.connections
+        start = time.perf_counter()
+        fetched = sum(len(old_fetch(server.url, **batch) or []) for batch in work)
+        elapsed = time.perf_counter() - start
+        results['requests.get'] = {'questions_per_sec': fetched / elapsed,
+                                   'connections': server.connections - connections}
+
+        connections = server.connections
+        with OpenTriviaClient(server.url, pool_size=workers) as client:
+            start = time.perf_counter()
+            fetched = sum(len(r) for r in client.fetch_many(work) if isinstance(r, list))
+            elapsed = time.perf_counter() - start
+        results['pooled client'] = {'questions_per_sec': fetched / elapsed,
+                                    'connections': server.connections - connections}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--batches', type=int, default=48)
+    parser.add_argument('--amount', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    for path, r in run(args.batches, args.amount, args.latency, args.workers).items():
+        print(f"{path:<14} {r['questions_per_sec']:>10.0f} questions/s  {r['connections']:>4} connections")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Time-to-first-download: eager playlist resolution vs streaming enumeration
+
+Usage: python -m benchmarks.playlist_stream [--size 10000] [--workers 4]
+"""
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.stubs import FakeYoutubeDL, install_fake_yt_dlp
+
+
+def run(size=10000, workers=4):
+    """
+    Run ytnew.download_videos over a synthetic playlist in both modes
+
+    Args:
+        size (int): Number of entries in the stub playlist
+        workers (int): Parallel downloads used by both modes
+
+    Returns:
+        dict: Per-mode time to first download, total time and peak memory
+    """
+    install_fake_yt_dlp()
+    import ytnew
+
+    FakeYoutubeDL.playlist_size = size
+    results = {}
+    for mode, stream in (('eager', False), ('streaming', True)):
+        FakeYoutubeDL.reset()
+        with tempfile.TemporaryDirectory() as output_dir, contextlib.redirect_stdout(io.StringIO()):
+            tracemalloc.start()
+            start = time.perf_counter()
+            ytnew.download_videos('https://stub.invalid/playlist?list=stub', output_dir,
+                                  workers=workers, stream=stream)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        results[mode] = {
+            'time_to_first_download': FakeYoutubeDL.first_download_at - start,
+            'total_time': elapsed,
+            'peak_memory_mb': peak / 1e6,
+            'downloads': FakeYoutubeDL.downloads,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    results = run(args.size, args.workers)
+    print(f"{'mode':<10} {'first download':>15} {'total':>9} {'peak mem':>10} {'downloads':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<10} {r['time_to_first_download'] * 1000:>12.1f} ms {r['total_time']:>7.2f} s "
+              f"{r['peak_memory_mb']:>7.1f} MB {r['downloads']:>10}")
+
+
+if __name__ == "__main__":
+    main()
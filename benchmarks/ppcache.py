@@ -0,0 +1,100 @@
+"""
+Post-processing time with and without the transcode cache, using fake ffmpeg steps
+
+Usage: python -m benchmarks.ppcache [--files 20] [--step-seconds 0.05]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from ppcache import TranscodeCache, run_chain
+
+
+def fake_step(filepath, info, postprocessor):
+    """
+    Stand-in for one yt-dlp post-processor
+
+    Sleeps like an ffmpeg pass, then rewrites the file: to a new extension
+    when the definition has 'ext' (like FFmpegExtractAudio), otherwise in
+    place (like FFmpegMetadata).
+    """
+    time.sleep(postprocessor.get('seconds', 0.0))
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    data += repr(sorted(postprocessor.items())).encode()
+    output = filepath
+    if postprocessor.get('ext'):
+        output = f"{os.path.splitext(filepath)[0]}.{postprocessor['ext']}"
+        os.remove(filepath)
+    with open(output, 'wb') as f:
+        f.write(data)
+    return dict(info, filepath=output, ext=os.path.splitext(output)[1][1:])
+
+
+def run(files=20, step_seconds=0.05, size=1024 * 1024):
+    """
+    Post-process the same downloads under changing chains
+
+    Args:
+        files (int): Number of downloaded files
+        step_seconds (float): Simulated duration of every step
+        size (int): Size of each downloaded file in bytes
+
+    Returns:
+        dict: Seconds and steps run per scenario
+    """
+    chain = [
+        {'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3', 'preferredquality': '192', 'ext': 'mp3'},
+        {'key': 'FFmpegMetadata'},
+        {'key': 'EmbedThumbnail'},
+    ]
+    scenarios = [
+        ('first run', chain),
+        ('identical re-run', chain),
+        ('last step changed', chain[:2] + [{'key': 'EmbedThumbnail', 'already_have_thumbnail': True}]),
+        ('first step changed', [dict(chain[0], preferredquality='320')] + chain[1:]),
+    ]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        payloads = [os.urandom(size) for _ in range(files)]
+        outputs = {}
+        with TranscodeCache(os.path.join(tmp, 'cache'), max_bytes=files * size * 20) as cache:
+            for name, postprocessors in scenarios:
+                for postprocessor in postprocessors:
+                    postprocessor.setdefault('seconds', step_seconds)
+                steps = 0
+                start = time.perf_counter()
+                for index, payload in enumerate(payloads):
+                    # A fresh download of the same source, as after a crash or a re-run
+                    filepath = os.path.join(tmp, f'track{index}.webm')
+                    with open(filepath, 'wb') as f:
+                        f.write(payload)
+                    info, ran = run_chain(cache, filepath, {'id': f'track{index}'}, postprocessors, fake_step)
+                    steps += ran
+                    with open(info['filepath'], 'rb') as f:
+                        output = f.read()
+                    # A cached result must match what the steps produced
+                    assert outputs.setdefault((tuple(map(repr, postprocessors)), index), output) == output
+                results[name] = {'seconds': time.perf_counter() - start, 'steps_run': steps}
+            results['cache'] = cache.stats()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--step-seconds', type=float, default=0.05)
+    args = parser.parse_args()
+
+    results = run(args.files, args.step_seconds)
+    cache = results.pop('cache')
+    print(f"{'scenario':<20} {'time':>8} {'steps run':>10}")
+    for name, r in results.items():
+        print(f"{name:<20} {r['seconds']:>6.2f} s {r['steps_run']:>10}")
+    print(f"Cache: {cache['outputs']} outputs, {cache['bytes'] / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Load time, memory and sampling latency: in-memory dict vs QuestionBank file
+
+Usage: python -m benchmarks.question_bank [--size 1000000] [--categories 20] [--k 10]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from questionbank import QuestionBank
+
+
+def synthetic_bank(size, categories):
+    """Yield SimpleQuiz-style questions spread across categories"""
+    for n in range(size):
+        yield {
+            'category': f'Category {n % categories}',
+            'difficulty': ('easy', 'medium', 'hard')[n % 3],
+            'question': f'Synthetic question number {n}?',
+            'options': [f'Option {n}-{i}' for i in range(4)],
+            'correct': n % 4,
+            'explanation': f'Explanation for question {n}.',
+        }
+
+
+def measure(load):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    elapsed = time.perf_counter() - start
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, memory
+
+
+def run(size=1000000, categories=20, k=10, samples=1000):
+    """
+    Compare loading a {category: [dict, ...]} JSON bank with opening a bank file
+
+    Args:
+        size (int): Total number of questions
+        categories (int): Number of categories
+        k (int): Questions drawn per sample
+        samples (int): Samples timed per representation
+
+    Returns:
+        dict: Load time, resident memory and sample latency per representation
+    """
+    rng = random.Random(0)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'bank.json')
+        db_path = os.path.join(tmp, 'bank.sqlite3')
+        as_dict = {}
+        for q in synthetic_bank(size, categories):
+            as_dict.setdefault(q.pop('category'), []).append(q)
+        with open(json_path, 'w') as f:
+            json.dump(as_dict, f)
+        QuestionBank.from_dict(db_path, as_dict).close()
+        del as_dict
+
+        def load_json():
+            with open(json_path) as f:
+                return json.load(f)
+
+        bank_dict, load_time, memory = measure(load_json)
+        names = list(bank_dict)
+        start = time.perf_counter()
+        for _ in range(samples):
+            rng.sample(bank_dict[rng.choice(names)], k)
+        results['dict'] = {'load_time': load_time, 'memory_mb': memory / 1e6,
+                           'sample_us': (time.perf_counter() - start) / samples * 1e6}
+        del bank_dict
+
+        bank, load_time, memory = measure(lambda: QuestionBank(db_path))
+        names = bank.categories()
+        start = time.perf_counter()
+        for _ in range(samples):
+            bank.sample(rng.choice(names), k, rng=rng)
+        results['question bank'] = {'load_time': load_time, 'memory_mb': memory / 1e6,
+                                    'sample_us': (time.perf_counter() - start) / samples * 1e6}
+        bank.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', type=int, default=1000000)
+    parser.add_argument('--categories', type=int, default=20)
+    parser.add_argument('--k', type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'representation':<15} {'load':>10} {'memory':>10} {'sample':>12}")
+    for name, r in run(args.size, args.categories, args.k).items():
+        print(f"{name:<15} {r['load_time'] * 1000:>7.1f} ms {r['memory_mb']:>7.1f} MB "
+              f"{r['sample_us']:>9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
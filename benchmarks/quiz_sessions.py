@@ -0,0 +1,72 @@
+"""
+Load test: many concurrent simulated sessions on one QuizEngine
+
+Usage: python -m benchmarks.quiz_sessions [--sessions 10000] [--questions 10]
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from quizappwithoutAI import SimpleQuiz
+from quizengine import QuizEngine
+
+
+def run(sessions=10000, questions=10, seed=0):
+    """
+    Start every session up front, then answer round-robin across all of them
+
+    Args:
+        sessions (int): Number of simulated players
+        questions (int): Questions per session
+        seed (int): Random seed for the simulated answers
+
+    Returns:
+        dict: Throughput and memory figures
+    """
+    rng = random.Random(seed)
+    bank = [q for category in SimpleQuiz().question_bank.values() for q in category]
+    engine = QuizEngine()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    ids = [engine.start_session(rng.choices(bank, k=questions)) for _ in range(sessions)]
+    started = time.perf_counter()
+    _, session_memory = tracemalloc.get_traced_memory()
+
+    answers = 0
+    for _ in range(questions):
+        for session_id in ids:
+            q = engine.next_question(session_id)
+            engine.submit_answer(session_id, rng.randrange(len(q['options'])))
+            answers += 1
+    answered = time.perf_counter()
+    scores = [engine.end_session(session_id)['score'] for session_id in ids]
+    finished = time.perf_counter()
+    tracemalloc.stop()
+
+    return {
+        'sessions': sessions,
+        'start_per_sec': sessions / (started - start),
+        'answers_per_sec': answers / (answered - started),
+        'total_time': finished - start,
+        'memory_per_session_bytes': session_memory / sessions,
+        'mean_score': sum(scores) / len(scores),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=10000)
+    parser.add_argument('--questions', type=int, default=10)
+    args = parser.parse_args()
+
+    r = run(args.sessions, args.questions)
+    print(f"{r['sessions']} sessions in {r['total_time']:.2f}s")
+    print(f"  start:   {r['start_per_sec']:>12,.0f} sessions/s")
+    print(f"  answers: {r['answers_per_sec']:>12,.0f} answers/s")
+    print(f"  memory:  {r['memory_per_session_bytes']:>12,.0f} bytes/session")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Answer events/sec through QuizStats, the JSONL EventLog and the full engine path
+
+Usage: python -m benchmarks.quiz_stats [--events 1000000] [--questions 10000] [--players 5000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from quizengine import QuizEngine
+from quizstats import DIFFICULTIES, EventLog, QuizStats
+
+
+def make_events(events, questions, players, categories=24, rng=None):
+    """Build synthetic answer events shaped like the ones QuizEngine emits"""
+    rng = rng or random.Random(0)
+    pool = [(qid, f'Category {qid % categories}', DIFFICULTIES[qid % 3]) for qid in range(questions)]
+    names = [f'player{p}' for p in range(players)]
+    batch = []
+    for _ in range(events):
+        qid, category, difficulty = pool[rng.randrange(questions)]
+        batch.append({'ts': 0.0, 'player': names[rng.randrange(players)], 'question': qid,
+                      'category': category, 'difficulty': difficulty,
+                      'correct': rng.random() < 0.6, 'latency': rng.random() * 10})
+    return batch
+
+
+def run(events=1000000, questions=10000, players=5000, engine_sessions=10000):
+    """
+    Time the aggregator alone, the event log, and answers submitted through the engine
+
+    Args:
+        events (int): Synthetic events fed to QuizStats and EventLog
+        questions (int): Distinct questions
+        players (int): Distinct players
+        engine_sessions (int): Ten-question sessions played through QuizEngine
+
+    Returns:
+        dict: Events/sec per path
+    """
+    batch = make_events(events, questions, players)
+    results = {}
+
+    stats = QuizStats()
+    record = stats.record
+    start = time.perf_counter()
+    for event in batch:
+        record(event)
+    results['QuizStats.record'] = events / (time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log = EventLog(os.path.join(tmp, 'events.jsonl'), flush_every=1000)
+        start = time.perf_counter()
+        for event in batch[:min(events, 200000)]:
+            log.append(event)
+        log.close()
+        results['EventLog.append'] = min(events, 200000) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        replayed = QuizStats.from_log(log.path)
+        results['replay from log'] = replayed.events / (time.perf_counter() - start)
+
+    rng = random.Random(1)
+    engine = QuizEngine([QuizStats()])
+    quiz = [{'id': qid, 'question': f'Question {qid}?', 'options': ['a', 'b', 'c', 'd'], 'correct': qid % 4,
+             'category': f'Category {qid % 24}', 'difficulty': DIFFICULTIES[qid % 3]} for qid in range(questions)]
+    answered = 0
+    start = time.perf_counter()
+    for session in range(engine_sessions):
+        session_id = engine.start_session(rng.sample(quiz, 10), f'player{session % players}')
+        while engine.next_question(session_id) is not None:
+            engine.submit_answer(session_id, rng.randrange(4))
+            answered += 1
+        engine.end_session(session_id)
+    results['engine + QuizStats'] = answered / (time.perf_counter() - start)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--events', type=int, default=1000000)
+    parser.add_argument('--questions', type=int, default=10000)
+    parser.add_argument('--players', type=int, default=5000)
+    parser.add_argument('--engine-sessions', type=int, default=10000)
+    args = parser.parse_args()
+
+    results = run(args.events, args.questions, args.players, args.engine_sessions)
+    for name, rate in results.items():
+        print(f"{name:<20} {rate:>12,.0f} events/s")
+    print(f"Target: 100,000 events/s - {'met' if results['QuizStats.record'] >= 100000 else 'NOT met'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Single-stream vs chunk-parallel download of one large file, plus resume after a crash
+
+Usage: python -m benchmarks.rangedl [--size-mb 64] [--stream-rate-mb 16] [--workers 1 2 4 8]
+"""
+import argparse
+import os
+import tempfile
+
+from benchmarks.stubs import FragmentServer
+from rangedl import ChunkManifest, download_ranged
+
+
+def run(size=64 * 1024 * 1024, stream_rate=16 * 1024 * 1024, workers=(1, 2, 4, 8),
+        chunk_size=4 * 1024 * 1024):
+    """
+    Download one file from a server that caps every connection's bandwidth
+
+    Args:
+        size (int): File size in bytes
+        stream_rate (int): Per-connection cap of the server in bytes/sec
+        workers (tuple): Parallel range request counts to compare
+        chunk_size (int): Bytes per range request
+
+    Returns:
+        dict: MB/s per worker count, and bytes refetched when resuming half a download
+    """
+    results = {}
+    with FragmentServer(size, rate=stream_rate) as server, tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'video.mp4')
+        for count in workers:
+            stats = download_ranged(f'{server.url}/video.mp4', path, count, chunk_size)
+            with open(path, 'rb') as f:
+                assert f.read() == server.payload
+            results[f'{count} stream(s)'] = {'mb_per_sec': stats['bytes_per_sec'] / 1e6}
+            os.remove(path)
+
+        # Pretend the first half of the chunks landed before a crash
+        manifest = ChunkManifest(f'{path}.chunks.json', f'{server.url}/video.mp4', size, chunk_size)
+        manifest.done = set(range(manifest.chunks // 2))
+        with open(path, 'wb') as f:
+            f.write(server.payload[:manifest.span(manifest.chunks // 2)[0]])
+            f.truncate(size)
+        manifest.save()
+        stats = download_ranged(f'{server.url}/video.mp4', path, max(workers), chunk_size)
+        with open(path, 'rb') as f:
+            assert f.read() == server.payload
+        results['resume'] = {'mb_per_sec': stats['bytes_per_sec'] / 1e6,
+                             'refetched': stats['bytes'], 'resumed_chunks': stats['resumed_chunks']}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, default=64)
+    parser.add_argument('--stream-rate-mb', type=float, default=16)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--chunk-mb', type=int, default=4)
+    args = parser.parse_args()
+
+    size = args.size_mb * 1024 * 1024
+    results = run(size, int(args.stream_rate_mb * 1024 * 1024), tuple(args.workers),
+                  args.chunk_mb * 1024 * 1024)
+    resume = results.pop('resume')
+    for name, r in results.items():
+        print(f"{name:<12} {r['mb_per_sec']:>8.1f} MB/s")
+    print(f"Resume after crash: {resume['resumed_chunks']} chunks kept, "
+          f"{resume['refetched'] / size * 100:.0f}% of the file refetched")
+
+
+if __name__ == "__main__":
+    main()
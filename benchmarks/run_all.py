@@ -0,0 +1,295 @@
+"""
+End-to-end benchmark suite against offline stand-ins for OpenTDB and yt_dlp
+
+Runs the quiz apps against FakeOpenTDB and the downloaders against the
+stub yt_dlp, then writes every figure to a JSON file so runs can be
+compared. Metrics ending in _per_sec are better when higher, metrics
+ending in _ms or _s are better when lower.
+
+Usage: python -m benchmarks.run_all [--only startup quiz playlist video] [--output results.json]
+                                    [--compare previous.json] [--threshold 0.1]
+"""
+import argparse
+import builtins
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import re
+import sys
+import tempfile
+import time
+
+from benchmarks.startup import import_time
+from benchmarks.stubs import FakeOpenTDB, FakeYoutubeDL, install_fake_yt_dlp
+
+SCENARIOS = ('startup', 'quiz', 'playlist', 'video')
+STARTUP_MODULES = ('quizapp', 'quizappwithoutAI', 'yt', 'ytnew', 'ytvid')
+PLAYLIST_URL = 'https://stub.invalid/playlist?list=stub'
+VIDEO_URL = 'https://stub.invalid/watch?v=stub'
+
+
+@contextlib.contextmanager
+def scripted_input(answers, seed=0):
+    """
+    Answer the terminal prompts of the quiz apps without a keyboard
+
+    Category prompts get answers['category'], "How many" prompts the
+    requested count capped at the range in the prompt, and answer prompts
+    a random option.
+    """
+    rng = random.Random(seed)
+
+    def fake_input(prompt=''):
+        bounds = re.search(r'\(1-(\d+)\)', prompt)
+        if 'category' in prompt:
+            return str(answers['category'])
+        if 'How many' in prompt:
+            return str(min(answers['questions'], int(bounds.group(1)) if bounds else answers['questions']))
+        return str(rng.randint(1, int(bounds.group(1)) if bounds else 1))
+
+    original = builtins.input
+    builtins.input = fake_input
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        builtins.input = original
+
+
+def run_startup():
+    """Return the import time of every entry point in milliseconds"""
+    results = {}
+    for module in STARTUP_MODULES:
+        seconds = import_time(module)
+        if seconds is not None:
+            results[f'{module}_import_ms'] = seconds * 1000
+    return results
+
+
+def _play(quiz, quizzes, answers):
+    answered = quiz.stats.events
+    start = time.perf_counter()
+    with scripted_input(answers):
+        for _ in range(quizzes):
+            quiz.run_quiz()
+    elapsed = time.perf_counter() - start
+    questions = quiz.stats.events - answered
+    return {'quizzes_per_sec': quizzes / elapsed, 'answers_per_sec': questions / elapsed,
+            'quiz_ms': elapsed / quizzes * 1000}
+
+
+def run_quiz(quizzes=50, questions=10, latency=0.005):
+    """
+    Play full quizzes through run_quiz with scripted answers
+
+    TriviaQuizApp runs against FakeOpenTDB, once straight from the API and
+    once through its disk cache; SimpleQuiz uses its built-in questions.
+    All of them record to QuizStats and an EventLog like their __main__.
+
+    Args:
+        quizzes (int): Quizzes played per app
+        questions (int): Questions asked per quiz
+        latency (float): Seconds FakeOpenTDB waits before every response
+
+    Returns:
+        dict: Quizzes/sec, answers/sec and mean quiz time per app
+    """
+    from quizapp import TriviaQuizApp
+    from quizappwithoutAI import SimpleQuiz
+    from quizstats import EventLog, QuizStats
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp, FakeOpenTDB(latency=latency, per_pool=1000) as server:
+        for name, cache_path in (('trivia', None), ('trivia_cached', os.path.join(tmp, 'cache.json'))):
+            with EventLog(os.path.join(tmp, f'{name}.jsonl')) as log:
+                quiz = TriviaQuizApp(server.url, cache_path=cache_path, player='bench',
+                                     stats=QuizStats(), event_log=log)
+                quiz.pause = 0
+                for key, value in _play(quiz, quizzes, {'category': 0, 'questions': questions}).items():
+                    results[f'{name}_{key}'] = value
+                if quiz.cache:
+                    quiz.cache.wait_for_refills()
+
+        with EventLog(os.path.join(tmp, 'simple.jsonl')) as log:
+            quiz = SimpleQuiz(player='bench', stats=QuizStats(), event_log=log)
+            quiz.pause = 0
+            for key, value in _play(quiz, quizzes, {'category': 1, 'questions': questions}).items():
+                results[f'simple_{key}'] = value
+    return results
+
+
+def _fake_downloads(size, file_size, bandwidth, page_latency):
+    install_fake_yt_dlp()
+    FakeYoutubeDL.playlist_size = size
+    FakeYoutubeDL.file_size = file_size
+    FakeYoutubeDL.bandwidth = bandwidth
+    FakeYoutubeDL.page_latency = page_latency
+    FakeYoutubeDL.reset()
+
+
+def _download_figures(start):
+    elapsed = time.perf_counter() - start
+    return {
+        'ttfb_ms': (FakeYoutubeDL.first_byte_at - start) * 1000 if FakeYoutubeDL.first_byte_at else None,
+        'total_s': elapsed,
+        'mb_per_sec': FakeYoutubeDL.bytes_downloaded / elapsed / 1e6,
+        'downloads': FakeYoutubeDL.downloads,
+    }
+
+
+def run_playlist(size=200, workers=4, file_size=256 * 1024, bandwidth=8e6, page_latency=0.002):
+    """
+    Download a synthetic playlist with yt.download_playlist and ytnew.download_videos
+
+    Args:
+        size (int): Entries in the stub playlist
+        workers (int): Parallel downloads
+        file_size (int): Bytes written per video
+        bandwidth (float): Bytes/sec of every simulated download
+        page_latency (float): Seconds per playlist page
+
+    Returns:
+        dict: Time to first byte, total time, aggregate MB/s and downloads per mode
+    """
+    _fake_downloads(size, file_size, bandwidth, page_latency)
+    import yt
+    import ytnew
+
+    modes = (
+        ('download_playlist', lambda out: yt.download_playlist(PLAYLIST_URL, out, workers=workers)),
+        ('download_playlist_stream',
+         lambda out: yt.download_playlist(PLAYLIST_URL, out, workers=workers, stream=True)),
+        ('download_videos', lambda out: ytnew.download_videos(PLAYLIST_URL, out, workers=workers)),
+        ('download_videos_stream',
+         lambda out: ytnew.download_videos(PLAYLIST_URL, out, workers=workers, stream=True)),
+    )
+    results = {}
+    for name, download in modes:
+        FakeYoutubeDL.reset()
+        with tempfile.TemporaryDirectory() as out, contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            download(out)
+            figures = _download_figures(start)
+        for key, value in figures.items():
+            results[f'{name}_{key}'] = value
+    return results
+
+
+def run_video(videos=5, file_size=16 * 1024 * 1024, bandwidth=64e6):
+    """
+    Download single videos with ytvid.download_video
+
+    Args:
+        videos (int): Videos downloaded one after another
+        file_size (int): Bytes written per video
+        bandwidth (float): Bytes/sec of the simulated download
+
+    Returns:
+        dict: Time to first byte of the first video, total time and MB/s
+    """
+    _fake_downloads(1, file_size, bandwidth, 0.0)
+    import ytvid
+
+    with tempfile.TemporaryDirectory() as out, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for index in range(videos):
+            ytvid.download_video(f'{VIDEO_URL}{index}', output_path=out, write_thumbnail=False)
+        figures = _download_figures(start)
+    return {f'download_video_{key}': value for key, value in figures.items()}
+
+
+def run(scenarios=SCENARIOS, **options):
+    """
+    Run the selected scenarios
+
+    Args:
+        scenarios (tuple): Any of startup, quiz, playlist and video
+        **options: Keyword arguments forwarded to run_<scenario>
+
+    Returns:
+        dict: Run metadata and metrics per scenario
+    """
+    runners = {'startup': run_startup, 'quiz': run_quiz, 'playlist': run_playlist, 'video': run_video}
+    metrics = {}
+    for scenario in scenarios:
+        metrics[scenario] = runners[scenario](**options.get(scenario, {}))
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'metrics': metrics,
+    }
+
+
+def compare(previous, current, threshold=0.1):
+    """
+    Compare two result files metric by metric
+
+    Args:
+        previous (dict): Earlier result of run
+        current (dict): Later result of run
+        threshold (float): Relative change counted as a regression
+
+    Returns:
+        list: (scenario, metric, old, new, relative change, regressed) tuples
+    """
+    rows = []
+    for scenario, metrics in current['metrics'].items():
+        for metric, new in metrics.items():
+            old = previous.get('metrics', {}).get(scenario, {}).get(metric)
+            if not isinstance(old, (int, float)) or not isinstance(new, (int, float)) or not old:
+                continue
+            change = (new - old) / old
+            if metric.endswith('_per_sec'):
+                regressed = change < -threshold
+            elif metric.endswith(('_ms', '_s')):
+                regressed = change > threshold
+            else:
+                regressed = False
+            rows.append((scenario, metric, old, new, change, regressed))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--output', default='benchmark_results.json', help="Where to write the results")
+    parser.add_argument('--compare', help="Earlier results file to compare against")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="Relative change reported as a regression (default: 0.1)")
+    parser.add_argument('--quizzes', type=int, default=50)
+    parser.add_argument('--playlist-size', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.005, help="FakeOpenTDB response latency in seconds")
+    parser.add_argument('--bandwidth', type=float, default=8e6, help="Bytes/sec per simulated download")
+    args = parser.parse_args()
+
+    results = run(args.only,
+                  quiz={'quizzes': args.quizzes, 'latency': args.latency},
+                  playlist={'size': args.playlist_size, 'workers': args.workers, 'bandwidth': args.bandwidth})
+    for scenario, metrics in results['metrics'].items():
+        print(f"[{scenario}]")
+        for metric, value in metrics.items():
+            print(f"  {metric:<40} {'n/a' if value is None else f'{value:,.2f}'}")
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        rows = compare(previous, results, args.threshold)
+        print(f"\nCompared with {args.compare} ({previous.get('created', 'unknown date')}):")
+        for scenario, metric, old, new, change, regressed in rows:
+            flag = '  REGRESSION' if regressed else ''
+            print(f"  {scenario + '.' + metric:<48} {old:>12,.2f} -> {new:>12,.2f} {change:>+7.1%}{flag}")
+        if any(row[5] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
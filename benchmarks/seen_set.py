@@ -0,0 +1,101 @@
+"""
+Memory per player and lookup latency: SeenTracker vs a Python set per player
+
+Usage: python -m benchmarks.seen_set [--players 20000] [--seen 50] [--capacity 1000] [--error-rate 0.01]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from seenset import SeenTracker
+
+
+def run(players=20000, seen=50, capacity=1000, error_rate=0.01, lookups=100000, universe=1000000):
+    """
+    Record seen questions for many players and time membership lookups
+
+    Args:
+        players (int): Number of players
+        seen (int): Questions seen per player
+        capacity (int): Questions one filter holds before another is chained on
+        error_rate (float): False-positive rate of a full filter
+        lookups (int): Lookups timed per structure
+        universe (int): Range of question IDs
+
+    Returns:
+        dict: Memory per player, lookup latency, false-positive rate and,
+            for SeenTracker, the time and bytes written to save one player
+    """
+    rng = random.Random(0)
+    history = {f'player{p}': rng.sample(range(universe), seen) for p in range(players)}
+    queries = [(f'player{rng.randrange(players)}', rng.randrange(universe)) for _ in range(lookups)]
+    results = {}
+
+    tracemalloc.start()
+    sets = {player: set(ids) for player, ids in history.items()}
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    hits = sum(qid in sets[player] for player, qid in queries)
+    results['set per player'] = {
+        'bytes_per_player': memory / players,
+        'lookup_us': (time.perf_counter() - start) / lookups * 1e6,
+        'false_positive_rate': 0.0,
+    }
+    del sets
+
+    tracemalloc.start()
+    tracker = SeenTracker(capacity, error_rate)
+    for player, ids in history.items():
+        tracker.add_many(player, ids)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    bloom_hits = sum(tracker.seen(player, qid) for player, qid in queries)
+    results['SeenTracker'] = {
+        'bytes_per_player': memory / players,
+        'lookup_us': (time.perf_counter() - start) / lookups * 1e6,
+        'false_positive_rate': (bloom_hits - hits) / max(1, lookups - hits),
+    }
+
+    # After a quiz only the player who played is written back
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'seen.sqlite3')
+        with SeenTracker(capacity, error_rate, path) as stored:
+            for player, ids in history.items():
+                stored.add_many(player, ids)
+        with SeenTracker(capacity, error_rate, path) as stored:
+            size = os.path.getsize(path)
+            saves = min(players, 200)
+            start = time.perf_counter()
+            for p in range(saves):
+                stored.add(f'player{p}', universe + p)
+                stored.save()
+            results['SeenTracker']['save_ms'] = (time.perf_counter() - start) / saves * 1000
+            results['SeenTracker']['file_bytes'] = size
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--players', type=int, default=20000)
+    parser.add_argument('--seen', type=int, default=50)
+    parser.add_argument('--capacity', type=int, default=1000)
+    parser.add_argument('--error-rate', type=float, default=0.01)
+    args = parser.parse_args()
+
+    results = run(args.players, args.seen, args.capacity, args.error_rate)
+    print(f"{'structure':<16} {'bytes/player':>13} {'lookup':>10} {'false +':>9}")
+    for name, r in results.items():
+        print(f"{name:<16} {r['bytes_per_player']:>13,.0f} {r['lookup_us']:>7.2f} us "
+              f"{r['false_positive_rate'] * 100:>7.3f}%")
+    tracker = results['SeenTracker']
+    print(f"Saving one player after a quiz: {tracker['save_ms']:.2f} ms "
+          f"(file holds {args.players} players in {tracker['file_bytes'] / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
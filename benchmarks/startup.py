@@ -0,0 +1,126 @@
+"""
+CLI startup time and per-call YoutubeDL overhead, fresh instances vs YoutubeDLCache
+
+Usage: python -m benchmarks.startup [--calls 200] [--repeat 3]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+from ytpool import YoutubeDLCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ('yt', 'ytnew', 'ytvid', 'yt_dlp')
+SCRIPTS = ('yt.py', 'ytnew.py', 'ytvid.py')
+
+
+def import_time(module):
+    """
+    Return the cumulative import time of module in a fresh interpreter
+
+    Uses ``python -X importtime`` and reads the module's own line, so
+    interpreter start-up and site packages are not counted.
+
+    Returns:
+        float: Seconds, or None if the module cannot be imported
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    for line in reversed(result.stderr.splitlines()):
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1e6
+    return None
+
+
+def help_time(script, repeat=3):
+    """Return the best wall time of ``python script --help`` over repeat runs"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, script, '--help'], cwd=ROOT, capture_output=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def call_overhead(calls=200):
+    """
+    Time getting a configured YoutubeDL per call, fresh vs cached
+
+    Uses the real yt_dlp when it is installed, the offline stub otherwise.
+
+    Returns:
+        dict: Microseconds per call for both approaches and the class used
+    """
+    try:
+        import yt_dlp
+        ydl_class = yt_dlp.YoutubeDL
+    except ImportError:
+        from benchmarks.stubs import FakeYoutubeDL as ydl_class
+    opts = {
+        'format': 'bestaudio/best',
+        'quiet': True,
+        'postprocessors': [{'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3'}],
+    }
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        with ydl_class(dict(opts)) as ydl:
+            ydl.params.get('format')
+    fresh = (time.perf_counter() - start) / calls
+
+    cache = YoutubeDLCache(ydl_class)
+    start = time.perf_counter()
+    for _ in range(calls):
+        with cache.borrow(dict(opts, progress_hooks=[lambda d: None])) as ydl:
+            ydl.params.get('format')
+    cached = (time.perf_counter() - start) / calls
+    cache.close()
+    return {'class': f'{ydl_class.__module__}.{ydl_class.__name__}',
+            'fresh_us': fresh * 1e6, 'cached_us': cached * 1e6,
+            'created': cache.created, 'reused': cache.reused}
+
+
+def run(calls=200, repeat=3):
+    """
+    Measure import time, --help latency and per-call overhead
+
+    Args:
+        calls (int): YoutubeDL acquisitions timed per approach
+        repeat (int): --help runs per script (best is kept)
+
+    Returns:
+        dict: Results per measurement
+    """
+    return {
+        'import': {module: import_time(module) for module in MODULES},
+        'help': {script: help_time(script, repeat) for script in SCRIPTS},
+        'per_call': call_overhead(calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    results = run(args.calls, args.repeat)
+    print("Import time (python -X importtime):")
+    for module, seconds in results['import'].items():
+        print(f"  {module:<8} {'n/a' if seconds is None else f'{seconds * 1000:7.1f} ms'}")
+    print("--help wall time (including interpreter start-up):")
+    for script, seconds in results['help'].items():
+        print(f"  {script:<9} {seconds * 1000:7.1f} ms")
+    call = results['per_call']
+    print(f"Per-call YoutubeDL ({call['class']}): fresh {call['fresh_us']:.0f} us, "
+          f"cached {call['cached_us']:.0f} us ({call['created']} created, {call['reused']} reused)")
+
+
+if __name__ == "__main__":
+    main()
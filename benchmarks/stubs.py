@@ -0,0 +1,384 @@
+"""
+Offline stand-ins used by the benchmarks
+
+Run benchmarks from the repository root, e.g. ``python -m benchmarks.playlist_stream``.
+"""
+import os
+import sys
+import threading
+import time
+import types
+
+
+class FakeYoutubeDL:
+    """
+    Minimal YoutubeDL stand-in that serves a synthetic paged playlist
+
+    Playlist URLs contain ``list=``; every other URL is treated as a video.
+    Timing knobs are class attributes so a benchmark can tune them before
+    the code under test builds its own instances. With a file_size, every
+    download writes that many bytes to its output template, paced by
+    bandwidth (bytes/sec per download) and reported to progress hooks.
+    """
+
+    playlist_size = 10000
+    page_size = 100
+    page_latency = 0.002
+    resolve_latency = 0.0002
+    download_latency = 0.0
+    file_size = 0
+    bandwidth = None
+    chunk_size = 64 * 1024
+
+    _lock = threading.Lock()
+    first_download_at = None
+    first_byte_at = None
+    downloads = 0
+    bytes_downloaded = 0
+
+    def __init__(self, params=None):
+        self.params = dict(params or {})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @classmethod
+    def reset(cls):
+        cls.first_download_at = None
+        cls.first_byte_at = None
+        cls.downloads = 0
+        cls.bytes_downloaded = 0
+
+    def _page_entries(self):
+        for start in range(0, self.playlist_size, self.page_size):
+            time.sleep(self.page_latency)
+            for index in range(start, min(start + self.page_size, self.playlist_size)):
+                video_id = f'vid{index:06d}'
+                yield {
+                    '_type': 'url',
+                    'id': video_id,
+                    'url': f'https://stub.invalid/watch?v={video_id}',
+                    'title': f'Video {index}',
+                }
+
+    def _resolve(self, video_id):
+        time.sleep(self.resolve_latency)
+        return {
+            'id': video_id,
+            'title': f'Video {video_id}',
+            'ext': 'mp4',
+            'webpage_url': f'https://stub.invalid/watch?v={video_id}',
+            'description': 'x' * 512,
+            'formats': [{'format_id': str(n), 'url': f'https://stub.invalid/{video_id}/{n}'}
+                        for n in range(20)],
+        }
+
+    def _download(self, info):
+        with self._lock:
+            cls = type(self)
+            if cls.first_download_at is None:
+                cls.first_download_at = time.perf_counter()
+            cls.downloads += 1
+        time.sleep(self.download_latency)
+        filepath = self.prepare_filename(info)
+        if self.file_size:
+            self._stream(info, filepath)
+        info['requested_downloads'] = [{'filepath': filepath}]
+        return info
+
+    def _stream(self, info, filepath):
+        cls = type(self)
+        hooks = self.params.get('progress_hooks') or []
+        chunk = bytes(self.chunk_size)
+        written = 0
+        if os.path.dirname(filepath):
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        with open(filepath, 'wb') as f:
+            while written < self.file_size:
+                size = min(self.chunk_size, self.file_size - written)
+                if self.bandwidth:
+                    time.sleep(size / self.bandwidth)
+                f.write(chunk[:size])
+                written += size
+                with self._lock:
+                    if cls.first_byte_at is None:
+                        cls.first_byte_at = time.perf_counter()
+                    cls.bytes_downloaded += size
+                for hook in hooks:
+                    hook({'status': 'downloading', 'filename': filepath, 'info_dict': info,
+                          'downloaded_bytes': written, 'total_bytes': self.file_size})
+        for hook in hooks:
+            hook({'status': 'finished', 'filename': filepath, 'info_dict': info,
+                  'downloaded_bytes': written, 'total_bytes': self.file_size})
+
+    def extract_info(self, url, download=True, process=True, **kwargs):
+        if 'list=' in url:
+            playlist = {'_type': 'playlist', 'id': 'stub', 'title': 'Stub Playlist',
+                        'entries': self._page_entries()}
+            if not process:
+                return playlist
+            if self.params.get('extract_flat'):
+                playlist['entries'] = list(playlist['entries'])
+            else:
+                playlist['entries'] = [self._resolve(entry['id']) for entry in playlist['entries']]
+            if download:
+                for entry in playlist['entries']:
+                    self._download(entry)
+            return playlist
+
+        info = self._resolve(url.rsplit('=', 1)[-1])
+        return self._download(info) if download else info
+
+    def download(self, urls):
+        for url in urls:
+            self.extract_info(url)
+        return 0
+
+    def prepare_filename(self, info):
+        template = self.params.get('outtmpl')
+        if isinstance(template, dict):
+            template = template.get('default')
+        if not template:
+            return f"{info['id']}.{info.get('ext', 'mp4')}"
+        name = (template.replace('%(title)s', info.get('title', info['id']))
+                .replace('%(id)s', info['id']).replace('%(ext)s', info.get('ext', 'mp4')))
+        home = (self.params.get('paths') or {}).get('home')
+        return os.path.join(home, name) if home else name
+
+    def post_process(self, filepath, info, files_to_move=None):
+        return dict(info, filepath=filepath)
+
+    def sanitize_info(self, info):
+        return info
+
+
+def install_fake_yt_dlp(ydl_class=FakeYoutubeDL):
+    """
+    Register a fake ``yt_dlp`` module so downloader code runs offline
+
+    Args:
+        ydl_class (type): Class exposed as ``yt_dlp.YoutubeDL``
+
+    Returns:
+        module: The installed fake module
+    """
+    module = types.ModuleType('yt_dlp')
+    module.YoutubeDL = ydl_class
+    sys.modules['yt_dlp'] = module
+    return module
+
+
+class FragmentServer:
+    """
+    Local HTTP/1.1 server that serves fixed-size fragments
+
+    Every path returns ``size`` bytes of deterministic content. Range
+    requests are honoured and keep-alive is supported, so both throttling
+    and connection reuse can be measured without network access. ``rate``
+    caps each connection's bytes/sec, like a CDN throttling single streams.
+    A ``status`` of 400 or more answers every request with that error and
+    a short HTML body instead.
+    """
+
+    def __init__(self, size=256 * 1024, latency=0.0, rate=None, status=None):
+        import http.server
+
+        self.size = size
+        self.latency = latency
+        self.rate = rate
+        self.status = status
+        self.connections = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        self.payload = bytes(range(256)) * (size // 256) + bytes(size % 256)
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def _range(self):
+                header = self.headers.get('Range')
+                if not header or not header.startswith('bytes='):
+                    return 0, server.size - 1, False
+                first, _, last = header[6:].partition('-')
+                return int(first), min(int(last) if last else server.size - 1, server.size - 1), True
+
+            def _respond(self, with_body):
+                with server._lock:
+                    server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.status:
+                    page = f'<h1>Error {server.status}</h1>'.encode()
+                    self.send_response(server.status)
+                    self.send_header('Content-Length', str(len(page)))
+                    self.end_headers()
+                    if with_body:
+                        self.wfile.write(page)
+                    return
+                first, last, partial = self._range()
+                self.send_response(206 if partial else 200)
+                self.send_header('Accept-Ranges', 'bytes')
+                self.send_header('Content-Length', str(last - first + 1))
+                if partial:
+                    self.send_header('Content-Range', f'bytes {first}-{last}/{server.size}')
+                self.end_headers()
+                if with_body and server.rate:
+                    step = max(1, server.rate // 20)
+                    for offset in range(first, last + 1, step):
+                        self.wfile.write(server.payload[offset:min(offset + step, last + 1)])
+                        time.sleep(step / server.rate)
+                elif with_body:
+                    self.wfile.write(server.payload[first:last + 1])
+
+            def do_GET(self):
+                self._respond(True)
+
+            def do_HEAD(self):
+                self._respond(False)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self._httpd.server_address[1]}'
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        return False
+
+
+class FakeOpenTDB:
+    """
+    Local stand-in for the Open Trivia Database HTTP API
+
+    Serves api_category.php, api.php and api_token.php with synthetic
+    questions. ``latency`` delays every response, ``rate_limit_interval``
+    answers HTTP 429 with response_code 5 to requests arriving faster than
+    that, like the real API, and
+    session tokens track served questions so exhaustion (code 4) works.
+    """
+
+    def __init__(self, categories=24, per_pool=200, latency=0.0, rate_limit_interval=0.0):
+        import http.server
+        import json
+        from urllib.parse import parse_qs, urlsplit
+
+        self.categories = [{'id': 9 + n, 'name': f'Category {n}'} for n in range(categories)]
+        self.per_pool = per_pool
+        self.latency = latency
+        self.rate_limit_interval = rate_limit_interval
+        self.requests = 0
+        self.connections = 0
+        self.tokens = {}
+        self._last_request = 0.0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with server._lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                params = {k: v[0] for k, v in parse_qs(parts.query).items()}
+                if server.latency:
+                    time.sleep(server.latency)
+                if parts.path.endswith('api_category.php'):
+                    body = {'trivia_categories': server.categories}
+                elif parts.path.endswith('api_token.php'):
+                    body = server._token(params)
+                else:
+                    body = server._questions(params)
+                data = json.dumps(body).encode()
+                self.send_response(429 if body.get('response_code') == 5 else 200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self._httpd.server_address[1]}'
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        return False
+
+    def question(self, category_id, difficulty, index):
+        category = next((c for c in self.categories if c['id'] == category_id), self.categories[0])
+        return {
+            'type': 'multiple',
+            'difficulty': difficulty,
+            'category': category['name'],
+            'question': f'Question {index} about &quot;{category["name"]}&quot; ({difficulty})?',
+            'correct_answer': f'Right &amp; {index}',
+            'incorrect_answers': [f'Wrong {index}-{n}' for n in range(3)],
+        }
+
+    def _token(self, params):
+        with self._lock:
+            if params.get('command') == 'request':
+                token = f'token{len(self.tokens)}'
+                self.tokens[token] = set()
+                return {'response_code': 0, 'token': token}
+            if params.get('token') not in self.tokens:
+                return {'response_code': 3}
+            self.tokens[params['token']].clear()
+            return {'response_code': 0, 'token': params['token']}
+
+    def _questions(self, params):
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            if self.rate_limit_interval and now - self._last_request < self.rate_limit_interval:
+                return {'response_code': 5, 'results': []}
+            self._last_request = now
+            token = params.get('token')
+            if token is not None and token not in self.tokens:
+                return {'response_code': 3, 'results': []}
+            seen = self.tokens.get(token, set())
+
+        amount = int(params.get('amount', 10))
+        if not 1 <= amount <= 50:
+            return {'response_code': 2, 'results': []}
+        difficulties = [params['difficulty']] if 'difficulty' in params else ['easy', 'medium', 'hard']
+        categories = [int(params['category'])] if 'category' in params else [c['id'] for c in self.categories]
+        pool = [(c, d, i) for c in categories for d in difficulties for i in range(self.per_pool)]
+        with self._lock:
+            unseen = [key for key in pool if key not in seen]
+            if len(pool) < amount:
+                return {'response_code': 1, 'results': []}
+            if token is not None and len(unseen) < amount:
+                return {'response_code': 4, 'results': []}
+            chosen = (unseen if token is not None else pool)[:amount]
+            seen.update(chosen)
+        return {'response_code': 0, 'results': [self.question(*key) for key in chosen]}
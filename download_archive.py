@@ -0,0 +1,204 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from ytpool import downloaded_filepath
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 checksum of a file without reading it into memory
+
+    Args:
+        path (str): File to hash
+        chunk_size (int): Bytes read per iteration
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DownloadArchive:
+    """
+    Persistent index of completed downloads keyed by video ID
+
+    The index lives in a SQLite file. All IDs are loaded into a set when the
+    archive is opened, so membership checks never touch the disk.
+    """
+
+    def __init__(self, path='download_archive.sqlite3'):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS downloads ("
+            " video_id TEXT PRIMARY KEY,"
+            " path TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " checksum TEXT NOT NULL,"
+            " completed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._ids = {row[0] for row in self._conn.execute("SELECT video_id FROM downloads")}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, video_id):
+        return video_id in self._ids
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def record(self, video_id, path, size=None, checksum=None):
+        """
+        Mark a video as completely downloaded
+
+        Args:
+            video_id (str): Video ID
+            path (str): Path of the downloaded file
+            size (int): File size in bytes (read from disk when omitted)
+            checksum (str): SHA-256 of the file (computed when omitted)
+        """
+        if size is None:
+            size = os.path.getsize(path)
+        if checksum is None:
+            checksum = file_checksum(path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?)",
+                (video_id, str(path), size, checksum, time.time()),
+            )
+            self._conn.commit()
+            self._ids.add(video_id)
+
+    def record_info(self, ydl, info):
+        """
+        Record a download from the info dict yt-dlp returned for it
+
+        Args:
+            ydl (YoutubeDL): Instance that performed the download
+            info (dict): Info dict returned by extract_info(download=True)
+
+        Returns:
+            bool: Whether the file was found and recorded
+        """
+        path = downloaded_filepath(ydl, info)
+        if not info.get('id') or not path or not os.path.exists(path):
+            return False
+        self.record(info['id'], path)
+        return True
+
+    def entries(self):
+        """Return (video_id, path, size, checksum) for every recorded download"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT video_id, path, size, checksum FROM downloads ORDER BY completed_at"
+            ).fetchall()
+
+    def verify(self, output_dir, deep=False):
+        """
+        Check the index against the files that actually exist in output_dir
+
+        Args:
+            output_dir (str): Directory the downloads were written to
+            deep (bool): Also re-hash every file and compare checksums
+
+        Returns:
+            dict: Lists of missing IDs, corrupt IDs and untracked file paths
+        """
+        report = {'missing': [], 'corrupt': [], 'untracked': []}
+        tracked = {os.path.abspath(self.path)}
+        for video_id, path, size, checksum in self.entries():
+            tracked.add(os.path.abspath(path))
+            if not os.path.exists(path):
+                report['missing'].append(video_id)
+            elif os.path.getsize(path) != size or (deep and file_checksum(path) != checksum):
+                report['corrupt'].append(video_id)
+
+        output_path = Path(output_dir)
+        if output_path.is_dir():
+            for path in output_path.iterdir():
+                if path.name.startswith('.'):
+                    continue
+                if path.is_file() and os.path.abspath(path) not in tracked:
+                    report['untracked'].append(str(path))
+        return report
+
+    def forget(self, video_ids):
+        """
+        Drop entries so the videos are downloaded again on the next run
+
+        Args:
+            video_ids (iterable): IDs to remove
+        """
+        video_ids = list(video_ids)
+        with self._lock:
+            self._conn.executemany("DELETE FROM downloads WHERE video_id = ?",
+                                   [(video_id,) for video_id in video_ids])
+            self._conn.commit()
+            self._ids.difference_update(video_ids)
+
+    def compact(self, output_dir=None):
+        """
+        Drop entries whose files no longer exist and reclaim space on disk
+
+        Args:
+            output_dir (str): When given, corrupt entries found by verify are dropped too
+
+        Returns:
+            int: Number of entries removed
+        """
+        if output_dir is not None:
+            report = self.verify(output_dir)
+            stale = report['missing'] + report['corrupt']
+        else:
+            stale = [video_id for video_id, path, _, _ in self.entries() if not os.path.exists(path)]
+        self.forget(stale)
+        with self._lock:
+            self._conn.execute("VACUUM")
+        return len(stale)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or maintain a download archive")
+    parser.add_argument('archive', help="Path of the archive file")
+    parser.add_argument('command', choices=['stats', 'verify', 'compact'])
+    parser.add_argument('--output-dir', default='downloads')
+    parser.add_argument('--deep', action='store_true', help="Re-hash files when verifying")
+    args = parser.parse_args()
+
+    with DownloadArchive(args.archive) as archive:
+        if args.command == 'stats':
+            print(f"{len(archive)} downloads recorded")
+        elif args.command == 'verify':
+            report = archive.verify(args.output_dir, deep=args.deep)
+            for key, values in report.items():
+                print(f"{key}: {len(values)}")
+                for value in values:
+                    print(f"  {value}")
+        else:
+            removed = archive.compact(args.output_dir)
+            print(f"Removed {removed} stale entries")
+
+
+if __name__ == "__main__":
+    main()
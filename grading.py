@@ -0,0 +1,95 @@
+import numpy as np
+
+UNANSWERED = -1
+
+
+def answer_key(questions):
+    """
+    Build the answer key of a quiz from its precomputed correct slots
+
+    Args:
+        questions (list): Questions with a 'correct' option index
+
+    Returns:
+        numpy.ndarray: Correct option index per question (int8)
+    """
+    return np.fromiter((q['correct'] for q in questions), dtype=np.int8, count=len(questions))
+
+
+def grade_sheets(key, answers):
+    """
+    Score one or many answer sheets against the same answer key
+
+    Args:
+        key (array-like): Correct option index per question, shape (questions,)
+        answers (array-like): Chosen option indices, shape (questions,) for one
+            sheet or (sheets, questions) for many; UNANSWERED counts as wrong
+
+    Returns:
+        int or numpy.ndarray: Score of the sheet, or one score per sheet
+    """
+    key = np.asarray(key, dtype=np.int8)
+    answers = np.asarray(answers, dtype=np.int8)
+    scores = np.count_nonzero(answers == key, axis=-1)
+    return int(scores) if answers.ndim == 1 else scores
+
+
+def correct_by_id(pairs, size=None):
+    """
+    Build a lookup array of correct slots indexed by question ID
+
+    Args:
+        pairs (iterable): (question_id, correct_index) pairs, e.g.
+            QuestionBank.correct_answers()
+        size (int): Array length (defaults to the largest ID + 1)
+
+    Returns:
+        numpy.ndarray: Correct slot per question ID; unknown IDs never match
+    """
+    table = np.array(list(pairs), dtype=np.int64).reshape(-1, 2)
+    # Unknown IDs hold a slot no answer (not even UNANSWERED) can match
+    size = size or int(table[:, 0].max(initial=-1)) + 1
+    lookup = np.full(size, UNANSWERED - 1, dtype=np.int8)
+    lookup[table[:, 0]] = table[:, 1]
+    return lookup
+
+
+def grade_submissions(sheet_ids, question_ids, answers, lookup, num_sheets=None):
+    """
+    Score a flat log of stored submissions in one pass
+
+    Each row is one answered question. Rows can belong to any number of
+    sheets in any order, which is how submissions are usually stored.
+
+    Args:
+        sheet_ids (array-like): Sheet index of every row (0-based, dense)
+        question_ids (array-like): Question ID of every row
+        answers (array-like): Chosen option index of every row
+        lookup (numpy.ndarray): Result of correct_by_id
+        num_sheets (int): Number of sheets (defaults to the largest index + 1)
+
+    Returns:
+        numpy.ndarray: Score per sheet
+    """
+    sheet_ids = np.asarray(sheet_ids, dtype=np.int64)
+    correct = lookup[np.asarray(question_ids, dtype=np.int64)] == np.asarray(answers, dtype=np.int8)
+    return np.bincount(sheet_ids, weights=correct, minlength=num_sheets or 0).astype(np.int64)
+
+
+def leaderboard(player_ids, scores, top=10):
+    """
+    Rank players by their total score over all sheets
+
+    Args:
+        player_ids (array-like): Player index of every sheet (0-based, dense)
+        scores (array-like): Score of every sheet
+        top (int): Number of leaders to return
+
+    Returns:
+        list: (player index, total score) pairs, best first
+    """
+    totals = np.bincount(np.asarray(player_ids, dtype=np.int64), weights=np.asarray(scores))
+    top = min(top, len(totals))
+    leaders = np.argpartition(-totals, top - 1)[:top] if top else np.array([], dtype=np.int64)
+    leaders = leaders[np.argsort(-totals[leaders], kind='stable')]
+    return [(int(player), int(totals[player])) for player in leaders]
@@ -0,0 +1,199 @@
+import hashlib
+import html
+import random
+import sqlite3
+import time
+
+from opentdb import OPENTDB_URL, OpenTriviaClient
+from questionbank import QuestionBank
+from quizapp import TriviaQuizApp
+from quizengine import from_opentdb
+
+DIFFICULTIES = ("easy", "medium", "hard")
+MAX_AMOUNT = 50  # Largest batch the API serves
+FETCH_ATTEMPTS = 3  # Tries per batch before a failing pool is left for the next run
+
+
+def question_hash(question, correct_answer):
+    """Return the de-duplication key of an unescaped question"""
+    return hashlib.sha1(f"{question}\x1f{correct_answer}".encode()).hexdigest()
+
+
+def normalize(q, rng=random):
+    """
+    Unescape and pre-shuffle a raw API question for storage in the corpus
+
+    Args:
+        q (dict): Question as returned by the API
+        rng (random.Random): Source of randomness for the option order
+
+    Returns:
+        dict: Question ready for QuestionBank.add_many
+    """
+    question = from_opentdb(q, rng)
+    question['category'] = html.unescape(q['category'])
+    return question
+
+
+class IngestProgress:
+    """Completed (category, difficulty) pools and the session token, kept in the corpus file"""
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, timeout=30)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS ingest_pools (
+                category_id INTEGER NOT NULL,
+                difficulty TEXT NOT NULL,
+                questions INTEGER NOT NULL,
+                PRIMARY KEY (category_id, difficulty)
+            );
+            CREATE TABLE IF NOT EXISTS ingest_state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+        """)
+
+    def close(self):
+        self._conn.close()
+
+    def is_done(self, category_id, difficulty):
+        return self._conn.execute(
+            "SELECT 1 FROM ingest_pools WHERE category_id = ? AND difficulty = ?",
+            (category_id, difficulty)).fetchone() is not None
+
+    def mark_done(self, category_id, difficulty, questions):
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO ingest_pools VALUES (?, ?, ?)",
+                               (category_id, difficulty, questions))
+
+    def get(self, key):
+        row = self._conn.execute("SELECT value FROM ingest_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, value):
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO ingest_state VALUES (?, ?)", (key, value))
+
+
+def ingest(corpus_path, base_url=OPENTDB_URL, category_ids=None, difficulties=DIFFICULTIES,
+           min_interval=5.0, app=None, rng=None):
+    """
+    Page through the Open Trivia Database and build a local question corpus
+
+    Every (category, difficulty) pool is drained with maximum-size batches
+    under one session token, so the API never serves a question twice.
+    Questions are unescaped and their options shuffled once, here, and
+    duplicates are dropped before they are written to a QuestionBank file.
+    Finished pools and the token are recorded in the same file, so an
+    interrupted run picks up where it stopped. A pool only counts as
+    finished once the API reports it empty; one that keeps failing (e.g.
+    network errors) is left unmarked and retried on the next run.
+
+    Args:
+        corpus_path (str): QuestionBank file to create or extend
+        base_url (str): API base URL
+        category_ids (list): Only ingest these categories (default: all)
+        difficulties (tuple): Difficulties to ingest
+        min_interval (float): Minimum seconds between question requests
+        app (TriviaQuizApp): App whose categories and client are used (built for base_url when omitted)
+        rng (random.Random): Source of randomness for option order
+
+    Returns:
+        dict: Requests made, questions added, duplicates skipped and questions/sec
+    """
+    rng = rng or random.Random()
+    if app is None:
+        client = OpenTriviaClient(base_url, use_token=True, reset_exhausted_token=False,
+                                  min_interval=min_interval)
+        app = TriviaQuizApp(client=client)
+    bank = QuestionBank(corpus_path, create=True)
+    progress = IngestProgress(corpus_path)
+    app.client.token = progress.get('token')
+
+    known = {question_hash(q.question, q.options[q.correct]) for q in bank.iter_questions()}
+    stats = {'requests': 0, 'added': 0, 'duplicates': 0}
+    start = time.perf_counter()
+
+    try:
+        categories = app.get_categories() or []
+        for category in categories:
+            if category_ids and category['id'] not in category_ids:
+                continue
+            for difficulty in difficulties:
+                if progress.is_done(category['id'], difficulty):
+                    continue
+                added, amount, failures, exhausted = 0, MAX_AMOUNT, 0, False
+                while True:
+                    # Transport errors leave last_code untouched, so clear it first
+                    app.client.last_code = None
+                    error = None
+                    try:
+                        # The client directly: "No Results" is expected here, not an error to print
+                        batch = app.client.fetch_questions(amount, category['id'], difficulty)
+                    except Exception as e:
+                        batch, error = [], e
+                    stats['requests'] += 1
+                    progress.set('token', app.client.token)
+                    if not batch:
+                        if app.client.last_code in (1, 4):
+                            # Too few questions left for this batch size: retry smaller
+                            if amount > 1:
+                                amount //= 2
+                                continue
+                            exhausted = True
+                            break
+                        if error is not None:
+                            print(f"{category['name']} ({difficulty}): {error}")
+                        failures += 1
+                        if failures < FETCH_ATTEMPTS:
+                            time.sleep(min_interval)
+                            continue
+                        break
+                    failures = 0
+                    fresh = []
+                    for q in batch:
+                        question = normalize(q, rng)
+                        key = question_hash(question['question'], question['options'][question['correct']])
+                        if key in known:
+                            stats['duplicates'] += 1
+                            continue
+                        known.add(key)
+                        fresh.append(question)
+                    added += bank.add_many(fresh)
+                    stats['added'] += len(fresh)
+
+                if not exhausted:
+                    print(f"{category['name']} ({difficulty}): giving up after {FETCH_ATTEMPTS} failed "
+                          f"requests, {added} questions added; rerun to resume")
+                    continue
+                progress.mark_done(category['id'], difficulty, added)
+                elapsed = time.perf_counter() - start
+                print(f"{category['name']} ({difficulty}): {added} questions, "
+                      f"{stats['added'] / elapsed:.1f} questions/s overall")
+    finally:
+        progress.close()
+        bank.close()
+
+    stats['elapsed'] = time.perf_counter() - start
+    stats['questions_per_sec'] = stats['added'] / stats['elapsed'] if stats['elapsed'] else 0.0
+    return stats
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build a local question corpus from the Open Trivia Database")
+    parser.add_argument('corpus', help="QuestionBank file to create or resume")
+    parser.add_argument('--base-url', default=OPENTDB_URL)
+    parser.add_argument('--category', type=int, action='append', help="Category ID (repeatable)")
+    parser.add_argument('--min-interval', type=float, default=5.0,
+                        help="Seconds between requests (the public API allows one per 5s)")
+    args = parser.parse_args()
+
+    stats = ingest(args.corpus, args.base_url, args.category, min_interval=args.min_interval)
+    print(f"\nAdded {stats['added']} questions ({stats['duplicates']} duplicates skipped) "
+          f"in {stats['requests']} requests, {stats['questions_per_sec']:.1f} questions/s")
+
+
+if __name__ == "__main__":
+    main()
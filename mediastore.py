@@ -0,0 +1,305 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from ytpool import downloaded_filepath
+
+# yt-dlp options that change the bytes of the final file. Subtitles and
+# thumbnails count because the post-processors embed them into the media.
+VARIANT_OPTIONS = (
+    'format', 'format_sort', 'merge_output_format', 'final_ext', 'postprocessors',
+    'writesubtitles', 'writeautomaticsub', 'subtitleslangs', 'subtitlesformat',
+    'writethumbnail',
+)
+
+
+def format_variant(ydl_opts):
+    """
+    Return a short key for everything in ydl_opts that shapes the output file
+
+    Two jobs only share a blob when they agree on every option in
+    VARIANT_OPTIONS - an MP3 extraction and an MP4 download of the same
+    video are different blobs, and so are two MP4s with different
+    subtitle tracks or one without an embedded thumbnail.
+
+    Args:
+        ydl_opts (dict): yt-dlp options
+
+    Returns:
+        str: 12 hex characters
+    """
+    shape = {key: ydl_opts.get(key) for key in VARIANT_OPTIONS}
+    return hashlib.sha1(json.dumps(shape, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+class MediaStore:
+    """
+    Content-addressed store of downloaded media keyed by video ID and format
+
+    Every finished download is moved into objects/ once and linked back into
+    the playlist directory that asked for it - a hard link where possible,
+    otherwise a symlink. Later jobs that want the same video in the same
+    format get a new link instead of a new download and transcode.
+    """
+
+    def __init__(self, root='media_store'):
+        self.root = Path(root)
+        (self.root / 'objects').mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / 'store.sqlite3'), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                video_id TEXT NOT NULL,
+                variant TEXT NOT NULL,
+                path TEXT NOT NULL,
+                name TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                reused INTEGER NOT NULL DEFAULT 0,
+                added_at REAL NOT NULL,
+                PRIMARY KEY (video_id, variant)
+            );
+            CREATE TABLE IF NOT EXISTS links (
+                path TEXT PRIMARY KEY,
+                video_id TEXT NOT NULL,
+                variant TEXT NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def variant_for(ydl_opts):
+        """Return the variant key of a job's yt-dlp options (see format_variant)"""
+        return format_variant(ydl_opts)
+
+    def __contains__(self, key):
+        return self._blob(*key) is not None
+
+    def _blob(self, video_id, variant):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT path, name, size FROM blobs WHERE video_id = ? AND variant = ?",
+                (video_id, variant)).fetchone()
+
+    def _link(self, blob_path, dest):
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists() or dest.is_symlink():
+            if dest.exists() and os.path.samefile(dest, blob_path):
+                return str(dest)
+            dest.unlink()
+        try:
+            os.link(blob_path, dest)
+        except OSError:
+            # Different filesystem or no hard link support
+            try:
+                os.symlink(os.path.abspath(blob_path), dest)
+            except OSError:
+                shutil.copy2(blob_path, dest)
+        return str(dest)
+
+    def _record_link(self, path, video_id, variant):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO links VALUES (?, ?, ?)",
+                               (os.path.abspath(path), video_id, variant))
+            self._conn.commit()
+
+    def link(self, video_id, variant, output_dir):
+        """
+        Link an already stored video into output_dir
+
+        Args:
+            video_id (str): Video ID
+            variant (str): Result of format_variant for the job
+            output_dir (str): Playlist directory
+
+        Returns:
+            str: Path of the link, or None if the video is not in the store
+        """
+        blob = self._blob(video_id, variant)
+        if blob is None or not os.path.exists(blob[0]):
+            return None
+        blob_path, name, _ = blob
+        path = self._link(blob_path, Path(output_dir) / name)
+        self._record_link(path, video_id, variant)
+        with self._lock:
+            self._conn.execute("UPDATE blobs SET reused = reused + 1 WHERE video_id = ? AND variant = ?",
+                               (video_id, variant))
+            self._conn.commit()
+        return path
+
+    def missing(self, entries, variant, output_dir):
+        """
+        Link every stored entry into output_dir and yield the rest
+
+        Args:
+            entries (iterable): Playlist entries with an id
+            variant (str): Result of format_variant for the job
+            output_dir (str): Playlist directory
+
+        Yields:
+            dict: Entries that still have to be downloaded
+        """
+        for entry in entries:
+            if entry and entry.get('id') and self.link(entry['id'], variant, output_dir):
+                continue
+            yield entry
+
+    def adopt(self, video_id, variant, filepath):
+        """
+        Move a freshly downloaded file into the store and link it back in place
+
+        Args:
+            video_id (str): Video ID
+            variant (str): Result of format_variant for the job
+            filepath (str): Downloaded file
+
+        Returns:
+            str: Path of the blob
+        """
+        name = os.path.basename(filepath)
+        ext = os.path.splitext(name)[1]
+        blob_dir = self.root / 'objects' / video_id[:2]
+        blob_dir.mkdir(parents=True, exist_ok=True)
+        blob_path = str(blob_dir / f"{video_id}.{variant}{ext}")
+        if not (os.path.exists(blob_path) and os.path.samefile(filepath, blob_path)):
+            try:
+                os.replace(filepath, blob_path)
+            except OSError:
+                # Store on another filesystem
+                shutil.move(filepath, blob_path)
+            self._link(blob_path, filepath)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blobs (video_id, variant, path, name, size, added_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, variant, blob_path, name, os.path.getsize(blob_path), time.time()))
+            self._conn.commit()
+        self._record_link(filepath, video_id, variant)
+        return blob_path
+
+    def adopt_info(self, ydl, info, variant):
+        """
+        Adopt a download from the info dict yt-dlp returned for it
+
+        Args:
+            ydl (YoutubeDL): Instance that performed the download
+            info (dict): Info dict returned by extract_info(download=True)
+            variant (str): Result of format_variant for the job
+
+        Returns:
+            str: Path of the blob, or None if the file was not found
+        """
+        path = downloaded_filepath(ydl, info)
+        if not info.get('id') or not path or not os.path.exists(path):
+            return None
+        return self.adopt(info['id'], variant, path)
+
+    def _live(self, link_path, blob_path):
+        try:
+            return os.path.samefile(link_path, blob_path)
+        except OSError:
+            return False
+
+    def gc(self, dry_run=False):
+        """
+        Forget dead links and delete blobs no playlist directory links to any more
+
+        Args:
+            dry_run (bool): Only report what would be removed
+
+        Returns:
+            dict: Dead links, removed blobs and bytes freed
+        """
+        with self._lock:
+            blobs = self._conn.execute("SELECT video_id, variant, path, size FROM blobs").fetchall()
+            links = self._conn.execute("SELECT path, video_id, variant FROM links").fetchall()
+        blob_paths = {(video_id, variant): path for video_id, variant, path, _ in blobs}
+        live, dead = set(), []
+        for path, video_id, variant in links:
+            blob_path = blob_paths.get((video_id, variant))
+            if blob_path and self._live(path, blob_path):
+                live.add((video_id, variant))
+            else:
+                dead.append(path)
+        unreferenced = [(video_id, variant, path, size) for video_id, variant, path, size in blobs
+                        if (video_id, variant) not in live]
+
+        if not dry_run:
+            for _, _, path, _ in unreferenced:
+                if os.path.exists(path):
+                    os.remove(path)
+            with self._lock:
+                self._conn.executemany("DELETE FROM links WHERE path = ?", [(path,) for path in dead])
+                self._conn.executemany("DELETE FROM blobs WHERE video_id = ? AND variant = ?",
+                                       [(video_id, variant) for video_id, variant, _, _ in unreferenced])
+                self._conn.commit()
+        return {
+            'dead_links': len(dead),
+            'removed_blobs': len(unreferenced),
+            'bytes_freed': sum(size for _, _, _, size in unreferenced),
+        }
+
+    def report(self):
+        """
+        Summarise the store and what it saved
+
+        Returns:
+            dict: Blob and link counts, bytes on disk, bytes the links would
+                take as separate copies, and bytes not re-downloaded
+        """
+        with self._lock:
+            blobs, stored, redownloads = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(size * reused), 0) FROM blobs").fetchone()
+            links, linked = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(b.size), 0) FROM links l"
+                " JOIN blobs b ON b.video_id = l.video_id AND b.variant = l.variant").fetchone()
+        return {
+            'blobs': blobs,
+            'links': links,
+            'bytes_stored': stored,
+            'bytes_linked': linked,
+            'bytes_saved_on_disk': linked - stored,
+            'bytes_not_downloaded': redownloads,
+        }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or garbage-collect a media store")
+    parser.add_argument('root', help="Store directory")
+    parser.add_argument('command', choices=['report', 'gc'])
+    parser.add_argument('--dry-run', action='store_true', help="Only show what gc would remove")
+    args = parser.parse_args()
+
+    with MediaStore(args.root) as store:
+        if args.command == 'report':
+            report = store.report()
+            print(f"{report['blobs']} blobs, {report['links']} links, "
+                  f"{report['bytes_stored'] / 1e6:.1f} MB on disk")
+            print(f"Saved {report['bytes_saved_on_disk'] / 1e6:.1f} MB of duplicate files and "
+                  f"{report['bytes_not_downloaded'] / 1e6:.1f} MB of repeat downloads")
+        else:
+            result = store.gc(args.dry_run)
+            verb = "Would remove" if args.dry_run else "Removed"
+            print(f"{verb} {result['removed_blobs']} blobs ({result['bytes_freed'] / 1e6:.1f} MB) "
+                  f"and {result['dead_links']} dead links")
+
+
+if __name__ == "__main__":
+    main()
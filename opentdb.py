@@ -0,0 +1,187 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+OPENTDB_URL = "https://opentdb.com"
+
+RESPONSE_CODES = {
+    0: "Success",
+    1: "No Results",
+    2: "Invalid Parameter",
+    3: "Token Not Found",
+    4: "Token Empty",
+    5: "Rate Limit",
+}
+
+
+class OpenTriviaError(Exception):
+    """Raised when the Open Trivia Database rejects a request"""
+
+    def __init__(self, code, message=None):
+        self.code = code
+        super().__init__(message or f"{RESPONSE_CODES.get(code, 'Unknown')} (response_code={code})")
+
+
+class OpenTriviaClient:
+    """
+    Open Trivia Database client built on one pooled requests.Session
+
+    Connections are kept alive and shared between threads, so concurrent
+    batches reuse a handful of TCP/TLS connections. Rate-limited responses
+    (code 5) are retried with exponential backoff, and an optional session
+    token keeps the API from repeating questions. min_interval spaces out
+    question requests up front for long crawls (the public API allows one
+    request per IP every 5 seconds).
+    """
+
+    def __init__(self, base_url=OPENTDB_URL, timeout=10, retries=4, backoff=5.0,
+                 pool_size=8, use_token=False, reset_exhausted_token=True, min_interval=0.0):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.pool_size = pool_size
+        self.use_token = use_token
+        self.reset_exhausted_token = reset_exhausted_token
+        self.min_interval = min_interval
+        self.token = None
+        self.last_code = None
+        self._token_lock = threading.Lock()
+        self._pace_lock = threading.Lock()
+        self._last_request = 0.0
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def _get(self, path, params=None):
+        response = self.session.get(f"{self.base_url}/{path}", params=params, timeout=self.timeout)
+        if response.status_code == 429:
+            # OpenTDB rate limits with HTTP 429 and {"response_code": 5}
+            try:
+                data = response.json()
+            except ValueError:
+                data = {}
+            return dict(data if isinstance(data, dict) else {}, response_code=5)
+        response.raise_for_status()
+        return response.json()
+
+    def _pace(self):
+        if not self.min_interval:
+            return
+        with self._pace_lock:
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+
+    def get_categories(self):
+        """
+        Fetch available categories
+
+        Returns:
+            list: Category dicts with id and name
+        """
+        return self._get("api_category.php")['trivia_categories']
+
+    def request_token(self):
+        """Request a new session token and start using it"""
+        data = self._get("api_token.php", {'command': 'request'})
+        if data.get('response_code') != 0:
+            raise OpenTriviaError(data.get('response_code'))
+        self.token = data['token']
+        return self.token
+
+    def reset_token(self):
+        """Reset the current session token so its questions can be served again"""
+        data = self._get("api_token.php", {'command': 'reset', 'token': self.token})
+        if data.get('response_code') != 0:
+            raise OpenTriviaError(data.get('response_code'))
+        return self.token
+
+    def _ensure_token(self):
+        with self._token_lock:
+            if self.token is None:
+                self.request_token()
+            return self.token
+
+    def fetch_questions(self, amount=10, category_id=None, difficulty=None, question_type="multiple"):
+        """
+        Fetch one batch of questions
+
+        Args:
+            amount (int): Number of questions (the API allows up to 50)
+            category_id (int): Category ID, or None for any category
+            difficulty (str): easy, medium, hard, or None for any
+            question_type (str): multiple or boolean
+
+        Returns:
+            list: Raw question dicts; empty when the token has been exhausted
+                and reset_exhausted_token is False
+
+        Raises:
+            OpenTriviaError: On invalid parameters, too few questions, or
+                when rate limiting persists after all retries
+        """
+        params = {'amount': amount, 'type': question_type}
+        if category_id and category_id > 0:
+            params['category'] = category_id
+        if difficulty in ("easy", "medium", "hard"):
+            params['difficulty'] = difficulty
+
+        for attempt in range(self.retries + 1):
+            if self.use_token:
+                params['token'] = self._ensure_token()
+            self._pace()
+            data = self._get("api.php", params)
+            code = self.last_code = data.get('response_code')
+            if code == 0:
+                return data['results']
+            if code == 3:
+                with self._token_lock:
+                    self.token = None
+                continue
+            if code == 4:
+                if not self.reset_exhausted_token:
+                    return []
+                with self._token_lock:
+                    self.reset_token()
+                continue
+            if code == 5:
+                time.sleep(self.backoff * (2 ** attempt))
+                continue
+            raise OpenTriviaError(code)
+        raise OpenTriviaError(5, "Still rate limited after retries")
+
+    def fetch_many(self, batches, max_workers=None):
+        """
+        Fetch several batches concurrently over the pooled session
+
+        Args:
+            batches (list): Dicts of fetch_questions keyword arguments
+            max_workers (int): Concurrent requests (defaults to the pool size)
+
+        Returns:
+            list: One result per batch, in order; failed batches hold the
+                OpenTriviaError or requests exception that was raised
+        """
+        def fetch(batch):
+            try:
+                return self.fetch_questions(**batch)
+            except (OpenTriviaError, requests.RequestException) as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max_workers or self.pool_size) as pool:
+            return list(pool.map(fetch, batches))
@@ -0,0 +1,261 @@
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+from pathlib import Path
+
+from download_archive import file_checksum
+
+
+# Info dict fields each post-processor reads; unknown post-processors are
+# assumed to read all of them
+METADATA_FIELDS = (
+    'id', 'title', 'track', 'track_number', 'artist', 'artists', 'creator', 'creators', 'uploader',
+    'composer', 'composers', 'album', 'album_artist', 'album_artists', 'genre', 'genres', 'tags',
+    'description', 'synopsis', 'comment', 'upload_date', 'release_date', 'release_year',
+    'webpage_url', 'purl', 'chapters', 'show', 'season_number', 'episode_id', 'episode_number',
+    'disc_number', 'language',
+)
+THUMBNAIL_FIELDS = ('thumbnail', 'thumbnails')
+SUBTITLE_FIELDS = ('requested_subtitles',)
+STEP_INFO_FIELDS = {
+    'FFmpegExtractAudio': (),
+    'FFmpegVideoConvertor': (),
+    'FFmpegVideoRemuxer': (),
+    'FFmpegMetadata': METADATA_FIELDS,
+    'EmbedThumbnail': THUMBNAIL_FIELDS,
+    'FFmpegEmbedSubtitle': SUBTITLE_FIELDS,
+}
+DEFAULT_INFO_FIELDS = METADATA_FIELDS + THUMBNAIL_FIELDS + SUBTITLE_FIELDS
+
+
+def _without_paths(value):
+    # Local file paths differ between runs and directories; the content they
+    # stand for is identified by the remaining fields (URLs, IDs)
+    if isinstance(value, dict):
+        return {k: _without_paths(v) for k, v in value.items() if k != 'filepath' and not k.startswith('__')}
+    if isinstance(value, (list, tuple)):
+        return [_without_paths(v) for v in value]
+    return value
+
+
+def step_inputs(info, postprocessor):
+    """Return the info dict fields a post-processor reads, without local paths"""
+    fields = STEP_INFO_FIELDS.get(postprocessor.get('key'), DEFAULT_INFO_FIELDS)
+    return {field: _without_paths(info[field]) for field in fields if info.get(field) is not None}
+
+
+def chain_keys(source_hash, postprocessors, info=None):
+    """
+    Return one cache key per prefix of a post-processor chain
+
+    The key of step i covers the source file, the definitions of steps
+    0..i and the info dict fields those steps read (e.g. the title for
+    FFmpegMetadata), so changing a parameter of step i leaves the keys of
+    the steps before it - and their cached outputs - untouched, while an
+    edited title invalidates the metadata step and everything after it.
+
+    Args:
+        source_hash (str): Checksum of the downloaded file
+        postprocessors (list): yt-dlp post-processor definitions
+        info (dict): Info dict of the video
+
+    Returns:
+        list: Hex keys, one per step
+    """
+    inputs = [step_inputs(info or {}, postprocessor) for postprocessor in postprocessors]
+    return [
+        hashlib.sha256(json.dumps({'source': source_hash, 'chain': postprocessors[:i + 1],
+                                   'inputs': inputs[:i + 1]},
+                                  sort_keys=True, default=str).encode()).hexdigest()
+        for i in range(len(postprocessors))
+    ]
+
+
+def run_ydl_step(filepath, info, postprocessor):
+    """
+    Run a single yt-dlp post-processor on filepath
+
+    Args:
+        filepath (str): Input file
+        info (dict): Sanitized info dict
+        postprocessor (dict): yt-dlp post-processor definition
+
+    Returns:
+        dict: Updated info dict; its filepath is the step's output
+    """
+    import yt_dlp
+
+    with yt_dlp.YoutubeDL({'postprocessors': [postprocessor], 'quiet': True}) as ydl:
+        return ydl.post_process(filepath, info)
+
+
+class TranscodeCache:
+    """
+    Size-bounded LRU cache of post-processor outputs
+
+    Every step's output is stored under the key of its chain prefix (see
+    chain_keys). The index is a SQLite file shared by all transcode
+    processes; once the stored files exceed max_bytes the least recently
+    used ones are evicted.
+    """
+
+    def __init__(self, root='transcode_cache', max_bytes=20 * 1024 ** 3):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        (self.root / 'outputs').mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.root / 'index.sqlite3'), timeout=60)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS outputs ("
+            " key TEXT PRIMARY KEY,"
+            " path TEXT NOT NULL,"
+            " name TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def get(self, key):
+        """
+        Look up a cached output and mark it as recently used
+
+        Returns:
+            tuple: (stored path, original file name), or None on a miss
+        """
+        row = self._conn.execute("SELECT path, name FROM outputs WHERE key = ?", (key,)).fetchone()
+        if row is None or not os.path.exists(row[0]):
+            return None
+        with self._conn:
+            self._conn.execute("UPDATE outputs SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row
+
+    def put(self, key, filepath):
+        """
+        Store a copy of a step's output, then evict down to max_bytes
+
+        Args:
+            key (str): Chain prefix key
+            filepath (str): Output file of the step
+        """
+        name = os.path.basename(filepath)
+        path = str(self.root / 'outputs' / f"{key}{os.path.splitext(name)[1]}")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        shutil.copyfile(filepath, tmp_path)
+        os.replace(tmp_path, path)
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?)",
+                               (key, path, name, os.path.getsize(path), time.time()))
+        self.evict()
+
+    def evict(self):
+        """
+        Drop least recently used outputs until the cache fits in max_bytes
+
+        Returns:
+            int: Bytes freed
+        """
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM outputs").fetchone()[0]
+        freed = 0
+        if total <= self.max_bytes:
+            return freed
+        rows = self._conn.execute("SELECT key, path, size FROM outputs ORDER BY last_used").fetchall()
+        with self._conn:
+            for key, path, size in rows:
+                if total - freed <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM outputs WHERE key = ?", (key,))
+                if os.path.exists(path):
+                    os.remove(path)
+                freed += size
+        return freed
+
+    def stats(self):
+        """Return the number of cached outputs and their total size"""
+        count, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM outputs").fetchone()
+        return {'outputs': count, 'bytes': size, 'max_bytes': self.max_bytes}
+
+
+def run_chain(cache, filepath, info, postprocessors, run_step=run_ydl_step, keep_source=False):
+    """
+    Post-process a file, reusing cached outputs of identical chain prefixes
+
+    The longest cached prefix of the chain is restored next to filepath and
+    only the steps after it are run; each of their outputs is cached in
+    turn. A fully cached chain never calls run_step.
+
+    Args:
+        cache (TranscodeCache): Cache to read and fill
+        filepath (str): Downloaded media file
+        info (dict): Sanitized info dict of the video
+        postprocessors (list): yt-dlp post-processor definitions, in order
+        run_step (callable): Called as run_step(filepath, info, postprocessor);
+            returns the updated info dict with the output's filepath
+        keep_source (bool): Keep the downloaded file when the restored
+            output has a different name (post-processors delete it otherwise)
+
+    Returns:
+        tuple: (updated info dict, number of steps that actually ran)
+    """
+    info = dict(info, filepath=filepath)
+    if not postprocessors:
+        return info, 0
+    keys = chain_keys(file_checksum(filepath), postprocessors, info)
+
+    start, current = 0, filepath
+    for index in range(len(keys) - 1, -1, -1):
+        hit = cache.get(keys[index])
+        if hit is None:
+            continue
+        stored, name = hit
+        restored = os.path.join(os.path.dirname(filepath), name)
+        try:
+            shutil.copyfile(stored, restored)
+        except OSError:
+            # Evicted by another process in the meantime
+            continue
+        if restored != filepath and not keep_source and os.path.exists(filepath):
+            os.remove(filepath)
+        start, current = index + 1, restored
+        info.update(filepath=restored, ext=os.path.splitext(name)[1].lstrip('.') or info.get('ext'))
+        break
+
+    for index in range(start, len(postprocessors)):
+        info = run_step(current, info, postprocessors[index])
+        current = info.get('filepath', current)
+        cache.put(keys[index], current)
+    return info, len(postprocessors) - start
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or trim a transcode cache")
+    parser.add_argument('root', help="Cache directory")
+    parser.add_argument('command', choices=['stats', 'evict'])
+    parser.add_argument('--max-gb', type=float, help="Size limit to evict down to")
+    args = parser.parse_args()
+
+    with TranscodeCache(args.root) as cache:
+        if args.max_gb is not None:
+            cache.max_bytes = int(args.max_gb * 1024 ** 3)
+        if args.command == 'evict':
+            print(f"Freed {cache.evict() / 1e6:.1f} MB")
+        stats = cache.stats()
+        print(f"{stats['outputs']} cached outputs, {stats['bytes'] / 1e6:.1f} MB "
+              f"(limit {stats['max_bytes'] / 1e6:.0f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+import random
+import sqlite3
+from pathlib import Path
+
+OPTION_SEPARATOR = '\x1f'
+# Stays under SQLite's default limit of 999 bound variables per statement
+MAX_VARIABLES = 900
+
+
+class Question:
+    """
+    Compact question record
+
+    Supports item access (q['question'], q.get('explanation')) so it can be
+    used anywhere the dict-based questions are accepted, e.g. by QuizEngine.
+    """
+
+    __slots__ = ('id', 'category', 'difficulty', 'question', 'options', 'correct', 'explanation')
+
+    def __init__(self, id, category, difficulty, question, options, correct, explanation=None):
+        self.id = id
+        self.category = category
+        self.difficulty = difficulty
+        self.question = question
+        self.options = options
+        self.correct = correct
+        self.explanation = explanation
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def __repr__(self):
+        return f"Question(id={self.id}, category={self.category!r}, question={self.question!r})"
+
+
+class QuestionBank:
+    """
+    SQLite-backed question bank indexed by category and difficulty
+
+    Every question stores its ordinal position within its category and
+    within its (category, difficulty) pool. Counts are kept in a small
+    table, so opening a bank reads only category names and counts, and
+    sampling k questions picks k random positions and fetches just those
+    rows through the index - O(k) regardless of how large the category is.
+
+    Opening a path that does not exist raises FileNotFoundError unless
+    create is set, so a mistyped bank path is not mistaken for an empty bank.
+    """
+
+    def __init__(self, path, create=False):
+        self.path = str(path)
+        if create:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        else:
+            if not Path(self.path).is_file():
+                raise FileNotFoundError(f"No question bank at {self.path}")
+            self._conn = sqlite3.connect(f"{Path(self.path).absolute().as_uri()}?mode=rw",
+                                         uri=True, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS categories (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS pools (
+                category_id INTEGER NOT NULL,
+                difficulty TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (category_id, difficulty)
+            );
+            CREATE TABLE IF NOT EXISTS questions (
+                id INTEGER PRIMARY KEY,
+                category_id INTEGER NOT NULL,
+                difficulty TEXT NOT NULL,
+                category_pos INTEGER NOT NULL,
+                pool_pos INTEGER NOT NULL,
+                question TEXT NOT NULL,
+                options TEXT NOT NULL,
+                correct INTEGER NOT NULL,
+                explanation TEXT
+            );
+            CREATE UNIQUE INDEX IF NOT EXISTS questions_by_category
+                ON questions (category_id, category_pos);
+            CREATE UNIQUE INDEX IF NOT EXISTS questions_by_pool
+                ON questions (category_id, difficulty, pool_pos);
+        """)
+        self._category_ids = dict(self._conn.execute("SELECT name, id FROM categories"))
+        self._category_names = {v: k for k, v in self._category_ids.items()}
+        self._pools = {}
+        self._totals = {}
+        for category_id, difficulty, count in self._conn.execute("SELECT * FROM pools"):
+            self._pools[(category_id, difficulty)] = count
+            self._totals[category_id] = self._totals.get(category_id, 0) + count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return sum(self._totals.values())
+
+    def close(self):
+        self._conn.close()
+
+    def categories(self):
+        """Return category names in insertion order"""
+        return sorted(self._category_ids, key=self._category_ids.get)
+
+    def count(self, category, difficulty=None):
+        """
+        Return the number of questions in a category (and difficulty)
+
+        Args:
+            category (str): Category name
+            difficulty (str): Difficulty, or None for all difficulties
+        """
+        category_id = self._category_ids.get(category)
+        if difficulty:
+            return self._pools.get((category_id, difficulty), 0)
+        return self._totals.get(category_id, 0)
+
+    def _row_to_question(self, row):
+        qid, category_id, difficulty, question, options, correct, explanation = row
+        return Question(qid, self._category_names[category_id], difficulty or None, question,
+                        options.split(OPTION_SEPARATOR), correct, explanation)
+
+    def get(self, question_ids):
+        """
+        Load questions by ID
+
+        Args:
+            question_ids (list): Question IDs
+
+        Returns:
+            list: Questions in the order of question_ids (missing IDs are skipped)
+        """
+        found = {}
+        ids = list(question_ids)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            rows = self._conn.execute(
+                "SELECT id, category_id, difficulty, question, options, correct, explanation"
+                f" FROM questions WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            for row in rows:
+                found[row[0]] = self._row_to_question(row)
+        return [found[qid] for qid in ids if qid in found]
+
+    def iter_questions(self, batch_size=10000):
+        """Yield every question in ID order, reading batch_size rows at a time"""
+        last_id = 0
+        while True:
+            rows = self._conn.execute(
+                "SELECT id, category_id, difficulty, question, options, correct, explanation"
+                " FROM questions WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._row_to_question(row)
+            last_id = rows[-1][0]
+
+    def correct_answers(self):
+        """Yield (question ID, correct option index) for every question"""
+        yield from self._conn.execute("SELECT id, correct FROM questions ORDER BY id")
+
+    def _fetch_positions(self, category, difficulty, positions):
+        category_id = self._category_ids.get(category)
+        if difficulty:
+            where, params = "category_id = ? AND difficulty = ? AND pool_pos", [category_id, difficulty]
+        else:
+            where, params = "category_id = ? AND category_pos", [category_id]
+        by_position = {}
+        for start in range(0, len(positions), MAX_VARIABLES):
+            chunk = positions[start:start + MAX_VARIABLES]
+            rows = self._conn.execute(
+                "SELECT category_pos, pool_pos, id, category_id, difficulty, question, options, correct, explanation"
+                f" FROM questions WHERE {where} IN ({','.join('?' * len(chunk))})", params + chunk)
+            for row in rows:
+                by_position[row[1] if difficulty else row[0]] = self._row_to_question(row[2:])
+        return [by_position[pos] for pos in positions]
+
+    def sample(self, category, k, difficulty=None, rng=random):
+        """
+        Draw k distinct random questions without loading the whole category
+
+        Args:
+            category (str): Category name
+            k (int): Number of questions
+            difficulty (str): Restrict to one difficulty, or None for any
+            rng (random.Random): Source of randomness
+
+        Returns:
+            list: Questions in random order
+
+        Raises:
+            ValueError: If the category has fewer than k questions
+        """
+        total = self.count(category, difficulty)
+        if k > total:
+            raise ValueError(f"Only {total} questions available in {category}")
+        return self._fetch_positions(category, difficulty, rng.sample(range(total), k))
+
+    def sample_unseen(self, category, k, is_seen, difficulty=None, rng=random, max_rounds=8):
+        """
+        Draw k random questions, skipping ones is_seen reports as seen
+
+        Draws batches of fresh positions until k unseen questions are found,
+        the category is exhausted or max_rounds is reached, then tops up with
+        already-seen questions so the quiz can still go ahead. Batches are
+        drawn by rejection sampling while at most half the positions have
+        been drawn; past that, the remaining positions are listed and
+        shuffled once and the rest of the rounds walk through that list.
+
+        Args:
+            category (str): Category name
+            k (int): Number of questions
+            is_seen (callable): Called with a question ID, returns True if seen
+            difficulty (str): Restrict to one difficulty, or None for any
+            rng (random.Random): Source of randomness
+            max_rounds (int): Maximum number of batches to draw
+
+        Returns:
+            list: Up to k questions, unseen ones first
+        """
+        total = self.count(category, difficulty)
+        drawn, fresh, repeats = set(), [], []
+        remaining = None
+        for _ in range(max_rounds):
+            if len(fresh) >= k or len(drawn) >= total:
+                break
+            want = min(total - len(drawn), 4 * (k - len(fresh)))
+            if remaining is None and (len(drawn) + want) * 2 > total:
+                # Rejection sampling slows down as drawn fills up; scan once instead
+                remaining = [pos for pos in range(total) if pos not in drawn]
+                rng.shuffle(remaining)
+            if remaining is not None:
+                positions, remaining = remaining[:want], remaining[want:]
+            else:
+                positions = []
+                while len(positions) < want:
+                    pos = rng.randrange(total)
+                    if pos not in drawn:
+                        drawn.add(pos)
+                        positions.append(pos)
+            drawn.update(positions)
+            for q in self._fetch_positions(category, difficulty, positions):
+                (repeats if is_seen(q.id) else fresh).append(q)
+        return fresh[:k] + repeats[:max(0, k - len(fresh))]
+
+    def _category_id(self, name):
+        category_id = self._category_ids.get(name)
+        if category_id is None:
+            category_id = self._conn.execute("INSERT INTO categories (name) VALUES (?)", (name,)).lastrowid
+            self._category_ids[name] = category_id
+            self._category_names[category_id] = name
+        return category_id
+
+    def add_many(self, questions):
+        """
+        Append questions in a single transaction
+
+        Args:
+            questions (iterable): Dicts with category, question, options,
+                correct and optionally difficulty and explanation
+
+        Returns:
+            int: Number of questions added
+        """
+        added = 0
+        touched = set()
+        with self._conn:
+            for q in questions:
+                category_id = self._category_id(q['category'])
+                difficulty = q.get('difficulty') or ''
+                category_pos = self._totals.get(category_id, 0)
+                pool_pos = self._pools.get((category_id, difficulty), 0)
+                options = OPTION_SEPARATOR.join(q['options'])
+                self._conn.execute(
+                    "INSERT INTO questions (category_id, difficulty, category_pos, pool_pos,"
+                    " question, options, correct, explanation) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (category_id, difficulty, category_pos, pool_pos, q['question'], options,
+                     q['correct'], q.get('explanation')))
+                self._totals[category_id] = category_pos + 1
+                self._pools[(category_id, difficulty)] = pool_pos + 1
+                touched.add((category_id, difficulty))
+                added += 1
+            self._conn.executemany("INSERT OR REPLACE INTO pools VALUES (?, ?, ?)",
+                                   [key + (self._pools[key],) for key in touched])
+        return added
+
+    @classmethod
+    def from_dict(cls, path, question_bank):
+        """
+        Build a bank file from a SimpleQuiz-style {category: [question, ...]} dict
+
+        Args:
+            path (str): Destination SQLite file
+            question_bank (dict): Category name -> list of question dicts
+
+        Returns:
+            QuestionBank: The opened bank
+        """
+        bank = cls(path, create=True)
+        bank.add_many(dict(q, category=category)
+                      for category, questions in question_bank.items() for q in questions)
+        return bank
+
+
+def main():
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Build a question bank file")
+    parser.add_argument('output', help="SQLite file to create or extend")
+    parser.add_argument('--from-json', help="JSON file shaped like {category: [question, ...]}")
+    args = parser.parse_args()
+
+    if args.from_json:
+        with open(args.from_json) as f:
+            source = json.load(f)
+    else:
+        from quizappwithoutAI import SimpleQuiz
+        source = SimpleQuiz().question_bank
+
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with QuestionBank.from_dict(args.output, source) as bank:
+        for category in bank.categories():
+            print(f"{category}: {bank.count(category)} questions")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,226 @@
-import random
+import getpass
 import json
-import html
-import requests
+import os
+import random
+import sys
+import tempfile
+import threading
 import time
+from collections import OrderedDict, deque
+from opentdb import OPENTDB_URL, OpenTriviaClient
+from questionbank import QuestionBank
+from quizengine import QuizEngine, from_opentdb, play_in_terminal
+from quizstats import EventLog, QuizStats
+from seenset import SeenTracker, question_key
+
+class TriviaCache:
+    """
+    Local cache in front of the Open Trivia Database
+
+    Categories are kept for category_ttl seconds. Questions live in one pool
+    per (category, difficulty); a pool is refilled on a background thread
+    once it drops below low_water, so starting a quiz is normally served
+    straight from memory. Pools are evicted least-recently-used beyond
+    max_pools, questions expire after question_ttl seconds, and everything
+    is persisted to a JSON file so the cache survives restarts.
+    """
+
+    def __init__(self, fetch_categories, fetch_questions, path='trivia_cache.json',
+                 category_ttl=24 * 3600, question_ttl=6 * 3600, pool_size=50,
+                 low_water=10, max_pools=64):
+        self.fetch_categories = fetch_categories
+        self.fetch_questions = fetch_questions
+        self.path = path
+        self.category_ttl = category_ttl
+        self.question_ttl = question_ttl
+        self.pool_size = min(pool_size, 50)  # API maximum per request
+        self.low_water = low_water
+        self.max_pools = max_pools
+        self.categories = None
+        self.categories_at = 0.0
+        self.pools = OrderedDict()
+        self.refilling = set()
+        self.lock = threading.RLock()
+        self.load()
+
+    @staticmethod
+    def pool_key(category_id, difficulty):
+        return f"{category_id or 0}:{difficulty or 'any'}"
+
+    def load(self):
+        """Load a previously saved cache file, dropping anything expired"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable trivia cache: {e}")
+            return
+        now = time.time()
+        with self.lock:
+            if now - data.get('categories_at', 0) < self.category_ttl:
+                self.categories = data.get('categories')
+                self.categories_at = data.get('categories_at', 0)
+            for key, entries in data.get('pools', {}).items():
+                fresh = [(at, q) for at, q in entries if now - at < self.question_ttl]
+                if fresh:
+                    self.pools[key] = deque(fresh)
+
+    def save(self):
+        """Write the cache to disk atomically"""
+        if not self.path:
+            return
+        # Background refills save too; holding the lock keeps an older
+        # snapshot from replacing a newer one
+        with self.lock:
+            data = {
+                'categories': self.categories,
+                'categories_at': self.categories_at,
+                'pools': {key: list(pool) for key, pool in self.pools.items()},
+            }
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)),
+                                            suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(data, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
+    def get_categories(self):
+        """Return categories, fetching them only when missing or stale"""
+        with self.lock:
+            if self.categories and time.time() - self.categories_at < self.category_ttl:
+                return self.categories
+        categories = self.fetch_categories()
+        if categories:
+            with self.lock:
+                self.categories = categories
+                self.categories_at = time.time()
+            self.save()
+        return categories
+
+    def _pool(self, key):
+        # Caller holds the lock; marks the pool as most recently used
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = deque()
+            while len(self.pools) > self.max_pools:
+                self.pools.popitem(last=False)
+        self.pools.move_to_end(key)
+        now = time.time()
+        while pool and now - pool[0][0] >= self.question_ttl:
+            pool.popleft()
+        return pool
+
+    def _fill(self, key, category_id, difficulty, amount):
+        questions = self.fetch_questions(amount, category_id, difficulty)
+        if not questions:
+            return False
+        now = time.time()
+        with self.lock:
+            pool = self._pool(key)
+            known = {q['question'] for _, q in pool}
+            pool.extend((now, q) for q in questions if q['question'] not in known)
+        self.save()
+        return True
+
+    def _fill_at_least(self, key, category_id, difficulty, minimum):
+        # Small categories answer a pool-sized request with code 1, so fall
+        # back to just what is needed
+        if self._fill(key, category_id, difficulty, max(minimum, self.pool_size)):
+            return True
+        return self.pool_size > minimum and self._fill(key, category_id, difficulty, minimum)
+
+    def _refill_in_background(self, key, category_id, difficulty):
+        def refill():
+            try:
+                self._fill_at_least(key, category_id, difficulty, self.low_water)
+            except Exception as e:
+                print(f"Error refilling trivia cache: {e}")
+            finally:
+                with self.lock:
+                    self.refilling.discard(key)
+
+        with self.lock:
+            if key in self.refilling:
+                return
+            self.refilling.add(key)
+        threading.Thread(target=refill, daemon=True).start()
+
+    def take_questions(self, num_questions, category_id=None, difficulty="medium"):
+        """
+        Take num_questions questions out of the matching pool
+
+        Falls back to a blocking fetch only when the pool cannot cover the
+        request, and schedules a background refill when it runs low. Fills
+        ask for a whole pool first and for just what is needed when a small
+        category cannot supply that many.
+
+        Returns:
+            list: Raw question dicts as returned by the API, or None
+        """
+        key = self.pool_key(category_id, difficulty)
+        with self.lock:
+            pool = self._pool(key)
+            short = len(pool) < num_questions
+        if short and not self._fill_at_least(key, category_id, difficulty, num_questions):
+            return None
+        with self.lock:
+            pool = self._pool(key)
+            if len(pool) < num_questions:
+                return None
+            questions = [pool.popleft()[1] for _ in range(num_questions)]
+            low = len(pool) < self.low_water
+        if low:
+            self._refill_in_background(key, category_id, difficulty)
+        return questions
+
+    def wait_for_refills(self, timeout=10):
+        """Block until background refills finish (used on shutdown)"""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self.lock:
+                if not self.refilling:
+                    return True
+            time.sleep(0.01)
+        return False
 
 class TriviaQuizApp:
-    def __init__(self):
+    def __init__(self, base_url=OPENTDB_URL, cache_path=None, client=None, seen=None, player=None,
+                 corpus_path=None, stats=None, event_log=None):
         self.questions = []
         self.score = 0
         self.total_questions = 0
+        # Answers feed the running statistics and the event log, when given
+        self.stats = stats
+        self.engine = QuizEngine([listener for listener in (stats, event_log) if listener is not None])
+        self.pause = 1  # Seconds between questions in the terminal front end
+        # A session token keeps the API from repeating questions to this player
+        self.client = client or OpenTriviaClient(base_url, use_token=True)
+        self.cache = None
+        if cache_path:
+            self.cache = TriviaCache(self._fetch_categories, self._fetch_questions, cache_path)
+        # Optional no-repeat tracking across sessions
+        self.seen = seen
+        self.player = player
+        # A corpus built by ingest_opentdb.py serves questions without the network
+        self.corpus = QuestionBank(corpus_path) if corpus_path else None
         
     def get_categories(self):
         """Fetch available categories from the Open Trivia Database"""
+        if self.corpus:
+            return [{'id': i, 'name': name} for i, name in enumerate(self.corpus.categories(), 1)]
+        if self.cache:
+            return self.cache.get_categories()
+        return self._fetch_categories()
+
+    def _fetch_categories(self):
         try:
-            response = requests.get("https://opentdb.com/api_category.php")
-            if response.status_code == 200:
-                return response.json()['trivia_categories']
-            return None
+            return self.client.get_categories()
         except Exception as e:
             print(f"Error fetching categories: {e}")
             return None
@@ -34,26 +238,60 @@ class TriviaQuizApp:
 
     def fetch_questions(self, num_questions: int = 5, category_id: int = None, difficulty: str = "medium"):
         """Fetch questions from Open Trivia Database API"""
-        url = "https://opentdb.com/api.php"
-        params = {
-            "amount": num_questions,
-            "type": "multiple"
-        }
-        if category_id and category_id > 0:
-            params["category"] = category_id
-        if difficulty in ["easy", "medium", "hard"]:
-            params["difficulty"] = difficulty
+        if self.cache:
+            return self.cache.take_questions(num_questions, category_id, difficulty)
+        return self._fetch_questions(num_questions, category_id, difficulty)
 
+    def _fetch_questions(self, num_questions, category_id=None, difficulty="medium"):
         try:
-            response = requests.get(url, params=params)
-            data = response.json()
-            if data['response_code'] == 0:  # Success
-                return data['results']
-            return None
+            return self.client.fetch_questions(num_questions, category_id, difficulty) or None
         except Exception as e:
             print(f"Error: {e}")
             return None
 
+    def fetch_unseen_questions(self, num_questions, category_id=None, difficulty="medium", max_rounds=3):
+        """Fetch questions the player has not seen yet, allowing repeats only when the pool runs dry"""
+        if self.seen is None or self.player is None:
+            return self.fetch_questions(num_questions, category_id, difficulty)
+        candidates, fresh = [], []
+        for _ in range(max_rounds):
+            batch = self.fetch_questions(num_questions - len(fresh), category_id, difficulty)
+            if not batch:
+                break
+            candidates.extend(batch)
+            fresh = self.seen.unseen(self.player, candidates)
+            if len(fresh) >= num_questions:
+                break
+        if not candidates:
+            return None
+        return self.seen.pick(self.player, candidates, num_questions)
+
+    def corpus_questions(self, num_questions, category_id=None, difficulty="medium"):
+        """Draw already normalized questions from the local corpus"""
+        names = self.corpus.categories()
+        if category_id and 0 < category_id <= len(names):
+            candidates = [names[category_id - 1]]
+        else:
+            candidates = [name for name in names if self.corpus.count(name) >= num_questions]
+        if not candidates:
+            return None
+        category = random.choice(candidates)
+        if self.corpus.count(category, difficulty) < num_questions:
+            difficulty = None
+        if self.corpus.count(category, difficulty) < num_questions:
+            return None
+        if self.seen is not None and self.player is not None:
+            is_seen = lambda qid: self.seen.seen(self.player, qid)
+            return self.corpus.sample_unseen(category, num_questions, is_seen, difficulty)
+        return self.corpus.sample(category, num_questions, difficulty)
+
+    def mark_seen(self, questions_data):
+        if self.seen is None or self.player is None:
+            return
+        self.seen.add_many(self.player, (question_key(q) for q in questions_data))
+        if self.seen.path:
+            self.seen.save()
+
     def get_category_choice(self, categories):
         """Get user's category choice"""
         while True:
@@ -89,61 +327,40 @@ class TriviaQuizApp:
             except ValueError:
                 print("Please enter a valid number.")
 
+        # Adapt the difficulty to the player's recent answers
+        difficulty = "medium"
+        if self.stats is not None:
+            category = next((cat['name'] for cat in categories or [] if cat['id'] == category_id), None)
+            difficulty = self.stats.suggest_difficulty(self.player, category)
+            print(f"Difficulty: {difficulty.capitalize()}")
+
         # Fetch questions
-        questions_data = self.fetch_questions(num_questions, category_id)
+        if self.corpus:
+            questions_data = self.corpus_questions(num_questions, category_id, difficulty)
+        else:
+            questions_data = self.fetch_unseen_questions(num_questions, category_id, difficulty)
+            if not questions_data and difficulty is not None:
+                # Small categories may not have enough questions at the suggested level
+                questions_data = self.fetch_unseen_questions(num_questions, category_id, None)
         
         if not questions_data:
             print("Failed to fetch questions. Please try again.")
             return
 
-        # Start the quiz
-        score = 0
-        for i, q in enumerate(questions_data, 1):
-            # Clean up the text
-            question = html.unescape(q['question'])
-            correct_answer = html.unescape(q['correct_answer'])
-            incorrect_answers = [html.unescape(ans) for ans in q['incorrect_answers']]
-            
-            # Create options list and shuffle it
-            options = incorrect_answers + [correct_answer]
-            random.shuffle(options)
-            
-            # Display question and options
-            print(f"\nQuestion {i}: {question}")
-            print("\nOptions:")
-            for idx, option in enumerate(options, 1):
-                print(f"{idx}. {option}")
-            
-            # Get user's answer
-            while True:
-                try:
-                    answer = int(input("\nYour answer (1-4): "))
-                    if 1 <= answer <= 4:
-                        break
-                    print("Please enter a number between 1 and 4.")
-                except ValueError:
-                    print("Please enter a valid number.")
-            
-            # Check if answer is correct
-            user_answer = options[answer - 1]
-            if user_answer == correct_answer:
-                print("\n✅ Correct!")
-                score += 1
-            else:
-                print("\n❌ Wrong!")
-                print(f"The correct answer was: {correct_answer}")
-            
-            # Show category and difficulty
-            print(f"Category: {q['category']}")
-            print(f"Difficulty: {q['difficulty'].capitalize()}")
-            time.sleep(1)  # Brief pause between questions
-
-        # Show final results
-        print("\n=== Quiz Complete! ===")
-        print(f"Your score: {score}/{num_questions}")
-        percentage = (score / num_questions) * 100
-        print(f"Percentage: {percentage:.1f}%")
+        # Play through the headless engine; corpus questions are already normalized
+        questions = questions_data if self.corpus else [from_opentdb(q) for q in questions_data]
+        session_id = self.engine.start_session(questions, self.player)
+        results = play_in_terminal(self.engine, session_id, self.pause)
+        self.mark_seen(questions_data)
+        self.score = results['score']
+        self.total_questions = results['total']
 
 if __name__ == "__main__":
-    quiz = TriviaQuizApp()
-    quiz.run_quiz()
\ No newline at end of file
+    quiz = TriviaQuizApp(cache_path='trivia_cache.json',
+                         corpus_path=sys.argv[1] if len(sys.argv) > 1 else None,
+                         seen=SeenTracker(path='seen_trivia.sqlite3', source='trivia'),
+                         player=getpass.getuser(),
+                         stats=QuizStats.from_log('quiz_events.jsonl'),
+                         event_log=EventLog('quiz_events.jsonl'))
+    quiz.run_quiz()
+    quiz.cache.wait_for_refills()
\ No newline at end of file
@@ -1,8 +1,13 @@
+import getpass
 import random
-import time
+import sys
+from questionbank import QuestionBank
+from quizengine import QuizEngine, play_in_terminal
+from quizstats import EventLog, QuizStats
+from seenset import SeenTracker, question_key
 
 class SimpleQuiz:
-    def __init__(self):
+    def __init__(self, bank_path=None, seen=None, player=None, stats=None, event_log=None):
         self.question_bank = {
             "Python": [
                 {
@@ -61,14 +66,55 @@ class SimpleQuiz:
         }
         self.score = 0
         self.total_questions = 0
+        # Answers feed the running statistics and the event log, when given
+        self.stats = stats
+        self.engine = QuizEngine([listener for listener in (stats, event_log) if listener is not None])
+        self.pause = 1  # Seconds between questions in the terminal front end
+        # A question bank file replaces the built-in questions when given
+        self.bank = QuestionBank(bank_path) if bank_path else None
+        # Optional no-repeat tracking across sessions
+        self.seen = seen
+        self.player = player
+
+    def categories(self):
+        if self.bank:
+            return self.bank.categories()
+        return list(self.question_bank.keys())
+
+    def count_questions(self, category):
+        if self.bank:
+            return self.bank.count(category)
+        return len(self.question_bank[category])
+
+    def sample_questions(self, category, num_questions, difficulty=None):
+        tracking = self.seen is not None and self.player is not None
+        if self.bank:
+            # Fall back to any difficulty when the preferred pool is too small
+            if difficulty and self.bank.count(category, difficulty) < num_questions:
+                difficulty = None
+            if tracking:
+                is_seen = lambda qid: self.seen.seen(self.player, qid)
+                return self.bank.sample_unseen(category, num_questions, is_seen, difficulty)
+            return self.bank.sample(category, num_questions, difficulty)
+        questions = self.question_bank[category]
+        if tracking:
+            return self.seen.pick(self.player, random.sample(questions, len(questions)), num_questions)
+        return random.sample(questions, num_questions)
+
+    def mark_seen(self, questions):
+        if self.seen is None or self.player is None:
+            return
+        self.seen.add_many(self.player, (question_key(q) for q in questions))
+        if self.seen.path:
+            self.seen.save()
 
     def display_categories(self):
         print("\nAvailable Categories:")
-        for i, category in enumerate(self.question_bank.keys(), 1):
+        for i, category in enumerate(self.categories(), 1):
             print(f"{i}. {category}")
 
     def get_category_choice(self):
-        categories = list(self.question_bank.keys())
+        categories = self.categories()
         while True:
             try:
                 choice = int(input("\nChoose a category number: "))
@@ -79,7 +125,7 @@ class SimpleQuiz:
                 print("Please enter a valid number")
 
     def get_num_questions(self, category):
-        max_questions = len(self.question_bank[category])
+        max_questions = min(self.count_questions(category), 50)
         while True:
             try:
                 num = int(input(f"\nHow many questions would you like? (1-{max_questions}): "))
@@ -99,47 +145,26 @@ class SimpleQuiz:
         # Get number of questions
         num_questions = self.get_num_questions(category)
         
-        # Get random questions from chosen category
-        questions = random.sample(self.question_bank[category], num_questions)
+        # Get random questions from chosen category, adapted to the player's recent answers
+        difficulty = self.stats.suggest_difficulty(self.player, category) if self.stats else None
+        questions = self.sample_questions(category, num_questions, difficulty)
+        if not self.bank:
+            # Built-in questions carry no category of their own
+            questions = [dict(q, category=category) for q in questions]
         
         print(f"\nStarting {category} Quiz!")
         print("=======================")
         
-        for i, q in enumerate(questions, 1):
-            # Display question
-            print(f"\nQuestion {i}: {q['question']}")
-            print("\nOptions:")
-            for idx, option in enumerate(q['options'], 1):
-                print(f"{idx}. {option}")
-            
-            # Get answer
-            while True:
-                try:
-                    answer = int(input("\nYour answer (1-4): "))
-                    if 1 <= answer <= 4:
-                        break
-                    print("Please enter a number between 1 and 4")
-                except ValueError:
-                    print("Please enter a valid number")
-            
-            # Check answer
-            if answer - 1 == q['correct']:
-                print("\n✅ Correct!")
-                self.score += 1
-            else:
-                print("\n❌ Wrong!")
-                print(f"The correct answer was: {q['options'][q['correct']]}")
-            
-            # Show explanation
-            print(f"Explanation: {q['explanation']}")
-            time.sleep(1)
-            
-        # Show final results
-        print("\n=== Quiz Complete! ===")
-        print(f"Your score: {self.score}/{num_questions}")
-        percentage = (self.score / num_questions) * 100
-        print(f"Percentage: {percentage:.1f}%")
+        session_id = self.engine.start_session(questions, self.player)
+        results = play_in_terminal(self.engine, session_id, self.pause)
+        self.mark_seen(questions)
+        self.score += results['score']
+        self.total_questions += results['total']
 
 if __name__ == "__main__":
-    quiz = SimpleQuiz()
+    quiz = SimpleQuiz(sys.argv[1] if len(sys.argv) > 1 else None,
+                      seen=SeenTracker(path='seen_simple.sqlite3', source='simple'),
+                      player=getpass.getuser(),
+                      stats=QuizStats.from_log('quiz_events.jsonl'),
+                      event_log=EventLog('quiz_events.jsonl'))
     quiz.run_quiz()
\ No newline at end of file
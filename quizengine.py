@@ -0,0 +1,232 @@
+import html
+import itertools
+import random
+import time
+
+from seenset import question_key
+
+
+def from_opentdb(q, rng=random):
+    """
+    Convert a raw Open Trivia Database question into the engine's format
+
+    Args:
+        q (dict): Question as returned by the API
+        rng (random.Random): Source of randomness for the option order
+
+    Returns:
+        dict: Question with options and the index of the correct one
+    """
+    correct_answer = html.unescape(q['correct_answer'])
+    options = [html.unescape(ans) for ans in q['incorrect_answers']] + [correct_answer]
+    rng.shuffle(options)
+    return {
+        'question': html.unescape(q['question']),
+        'options': options,
+        'correct': options.index(correct_answer),
+        'category': q.get('category'),
+        'difficulty': q.get('difficulty'),
+    }
+
+
+class QuizSession:
+    __slots__ = ('session_id', 'player', 'questions', 'position', 'score', 'answers', 'started', 'shown_at')
+
+    def __init__(self, session_id, questions, player=None):
+        self.session_id = session_id
+        self.player = player
+        self.questions = questions
+        self.position = 0
+        self.score = 0
+        self.answers = []
+        self.started = time.monotonic()
+        self.shown_at = None
+
+
+class QuizEngine:
+    """
+    I/O-free quiz state machine that can host many sessions at once
+
+    Questions are dicts with 'question', 'options' and 'correct' (the index
+    of the right option), plus optional 'explanation', 'category' and
+    'difficulty'. Front ends drive a session with next_question and
+    submit_answer and read the outcome with results.
+
+    Every graded answer is also passed as an event dict to each listener
+    (e.g. QuizStats, EventLog), so analytics stay out of the engine.
+    """
+
+    def __init__(self, listeners=None):
+        self.sessions = {}
+        self.listeners = list(listeners or [])
+        self._ids = itertools.count(1)
+
+    def start_session(self, questions, player=None):
+        """
+        Start a new session over a fixed list of questions
+
+        Args:
+            questions (list): Questions in the engine's format
+            player (str): Optional player identifier
+
+        Returns:
+            int: Session ID
+        """
+        session_id = next(self._ids)
+        self.sessions[session_id] = QuizSession(session_id, list(questions), player)
+        return session_id
+
+    def _session(self, session_id):
+        try:
+            return self.sessions[session_id]
+        except KeyError:
+            raise KeyError(f"Unknown quiz session: {session_id}") from None
+
+    def next_question(self, session_id):
+        """
+        Return the current question without revealing the answer
+
+        Returns:
+            dict: number, total, question, options, category and difficulty,
+                or None when the quiz is over
+        """
+        session = self._session(session_id)
+        if session.position >= len(session.questions):
+            return None
+        q = session.questions[session.position]
+        if session.shown_at is None:
+            session.shown_at = time.monotonic()
+        return {
+            'number': session.position + 1,
+            'total': len(session.questions),
+            'question': q['question'],
+            'options': q['options'],
+            'category': q.get('category'),
+            'difficulty': q.get('difficulty'),
+        }
+
+    def submit_answer(self, session_id, option_index):
+        """
+        Grade an answer to the current question and advance the session
+
+        Args:
+            session_id (int): Session ID
+            option_index (int): Zero-based index of the chosen option
+
+        Returns:
+            dict: Whether it was correct, the correct option and any explanation
+
+        Raises:
+            ValueError: If the quiz is over or the option index is out of range
+        """
+        session = self._session(session_id)
+        if session.position >= len(session.questions):
+            raise ValueError("Quiz is already complete")
+        q = session.questions[session.position]
+        if not 0 <= option_index < len(q['options']):
+            raise ValueError(f"Answer must be between 1 and {len(q['options'])}")
+
+        correct = option_index == q['correct']
+        session.score += correct
+        session.answers.append(option_index)
+        session.position += 1
+        if self.listeners:
+            event = {
+                'ts': time.time(),
+                'player': session.player,
+                'question': question_key(q),
+                'category': q.get('category'),
+                'difficulty': q.get('difficulty'),
+                'correct': correct,
+                'latency': time.monotonic() - session.shown_at if session.shown_at is not None else None,
+            }
+            for listener in self.listeners:
+                listener(event)
+        session.shown_at = None
+        return {
+            'correct': correct,
+            'correct_index': q['correct'],
+            'correct_answer': q['options'][q['correct']],
+            'explanation': q.get('explanation'),
+            'category': q.get('category'),
+            'difficulty': q.get('difficulty'),
+        }
+
+    def results(self, session_id):
+        """
+        Return the score of a session so far
+
+        Returns:
+            dict: score, answered, total, percentage and whether it is finished
+        """
+        session = self._session(session_id)
+        total = len(session.questions)
+        return {
+            'score': session.score,
+            'answered': session.position,
+            'total': total,
+            'percentage': (session.score / total) * 100 if total else 0.0,
+            'finished': session.position >= total,
+            'elapsed': time.monotonic() - session.started,
+        }
+
+    def end_session(self, session_id):
+        """Drop a session and return its final results"""
+        results = self.results(session_id)
+        del self.sessions[session_id]
+        return results
+
+
+def play_in_terminal(engine, session_id, pause=1):
+    """
+    Play one session interactively with input() and print()
+
+    Args:
+        engine (QuizEngine): Engine holding the session
+        session_id (int): Session to play
+        pause (float): Seconds to wait between questions
+
+    Returns:
+        dict: Final results of the session
+    """
+    while True:
+        q = engine.next_question(session_id)
+        if q is None:
+            break
+
+        print(f"\nQuestion {q['number']}: {q['question']}")
+        print("\nOptions:")
+        for idx, option in enumerate(q['options'], 1):
+            print(f"{idx}. {option}")
+
+        num_options = len(q['options'])
+        while True:
+            try:
+                answer = int(input(f"\nYour answer (1-{num_options}): "))
+                if 1 <= answer <= num_options:
+                    break
+                print(f"Please enter a number between 1 and {num_options}")
+            except ValueError:
+                print("Please enter a valid number")
+
+        outcome = engine.submit_answer(session_id, answer - 1)
+        if outcome['correct']:
+            print("\n✅ Correct!")
+        else:
+            print("\n❌ Wrong!")
+            print(f"The correct answer was: {outcome['correct_answer']}")
+
+        if outcome['explanation']:
+            print(f"Explanation: {outcome['explanation']}")
+        if outcome['category']:
+            print(f"Category: {outcome['category']}")
+        if outcome['difficulty']:
+            print(f"Difficulty: {outcome['difficulty'].capitalize()}")
+        if pause:
+            time.sleep(pause)
+
+    results = engine.end_session(session_id)
+    print("\n=== Quiz Complete! ===")
+    print(f"Your score: {results['score']}/{results['total']}")
+    print(f"Percentage: {results['percentage']:.1f}%")
+    return results
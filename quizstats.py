@@ -0,0 +1,182 @@
+import json
+import os
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+class EventLog:
+    """
+    Append-only JSONL log of answer events
+
+    Every answer becomes one line, so the log can be replayed to rebuild
+    QuizStats or fed to other tools. Lines are flushed every flush_every
+    events (1 for interactive play).
+    """
+
+    def __init__(self, path, flush_every=1):
+        self.path = path
+        self.flush_every = flush_every
+        self._pending = 0
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __call__(self, event):
+        self.append(event)
+
+    def append(self, event):
+        """Write one event"""
+        self._file.write(json.dumps(event, separators=(',', ':')) + '\n')
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._file.flush()
+            self._pending = 0
+
+    def close(self):
+        self._file.close()
+
+    @staticmethod
+    def replay(path):
+        """Yield every event stored at path, skipping a torn last line"""
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class QuizStats:
+    """
+    Streaming per-question, per-category and per-player answer statistics
+
+    Every event updates a handful of running counters - answers, correct
+    answers and total latency per question, per category and per
+    (category, difficulty), plus each player's recent accuracy - so
+    recording is O(1) and nothing is ever rescanned.
+
+    Players move between difficulties like a staircase: a smoothed
+    accuracy above step_up moves them one level harder, below step_down
+    one level easier. Answers to questions without a difficulty do not
+    move the staircase.
+    """
+
+    def __init__(self, alpha=0.3, step_up=0.75, step_down=0.4, target=0.65, min_answers=20):
+        self.alpha = alpha
+        self.step_up = step_up
+        self.step_down = step_down
+        self.target = target
+        self.min_answers = min_answers
+        self.events = 0
+        # [answers, correct, latency_sum]
+        self.questions = {}
+        self.categories = {}
+        self.pools = {}
+        # [smoothed accuracy, difficulty level]
+        self.players = {}
+
+    def __call__(self, event):
+        self.record(event)
+
+    @classmethod
+    def from_log(cls, path, **kwargs):
+        """Rebuild statistics by replaying an EventLog file"""
+        stats = cls(**kwargs)
+        for event in EventLog.replay(path):
+            stats.record(event)
+        return stats
+
+    def record(self, event):
+        """
+        Fold one answer event into the statistics
+
+        Args:
+            event (dict): question, category, difficulty, correct, latency
+                and player, as emitted by QuizEngine
+        """
+        correct = 1 if event['correct'] else 0
+        latency = event.get('latency') or 0.0
+        category = event.get('category')
+        difficulty = event.get('difficulty')
+        self.events += 1
+
+        for table, key in ((self.questions, event['question']),
+                           (self.categories, category),
+                           (self.pools, (category, difficulty))):
+            counters = table.get(key)
+            if counters is None:
+                table[key] = [1, correct, latency]
+            else:
+                counters[0] += 1
+                counters[1] += correct
+                counters[2] += latency
+
+        player = event.get('player')
+        if player is not None and difficulty in DIFFICULTIES:
+            state = self.players.get(player)
+            if state is None:
+                state = self.players[player] = [0.5, DIFFICULTIES.index(difficulty)]
+            state[0] += self.alpha * (correct - state[0])
+            if state[0] >= self.step_up and state[1] < len(DIFFICULTIES) - 1:
+                state[1] += 1
+                state[0] = 0.5
+            elif state[0] <= self.step_down and state[1] > 0:
+                state[1] -= 1
+                state[0] = 0.5
+
+    @staticmethod
+    def _summary(counters):
+        if counters is None:
+            return {'answers': 0, 'accuracy': None, 'mean_latency': None}
+        answers, correct, latency = counters
+        return {'answers': answers, 'accuracy': correct / answers, 'mean_latency': latency / answers}
+
+    def question_stats(self, question):
+        """Return answers, accuracy and mean latency of one question"""
+        return self._summary(self.questions.get(question))
+
+    def category_stats(self, category, difficulty=None):
+        """Return answers, accuracy and mean latency of a category (and difficulty)"""
+        if difficulty:
+            return self._summary(self.pools.get((category, difficulty)))
+        return self._summary(self.categories.get(category))
+
+    def hardest_questions(self, count=10, min_answers=None):
+        """Return (question, accuracy) pairs with the lowest accuracy"""
+        min_answers = self.min_answers if min_answers is None else min_answers
+        rated = [(key, c[1] / c[0]) for key, c in self.questions.items() if c[0] >= min_answers]
+        return sorted(rated, key=lambda pair: pair[1])[:count]
+
+    def suggest_difficulty(self, player=None, category=None, default="medium"):
+        """
+        Pick the difficulty to serve next
+
+        A player with history gets their current staircase level. Otherwise
+        the category's difficulty whose overall accuracy is closest to the
+        target is used, once it has at least min_answers answers.
+
+        Args:
+            player (str): Player identifier
+            category (str): Category name
+            default (str): Difficulty when there is nothing to go on
+
+        Returns:
+            str: easy, medium or hard
+        """
+        state = self.players.get(player) if player is not None else None
+        if state is not None:
+            return DIFFICULTIES[state[1]]
+        candidates = []
+        for difficulty in DIFFICULTIES:
+            counters = self.pools.get((category, difficulty))
+            if counters and counters[0] >= self.min_answers:
+                candidates.append((abs(counters[1] / counters[0] - self.target), difficulty))
+        return min(candidates)[1] if candidates else default
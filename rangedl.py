@@ -0,0 +1,272 @@
+import json
+import os
+import queue
+import threading
+import time
+
+from bandwidth import ConnectionPool
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+class ChunkManifest:
+    """
+    Checkpoint of the byte ranges already written to a preallocated file
+
+    Stored next to the download as ``<file>.chunks.json`` and rewritten
+    atomically after every finished chunk has been synced to disk, so a
+    crash loses at most the chunks that were in flight.
+    """
+
+    def __init__(self, path, url, size, chunk_size, validator=None):
+        self.path = path
+        self.url = url
+        self.size = size
+        self.chunk_size = chunk_size
+        self.validator = validator
+        self.done = set()
+        self._lock = threading.Lock()
+
+    @property
+    def chunks(self):
+        return (self.size + self.chunk_size - 1) // self.chunk_size
+
+    def missing(self):
+        return [i for i in range(self.chunks) if i not in self.done]
+
+    def span(self, index):
+        """Return the inclusive (first, last) byte offsets of chunk index"""
+        first = index * self.chunk_size
+        return first, min(first + self.chunk_size, self.size) - 1
+
+    def mark_done(self, index):
+        with self._lock:
+            self.done.add(index)
+            self.save()
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'url': self.url,
+                'size': self.size,
+                'chunk_size': self.chunk_size,
+                'validator': self.validator,
+                'done': sorted(self.done),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def load(cls, path, size, chunk_size, validator=None):
+        """
+        Load a manifest if it describes the same remote file
+
+        Returns:
+            ChunkManifest: The stored manifest, or None if it is missing or stale
+        """
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if (data.get('size'), data.get('chunk_size'), data.get('validator')) != (size, chunk_size, validator):
+            return None
+        manifest = cls(path, data.get('url'), size, chunk_size, validator)
+        manifest.done = set(data.get('done', []))
+        return manifest
+
+
+def probe(url, pool, headers=None):
+    """
+    Find the size of url and whether the server honours Range requests
+
+    Args:
+        url (str): Absolute http(s) URL
+        pool (ConnectionPool): Pool to send the probe on
+        headers (dict): Extra request headers
+
+    Returns:
+        tuple: (size in bytes or None, ranges supported, validator string or None)
+    """
+    status, response_headers, body = pool.request('GET', url, dict(headers or {}, Range='bytes=0-0'))
+    chunks = body()
+    for _ in chunks:
+        if status != 206:
+            # Range ignored: drop the connection instead of reading the whole file
+            break
+    chunks.close()
+    response_headers = {k.lower(): v for k, v in response_headers.items()}
+    validator = response_headers.get('etag') or response_headers.get('last-modified')
+    if status == 206 and '/' in response_headers.get('content-range', ''):
+        total = response_headers['content-range'].rsplit('/', 1)[1]
+        return (int(total) if total.isdigit() else None), True, validator
+    length = response_headers.get('content-length')
+    return (int(length) if length and length.isdigit() else None), False, validator
+
+
+def _write_at(fd, data, offset):
+    if hasattr(os, 'pwrite'):
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data, offset = data[written:], offset + written
+    else:
+        # Every worker has its own descriptor, so seek + write cannot race
+        os.lseek(fd, offset, os.SEEK_SET)
+        while data:
+            data = data[os.write(fd, data):]
+
+
+def _sync(fd):
+    # A chunk only counts as done once its bytes are on disk
+    (getattr(os, 'fdatasync', None) or os.fsync)(fd)
+
+
+def download_ranged(url, path, workers=4, chunk_size=DEFAULT_CHUNK_SIZE, pool=None, job=None,
+                    headers=None, progress=None):
+    """
+    Download one large file over several parallel byte-range requests
+
+    The destination is preallocated to its final size and every chunk is
+    written in place at its offset, so there are no part files to stitch
+    together afterwards. Finished chunks are checkpointed in a manifest
+    next to the file; calling this again after a crash fetches only the
+    chunks that are missing. Servers without Range support get a single
+    sequential stream.
+
+    Args:
+        url (str): Direct http(s) URL of the file
+        path (str): Destination file
+        workers (int): Number of parallel range requests
+        chunk_size (int): Bytes per range request
+        pool (ConnectionPool): Keep-alive pool to use (a private one is created when omitted)
+        job (JobThrottle): Bandwidth throttle to charge, or None for unlimited
+        headers (dict): Extra request headers, e.g. the format's http_headers
+        progress (callable): Called with yt-dlp style progress dicts
+
+    Returns:
+        dict: Bytes fetched, chunks fetched and resumed, elapsed seconds and bytes/sec
+    """
+    own_pool = pool is None
+    pool = pool or ConnectionPool(max_per_host=workers)
+    start = time.perf_counter()
+    stats = {'bytes': 0, 'chunks': 0, 'resumed_chunks': 0, 'ranged': False}
+    lock = threading.Lock()
+    errors = []
+
+    def report(status, fragment=None, downloaded=None):
+        if progress is not None:
+            progress({'status': status, 'filename': path,
+                      'downloaded_bytes': written_total[0] if downloaded is None else downloaded,
+                      'total_bytes': size, 'fragment_index': fragment,
+                      'elapsed': time.perf_counter() - start})
+
+    try:
+        size, ranged, validator = probe(url, pool, headers)
+        manifest_path = f"{path}.chunks.json"
+        written_total = [0]
+
+        if not ranged or not size:
+            status, _, body = pool.request('GET', url, headers)
+            if status >= 400:
+                # Read the error page off the connection instead of into the file
+                for _ in body():
+                    pass
+                raise OSError(f"HTTP {status} for {url}")
+            with open(path, 'wb') as f:
+                for chunk in body():
+                    if job is not None:
+                        job.consume(len(chunk))
+                    f.write(chunk)
+                    written_total[0] += len(chunk)
+                    report('downloading')
+            stats['bytes'] = written_total[0]
+            report('finished')
+        else:
+            stats['ranged'] = True
+            manifest = ChunkManifest.load(manifest_path, size, chunk_size, validator)
+            if manifest is None or not os.path.exists(path) or os.path.getsize(path) != size:
+                manifest = ChunkManifest(manifest_path, url, size, chunk_size, validator)
+                with open(path, 'wb') as f:
+                    f.truncate(size)
+                manifest.save()
+            missing = manifest.missing()
+            stats['resumed_chunks'] = manifest.chunks - len(missing)
+            written_total[0] = size - sum(manifest.span(i)[1] - manifest.span(i)[0] + 1 for i in missing)
+
+            todo = queue.Queue()
+            for index in missing:
+                todo.put(index)
+
+            def worker():
+                fd = os.open(path, os.O_WRONLY | getattr(os, 'O_BINARY', 0))
+                try:
+                    while not errors:
+                        try:
+                            index = todo.get_nowait()
+                        except queue.Empty:
+                            return
+                        first, last = manifest.span(index)
+                        offset = [first]
+
+                        def sink(chunk):
+                            _write_at(fd, chunk, offset[0])
+                            offset[0] += len(chunk)
+                            with lock:
+                                written_total[0] += len(chunk)
+                                downloaded = written_total[0]
+                            # Hooks may block (bandwidth throttling), so never call them under the lock
+                            report('downloading', index, downloaded)
+
+                        status, received = pool.fetch(
+                            url, sink, job, dict(headers or {}, Range=f'bytes={first}-{last}'))
+                        if status != 206 or received != last - first + 1:
+                            raise OSError(f"Chunk {index} of {url}: HTTP {status}, "
+                                          f"{received} of {last - first + 1} bytes")
+                        _sync(fd)
+                        manifest.mark_done(index)
+                        with lock:
+                            stats['bytes'] += received
+                            stats['chunks'] += 1
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    os.close(fd)
+
+            threads = [threading.Thread(target=worker, daemon=True)
+                       for _ in range(max(1, min(workers, len(missing))))]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            if errors:
+                # The manifest keeps the finished chunks for the next attempt
+                report('error')
+                raise errors[0]
+            os.remove(manifest_path)
+            report('finished')
+    finally:
+        if own_pool:
+            pool.close()
+
+    stats['elapsed'] = time.perf_counter() - start
+    stats['bytes_per_sec'] = stats['bytes'] / stats['elapsed'] if stats['elapsed'] else 0.0
+    return stats
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Download a large file over parallel byte ranges")
+    parser.add_argument('url')
+    parser.add_argument('output')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Bytes per range request")
+    args = parser.parse_args()
+
+    stats = download_ranged(args.url, args.output, args.workers, args.chunk_size)
+    print(f"Fetched {stats['bytes'] / 1e6:.1f} MB in {stats['chunks']} chunks "
+          f"({stats['resumed_chunks']} resumed) at {stats['bytes_per_sec'] / 1e6:.1f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
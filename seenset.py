@@ -0,0 +1,230 @@
+import hashlib
+import math
+import sqlite3
+import struct
+
+
+def question_key(q):
+    """
+    Return a stable identifier for a question
+
+    Bank questions carry a numeric id; API and built-in questions fall back
+    to their text.
+    """
+    qid = q.get('id') if hasattr(q, 'get') else None
+    return qid if qid is not None else q['question']
+
+
+def filter_size(capacity, error_rate):
+    """
+    Return the size of a Bloom filter for capacity items at error_rate
+
+    Args:
+        capacity (int): Items the filter should hold
+        error_rate (float): Accepted false-positive rate once it holds them
+
+    Returns:
+        tuple: (bits, rounded up to a whole byte; number of hash functions)
+    """
+    bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    bits += -bits % 8
+    return bits, max(1, round(bits / capacity * math.log(2)))
+
+
+class SeenTracker:
+    """
+    Per-player record of seen questions using Bloom filters
+
+    Every filter is sized to hold capacity questions at error_rate false
+    positives. When a player fills one, another filter of the same size is
+    chained on, so heavy players keep roughly error_rate per filter instead
+    of drifting towards "everything seen". All filters live back to back in
+    a single bytearray, so a player costs their filters plus one dict entry
+    - no per-player Python set. Lookups never miss a question that really
+    was seen.
+
+    Question IDs are hashed together with source, so trackers for
+    different question corpora never mark each other's IDs as seen.
+
+    With a path, filters are kept in SQLite, one row per player and filter.
+    A player is read the first time they are looked up, and save only
+    writes the players that changed since the last save.
+    """
+
+    def __init__(self, capacity=1000, error_rate=0.01, path=None, source=None):
+        self.capacity = capacity
+        self.bits_per_player, self.hashes = filter_size(capacity, error_rate)
+        self.bytes_per_player = self.bits_per_player // 8
+        self.path = path
+        self.source = source
+        self.slots = {}  # player -> slots of their filters, oldest first
+        self.counts = []  # questions added per slot
+        self.slab = bytearray()
+        self._dirty = set()
+        self._unknown = set()
+        self._conn = None
+        if path:
+            self._open(path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.slots)
+
+    def _open(self, path):
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS settings (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS filters (
+                player TEXT NOT NULL,
+                layer INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                bits BLOB NOT NULL,
+                PRIMARY KEY (player, layer)
+            );
+        """)
+        stored = dict(self._conn.execute("SELECT name, value FROM settings"))
+        if stored:
+            # Existing filters only make sense with the sizes they were built with
+            self.capacity = stored['capacity']
+            self.bits_per_player = stored['bits']
+            self.bytes_per_player = self.bits_per_player // 8
+            self.hashes = stored['hashes']
+        else:
+            with self._conn:
+                self._conn.executemany("INSERT INTO settings VALUES (?, ?)", [
+                    ('capacity', self.capacity), ('bits', self.bits_per_player), ('hashes', self.hashes)])
+
+    def close(self):
+        """Save pending changes and close the file"""
+        if self._conn is not None:
+            self.save()
+            self._conn.close()
+            self._conn = None
+
+    def _new_slot(self, count=0, bits=None):
+        self.counts.append(count)
+        self.slab.extend(bits if bits is not None else bytes(self.bytes_per_player))
+        return len(self.counts) - 1
+
+    def _slots(self, player, create):
+        slots = self.slots.get(player)
+        if slots is None and self._conn is not None and player not in self._unknown:
+            rows = self._conn.execute(
+                "SELECT count, bits FROM filters WHERE player = ? ORDER BY layer", (player,)).fetchall()
+            if rows:
+                slots = self.slots[player] = [self._new_slot(count, bits) for count, bits in rows]
+            else:
+                self._unknown.add(player)
+        if slots is None and create:
+            self._unknown.discard(player)
+            slots = self.slots[player] = [self._new_slot()]
+        return slots
+
+    def _bits(self, qid):
+        key = f"{self.source}:{qid}" if self.source else str(qid)
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        h2 |= 1
+        return [(h1 + i * h2) % self.bits_per_player for i in range(self.hashes)]
+
+    def _has(self, slot, bits):
+        base = slot * self.bytes_per_player
+        return all(self.slab[base + (bit >> 3)] & (1 << (bit & 7)) for bit in bits)
+
+    def add(self, player, qid):
+        """Mark question qid as seen by player"""
+        slots = self._slots(player, True)
+        bits = self._bits(qid)
+        if any(self._has(slot, bits) for slot in slots):
+            return
+        if self.counts[slots[-1]] >= self.capacity:
+            slots.append(self._new_slot())
+        slot = slots[-1]
+        base = slot * self.bytes_per_player
+        for bit in bits:
+            self.slab[base + (bit >> 3)] |= 1 << (bit & 7)
+        self.counts[slot] += 1
+        self._dirty.add(player)
+
+    def add_many(self, player, qids):
+        for qid in qids:
+            self.add(player, qid)
+
+    def seen(self, player, qid):
+        """Return whether player has (probably) seen question qid"""
+        slots = self._slots(player, False)
+        if not slots:
+            return False
+        bits = self._bits(qid)
+        return any(self._has(slot, bits) for slot in slots)
+
+    def unseen(self, player, questions):
+        """
+        Filter questions down to the ones player has not seen
+
+        Args:
+            player (str): Player identifier
+            questions (list): Question dicts or records
+
+        Returns:
+            list: Questions not yet seen, in their original order
+        """
+        if not self._slots(player, False):
+            return list(questions)
+        return [q for q in questions if not self.seen(player, question_key(q))]
+
+    def pick(self, player, questions, k):
+        """
+        Pick k questions, preferring unseen ones and falling back to repeats
+
+        Args:
+            player (str): Player identifier
+            questions (list): Candidate questions, in preference order
+            k (int): Number of questions wanted
+
+        Returns:
+            list: Up to k questions, unseen ones first
+        """
+        fresh = self.unseen(player, questions)
+        if len(fresh) >= k:
+            return fresh[:k]
+        fresh_ids = {id(q) for q in fresh}
+        return fresh + [q for q in questions if id(q) not in fresh_ids][:k - len(fresh)]
+
+    def memory_per_player(self):
+        """Return the bytes of one filter (a player holding up to capacity questions)"""
+        return self.bytes_per_player
+
+    def save(self):
+        """
+        Write the filters of every player changed since the last save
+
+        Stored filters are OR-ed into the new ones first, so two processes
+        sharing the file never drop each other's questions.
+        """
+        if self._conn is None or not self._dirty:
+            return
+        size = self.bytes_per_player
+        with self._conn:
+            for player in self._dirty:
+                stored = {layer: (count, bits) for layer, count, bits in self._conn.execute(
+                    "SELECT layer, count, bits FROM filters WHERE player = ?", (player,))}
+                rows = []
+                for layer, slot in enumerate(self.slots[player]):
+                    base = slot * size
+                    if layer in stored:
+                        count, bits = stored[layer]
+                        merged = int.from_bytes(self.slab[base:base + size], 'little') | int.from_bytes(bits, 'little')
+                        self.slab[base:base + size] = merged.to_bytes(size, 'little')
+                        self.counts[slot] = max(self.counts[slot], count)
+                    rows.append((player, layer, self.counts[slot], bytes(self.slab[base:base + size])))
+                self._conn.executemany("INSERT OR REPLACE INTO filters VALUES (?, ?, ?, ?)", rows)
+        self._dirty.clear()
@@ -0,0 +1,44 @@
+import time
+
+from bandwidth import BandwidthScheduler, add_throttle, throttle_hook
+
+
+def progress(filename, downloaded, status='downloading'):
+    return {'status': status, 'filename': filename, 'downloaded_bytes': downloaded}
+
+
+def test_throttle_hook_holds_downloads_to_the_job_cap():
+    scheduler = BandwidthScheduler(job_rate=1_000_000)
+    hook = throttle_hook(scheduler.job('playlist'))
+    start = time.monotonic()
+    # 500 KB reported in 20 KB steps as fast as yt-dlp could deliver them
+    for downloaded in range(20_000, 500_001, 20_000):
+        hook(progress('a.mp4', downloaded))
+    hook(progress('a.mp4', 500_000, 'finished'))
+    elapsed = time.monotonic() - start
+    assert 0.45 <= elapsed < 0.7
+    assert scheduler.jobs['playlist'].bytes == 500_000
+
+
+def test_global_cap_is_shared_between_jobs():
+    scheduler = BandwidthScheduler(global_rate=1_000_000)
+    hooks = [add_throttle({}, scheduler.job(name))['progress_hooks'][-1] for name in ('a', 'b')]
+    start = time.monotonic()
+    for downloaded in range(25_000, 250_001, 25_000):
+        for name, hook in zip('ab', hooks):
+            hook(progress(f'{name}.mp4', downloaded))
+    elapsed = time.monotonic() - start
+    assert 0.45 <= elapsed < 0.7
+    assert scheduler.stats()['bytes'] == 500_000
+
+
+def test_throttle_hook_charges_each_file_once():
+    scheduler = BandwidthScheduler()
+    job = scheduler.job('video')
+    hook = throttle_hook(job)
+    for filename in ('video.f137.mp4', 'video.f140.m4a'):
+        hook(progress(filename, 100))
+        hook(progress(filename, 300))
+        hook(progress(filename, 300, 'finished'))
+    hook({'status': 'error', 'filename': 'video.mp4', 'downloaded_bytes': 999})
+    assert job.bytes == 600
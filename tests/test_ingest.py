@@ -0,0 +1,16 @@
+from benchmarks.stubs import FakeOpenTDB
+from ingest_opentdb import ingest
+from questionbank import QuestionBank
+
+
+def test_ingest_drains_pools_without_printing_errors(tmp_path, capsys):
+    corpus = str(tmp_path / 'corpus.sqlite3')
+    with FakeOpenTDB(categories=2, per_pool=30) as api:
+        stats = ingest(corpus, api.url, [9], min_interval=0)
+    out = capsys.readouterr().out
+    # Every pool ends with "No Results" / "Token Empty" while amount halves
+    assert 'Error' not in out
+    assert out.count('questions/s overall') == 3
+    assert stats['added'] == 90
+    with QuestionBank(corpus) as bank:
+        assert len(bank) == 90
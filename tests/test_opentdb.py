@@ -0,0 +1,23 @@
+import pytest
+
+from benchmarks.stubs import FakeOpenTDB
+from opentdb import OpenTriviaClient, OpenTriviaError
+
+
+def test_http_429_is_retried_as_rate_limit():
+    with FakeOpenTDB(categories=1, per_pool=10, rate_limit_interval=0.2) as api:
+        with OpenTriviaClient(api.url, backoff=0.25) as client:
+            assert len(client.fetch_questions(5)) == 5
+            # Arrives inside the interval: HTTP 429, then a retry after the backoff
+            assert len(client.fetch_questions(5)) == 5
+            assert api.requests == 3
+
+
+def test_http_429_persisting_raises_rate_limit():
+    with FakeOpenTDB(categories=1, per_pool=10, rate_limit_interval=60) as api:
+        with OpenTriviaClient(api.url, retries=1, backoff=0.01) as client:
+            client.fetch_questions(5)
+            with pytest.raises(OpenTriviaError) as excinfo:
+                client.fetch_questions(5)
+            assert excinfo.value.code == 5
+            assert client.last_code == 5
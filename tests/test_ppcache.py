@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+from ppcache import TranscodeCache, chain_keys, run_chain
+
+CHAIN = [
+    {'key': 'FFmpegExtractAudio', 'preferredcodec': 'mp3'},
+    {'key': 'FFmpegMetadata'},
+    {'key': 'EmbedThumbnail'},
+]
+
+
+def fake_step(filepath, info, postprocessor):
+    """Rewrite the file like the post-processor would, recording what it read"""
+    with open(filepath, 'rb') as f:
+        data = f.read()
+    if postprocessor['key'] == 'FFmpegMetadata':
+        data += f"|title={info.get('title')}".encode()
+    elif postprocessor['key'] == 'EmbedThumbnail':
+        data += f"|thumb={info.get('thumbnail')}".encode()
+    else:
+        data += f"|{postprocessor}".encode()
+    output = filepath
+    if postprocessor['key'] == 'FFmpegExtractAudio':
+        output = os.path.splitext(filepath)[0] + '.mp3'
+        os.remove(filepath)
+    with open(output, 'wb') as f:
+        f.write(data)
+    return dict(info, filepath=output, ext=os.path.splitext(output)[1][1:])
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with TranscodeCache(tmp_path / 'cache') as cache:
+        yield cache
+
+
+def download(tmp_path, payload=b'source'):
+    path = tmp_path / 'track.webm'
+    path.write_bytes(payload)
+    return str(path)
+
+
+def process(cache, tmp_path, chain=CHAIN, **info):
+    info = dict({'id': 'abc', 'title': 'Song', 'thumbnail': 'https://img/1.jpg'}, **info)
+    result, ran = run_chain(cache, download(tmp_path), info, chain, fake_step)
+    with open(result['filepath'], 'rb') as f:
+        return f.read(), ran
+
+
+def test_identical_rerun_runs_nothing(cache, tmp_path):
+    first, ran = process(cache, tmp_path)
+    assert ran == 3
+    second, ran = process(cache, tmp_path)
+    assert (second, ran) == (first, 0)
+
+
+def test_changed_step_reuses_earlier_steps(cache, tmp_path):
+    process(cache, tmp_path)
+    chain = CHAIN[:2] + [{'key': 'EmbedThumbnail', 'already_have_thumbnail': True}]
+    _, ran = process(cache, tmp_path, chain)
+    assert ran == 1
+
+
+def test_edited_title_invalidates_metadata_step(cache, tmp_path):
+    process(cache, tmp_path)
+    output, ran = process(cache, tmp_path, title='Song (Remastered)')
+    assert ran == 2
+    assert b'title=Song (Remastered)' in output
+
+
+def test_edited_thumbnail_only_reruns_embedding(cache, tmp_path):
+    process(cache, tmp_path)
+    output, ran = process(cache, tmp_path, thumbnail='https://img/2.jpg')
+    assert ran == 1
+    assert output.endswith(b'thumb=https://img/2.jpg')
+
+
+def test_local_paths_do_not_change_keys():
+    info = {'title': 'Song', 'thumbnails': [{'url': 'https://img/1.jpg', 'filepath': '/a/t.jpg'}]}
+    moved = {'title': 'Song', 'thumbnails': [{'url': 'https://img/1.jpg', 'filepath': '/b/t.jpg'}]}
+    assert chain_keys('hash', CHAIN, info) == chain_keys('hash', CHAIN, moved)
+
+
+def test_eviction_keeps_cache_under_limit(tmp_path):
+    with TranscodeCache(tmp_path / 'cache', max_bytes=100) as cache:
+        for index in range(5):
+            process(cache, tmp_path, id=str(index), title=f'Song {index}')
+        assert cache.stats()['bytes'] <= 100
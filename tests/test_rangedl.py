@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+import rangedl
+from benchmarks.stubs import FragmentServer
+from rangedl import ChunkManifest, download_ranged
+
+SIZE = 10 * 64 * 1024
+CHUNK = 64 * 1024
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_resume_fetches_only_missing_chunks(tmp_path):
+    path = str(tmp_path / 'video.mp4')
+    with FragmentServer(SIZE) as server:
+        url = f'{server.url}/video.mp4'
+
+        def crash(d):
+            if d['status'] == 'downloading' and d['fragment_index'] == 6:
+                raise Interrupted()
+
+        with pytest.raises(Interrupted):
+            download_ranged(url, path, workers=1, chunk_size=CHUNK, progress=crash)
+        assert os.path.exists(f'{path}.chunks.json')
+
+        requests = server.requests
+        stats = download_ranged(url, path, workers=3, chunk_size=CHUNK)
+        with open(path, 'rb') as f:
+            assert f.read() == server.payload
+        assert stats['resumed_chunks'] == 6
+        assert stats['chunks'] == 4
+        # One probe plus the four missing ranges
+        assert server.requests - requests == 5
+        assert not os.path.exists(f'{path}.chunks.json')
+
+
+def test_chunks_are_synced_before_being_checkpointed(tmp_path, monkeypatch):
+    events = []
+    sync = rangedl._sync
+    mark_done = ChunkManifest.mark_done
+    monkeypatch.setattr(rangedl, '_sync', lambda fd: events.append('sync') or sync(fd))
+    monkeypatch.setattr(ChunkManifest, 'mark_done',
+                        lambda self, index: events.append('done') or mark_done(self, index))
+    with FragmentServer(SIZE) as server:
+        download_ranged(f'{server.url}/video.mp4', str(tmp_path / 'video.mp4'), workers=1, chunk_size=CHUNK)
+    assert events == ['sync', 'done'] * 10
+
+
+def test_error_status_leaves_no_file(tmp_path):
+    path = tmp_path / 'video.mp4'
+    with FragmentServer(status=403) as server:
+        with pytest.raises(OSError, match='HTTP 403'):
+            download_ranged(f'{server.url}/video.mp4', str(path))
+    assert not path.exists()
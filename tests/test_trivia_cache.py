@@ -0,0 +1,78 @@
+import json
+import threading
+
+import pytest
+
+from benchmarks.stubs import FakeOpenTDB
+from quizapp import TriviaCache, TriviaQuizApp
+
+
+@pytest.fixture
+def api():
+    with FakeOpenTDB(categories=2, per_pool=30) as server:
+        yield server
+
+
+def make_app(api, tmp_path):
+    return TriviaQuizApp(api.url, cache_path=str(tmp_path / 'cache.json'))
+
+
+def test_take_questions_serves_from_pool(api, tmp_path):
+    app = make_app(api, tmp_path)
+    first = app.cache.take_questions(5, None, "medium")
+    app.cache.wait_for_refills()
+    requests = api.requests
+    second = app.cache.take_questions(5, None, "medium")
+    assert len(first) == len(second) == 5
+    assert api.requests == requests
+    assert not {q['question'] for q in first} & {q['question'] for q in second}
+
+
+def test_small_category_falls_back_to_requested_amount(api, tmp_path):
+    # 30 questions per category and difficulty: a 50-question pool fill gets code 1
+    app = make_app(api, tmp_path)
+    questions = app.cache.take_questions(5, 9, "hard")
+    assert len(questions) == 5
+    assert all(q['difficulty'] == 'hard' for q in questions)
+    app.cache.wait_for_refills()
+    assert len(app.cache.take_questions(5, 9, "hard")) == 5
+
+
+def test_unavailable_amount_returns_none(api, tmp_path):
+    app = make_app(api, tmp_path)
+    assert app.cache.take_questions(40, 9, "hard") is None
+
+
+def test_cache_survives_restart(api, tmp_path):
+    app = make_app(api, tmp_path)
+    categories = app.get_categories()
+    app.cache.take_questions(5, None, "easy")
+    app.cache.wait_for_refills()
+
+    reloaded = TriviaCache(lambda: pytest.fail("categories refetched"),
+                           lambda *args: pytest.fail("questions refetched"),
+                           str(tmp_path / 'cache.json'))
+    assert reloaded.get_categories() == categories
+    assert len(reloaded.take_questions(5, None, "easy")) == 5
+
+
+def test_concurrent_saves_leave_valid_file(tmp_path):
+    path = tmp_path / 'cache.json'
+    cache = TriviaCache(lambda: [], lambda *args: [], str(path))
+    errors = []
+
+    def save():
+        try:
+            for _ in range(50):
+                cache.save()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    assert json.loads(path.read_text())['pools'] == {}
+    assert [p.name for p in tmp_path.iterdir()] == ['cache.json']
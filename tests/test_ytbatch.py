@@ -0,0 +1,93 @@
+import os
+
+import pytest
+
+from benchmarks.stubs import FakeYoutubeDL
+from bandwidth import BandwidthScheduler
+from mediastore import MediaStore
+from ytbatch import Job, run_batch
+from ytmeta import MetadataCatalogue
+
+PLAYLIST = 'https://stub.invalid/playlist?list=batch'
+SIZE = 5
+
+
+@pytest.fixture
+def ydl_class():
+    class StubYDL(FakeYoutubeDL):
+        playlist_size = SIZE
+        page_latency = 0.0
+        resolve_latency = 0.0
+        file_size = 1000
+        failing = set()
+
+        def _download(self, info):
+            if info['id'] in self.failing:
+                return None
+            return super()._download(info)
+
+    StubYDL.reset()
+    return StubYDL
+
+
+@pytest.fixture
+def store(tmp_path):
+    with MediaStore(tmp_path / 'store') as store:
+        yield store
+
+
+def files(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith('.mp4'))
+
+
+def test_duplicates_in_one_directory_download_once(tmp_path, ydl_class):
+    out = str(tmp_path / 'a')
+    report = run_batch([Job(PLAYLIST, 'video', out), Job(PLAYLIST, 'video', out)], ydl_class=ydl_class)
+    assert ydl_class.downloads == SIZE
+    assert (report['succeeded'], report['duplicates'], report['failed']) == (SIZE, SIZE, 0)
+    assert len(files(out)) == SIZE
+
+
+def test_other_directory_downloads_again_without_a_store(tmp_path, ydl_class):
+    a, b = str(tmp_path / 'a'), str(tmp_path / 'b')
+    report = run_batch([Job(PLAYLIST, 'video', a), Job(PLAYLIST, 'video', b)], ydl_class=ydl_class)
+    assert ydl_class.downloads == 2 * SIZE
+    assert (report['succeeded'], report['duplicates'], report['linked']) == (2 * SIZE, 0, 0)
+    assert files(a) == files(b)
+
+
+def test_store_links_duplicates_across_directories(tmp_path, ydl_class, store):
+    a, b = str(tmp_path / 'a'), str(tmp_path / 'b')
+    scheduler = BandwidthScheduler()
+    jobs = [Job(PLAYLIST, 'video', a, priority=1), Job(PLAYLIST, 'video', b)]
+    report = run_batch(jobs, ydl_class=ydl_class, store=store, scheduler=scheduler)
+    assert ydl_class.downloads == SIZE
+    assert (report['succeeded'], report['duplicates'], report['linked']) == (2 * SIZE, SIZE, SIZE)
+    assert files(a) == files(b)
+    for name in files(a):
+        assert os.path.samefile(os.path.join(a, name), os.path.join(b, name))
+    # Bytes are charged to the job that owns the download only
+    assert scheduler.jobs[PLAYLIST].bytes == SIZE * ydl_class.file_size
+    assert report['bytes'] == SIZE * ydl_class.file_size
+
+
+def test_failed_shared_download_fails_every_alias(tmp_path, ydl_class, store):
+    ydl_class.failing = {'vid000000'}
+    a, b = str(tmp_path / 'a'), str(tmp_path / 'b')
+    report = run_batch([Job(PLAYLIST, 'video', a), Job(PLAYLIST, 'video', b)], ydl_class=ydl_class, store=store)
+    assert report['failed'] == 2
+    assert report['succeeded'] == 2 * (SIZE - 1)
+    assert {failure['error'] for failure in report['failures']} == {
+        "extraction failed", "shared download failed or was not stored"}
+    assert len(files(b)) == SIZE - 1
+
+
+def test_metadata_jobs_write_one_catalogue_per_directory(tmp_path, ydl_class, store):
+    a, b = str(tmp_path / 'a'), str(tmp_path / 'b')
+    report = run_batch([Job(PLAYLIST, 'metadata', a), Job(PLAYLIST, 'metadata', b)],
+                       ydl_class=ydl_class, store=store)
+    assert ydl_class.downloads == 0
+    assert (report['succeeded'], report['linked']) == (2 * SIZE, 0)
+    for directory in (a, b):
+        with MetadataCatalogue(os.path.join(directory, 'metadata.sqlite3')) as catalogue:
+            assert len(catalogue) == SIZE
@@ -0,0 +1,94 @@
+import random
+import threading
+import time
+
+from ytpool import run_pool
+
+
+class StubYDL:
+    """Minimal YoutubeDL stand-in; failing is set to the number of instances that fail to build"""
+
+    failing = 0
+    lock = threading.Lock()
+
+    def __init__(self, params):
+        with StubYDL.lock:
+            if StubYDL.failing:
+                StubYDL.failing -= 1
+                raise RuntimeError("no extractors")
+        self.params = params
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+def collect(reports):
+    def report(index, item, result, error):
+        reports.append((index, item, result, error))
+    return report
+
+
+def test_reports_in_input_order():
+    rng = random.Random(0)
+    delays = {n: rng.random() / 100 for n in range(40)}
+    reports = []
+
+    def task(ydl, item):
+        time.sleep(delays[item])
+        return item * 2
+
+    summary = run_pool(range(40), task, {}, workers=6, ydl_class=StubYDL, report=collect(reports))
+    assert [index for index, *_ in reports] == list(range(1, 41))
+    assert [result for _, _, result, _ in reports] == [n * 2 for n in range(40)]
+    assert summary['total'] == summary['succeeded'] == 40
+
+
+def test_failed_setup_fails_items_without_hanging():
+    StubYDL.failing = 2
+    reports = []
+    summary = run_pool(range(30), lambda ydl, item: item, {}, workers=2, ydl_class=StubYDL,
+                       report=collect(reports))
+    assert (summary['total'], summary['succeeded'], summary['failed']) == (30, 0, 30)
+    assert all(isinstance(error, RuntimeError) for *_, error in reports)
+
+
+def test_report_errors_do_not_stop_the_pool(capsys):
+    seen = []
+
+    def report(index, item, result, error):
+        seen.append(index)
+        if index % 2:
+            raise ValueError("display failed")
+
+    summary = run_pool(range(10), lambda ydl, item: item, {}, workers=3, ydl_class=StubYDL, report=report)
+    assert seen == list(range(1, 11))
+    assert summary['succeeded'] == 10
+    assert "Error reporting item 1" in capsys.readouterr().out
+
+
+def test_slow_item_bounds_work_in_flight():
+    release = threading.Event()
+    consumed = []
+
+    def items():
+        for n in range(100):
+            consumed.append(n)
+            yield n
+
+    def task(ydl, item):
+        if item == 0:
+            release.wait(5)
+        return item
+
+    workers = 2
+    runner = threading.Thread(target=run_pool, args=(items(), task, {}, workers, StubYDL))
+    runner.start()
+    time.sleep(0.2)
+    # Everything behind the slow first item waits, instead of being buffered
+    assert len(consumed) <= workers * 3 + 1
+    release.set()
+    runner.join(5)
+    assert len(consumed) == 100
@@ -1,14 +1,31 @@
-import yt_dlp
+import argparse
 import os
 from pathlib import Path
+from ytpool import download_concurrently, entry_url, iter_playlist, shared_ydls
+from ytpipeline import download_pipelined
+from download_archive import DownloadArchive
+from bandwidth import add_throttle
 
-def download_playlist(url, output_dir='downloads'):
+def download_playlist(url, output_dir='downloads', workers=1, pipeline=False, archive=None,
+                      stream=False, scheduler=None, store=None, transcode_cache=None):
     """
     Download audio from YouTube playlist videos in MP3 format
     
     Args:
         url (str): YouTube playlist URL
         output_dir (str): Directory to save downloaded audio files
+        workers (int): Number of tracks to download in parallel
+        pipeline (bool): Run MP3 extraction in a separate process pool
+            while the next tracks are downloading
+        archive (DownloadArchive): Index of finished downloads; tracks already
+            in it are skipped
+        stream (bool): Start downloading while the playlist is still being
+            enumerated instead of resolving every entry first
+        scheduler (BandwidthScheduler): Shared bandwidth caps to download under
+        store (MediaStore): Shared store of finished downloads; tracks already
+            in it are linked into output_dir instead of being downloaded
+        transcode_cache (str): Directory caching MP3 extractions between runs
+            (pipeline mode only)
     """
     # Create output directory if it doesn't exist
     output_path = Path(output_dir)
@@ -17,7 +34,7 @@ def download_playlist(url, output_dir='downloads'):
     # Configure yt-dlp options for mp3 extraction
     ydl_opts = {
         'format': 'bestaudio/best',
-        'outtmpl': str(output_path / '%(title)s.%(ext)s'),
+        'outtmpl': str(output_path / '%(title)s [%(id)s].%(ext)s'),
         'ignoreerrors': True,  # Skip unavailable videos
         'extract_flat': True,  # Extract playlist info without downloading
         'quiet': False,
@@ -28,10 +45,28 @@ def download_playlist(url, output_dir='downloads'):
             'preferredquality': '192',
         }],
     }
+    if scheduler is not None:
+        ydl_opts = add_throttle(ydl_opts, scheduler.job(url))
+    variant = store.variant_for(ydl_opts) if store is not None else None
     
     try:
+        if stream:
+            with shared_ydls.borrow(ydl_opts) as ydl:
+                entries = iter_playlist(ydl, url, on_total=lambda n: print(f"Found {n} tracks in playlist"))
+                if store is not None:
+                    entries = store.missing(entries, variant, output_path)
+                video_urls = (entry_url(entry) for entry in entries
+                              if archive is None or entry.get('id') not in archive)
+                if pipeline:
+                    download_pipelined(filter(None, video_urls), ydl_opts, fetch_workers=workers,
+                                       cache_dir=transcode_cache, archive=archive, store=store, variant=variant)
+                else:
+                    download_concurrently(filter(None, video_urls), ydl_opts, workers,
+                                          archive=archive, store=store)
+            return
+        
         # First get playlist info
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with shared_ydls.borrow(ydl_opts) as ydl:
             playlist_info = ydl.extract_info(url, download=False)
             if not playlist_info:
                 print("Could not retrieve playlist information")
@@ -40,13 +75,37 @@ def download_playlist(url, output_dir='downloads'):
             total_tracks = len(playlist_info['entries'])
             print(f"Found {total_tracks} tracks in playlist")
             
+            if archive is not None:
+                playlist_info['entries'] = [entry for entry in playlist_info['entries']
+                                            if entry and entry.get('id') not in archive]
+                total_tracks = len(playlist_info['entries'])
+                print(f"{total_tracks} of them are not in the download archive yet")
+            
+            if store is not None:
+                playlist_info['entries'] = list(store.missing(playlist_info['entries'], variant, output_path))
+                print(f"Linked {total_tracks - len(playlist_info['entries'])} tracks from the media store")
+                total_tracks = len(playlist_info['entries'])
+            
+            if workers > 1 or pipeline:
+                video_urls = [entry['url'] for entry in playlist_info['entries'] if entry]
+                if pipeline:
+                    download_pipelined(video_urls, ydl_opts, fetch_workers=workers,
+                                       cache_dir=transcode_cache, archive=archive, store=store, variant=variant)
+                else:
+                    download_concurrently(video_urls, ydl_opts, workers, archive=archive, store=store)
+                return
+            
             # Now download each track
             for index, entry in enumerate(playlist_info['entries'], 1):
                 if entry:
                     print(f"\nDownloading track {index}/{total_tracks}")
                     video_url = entry['url']
                     try:
-                        ydl.download([video_url])
+                        info = ydl.extract_info(video_url, download=True)
+                        if info and store is not None:
+                            store.adopt_info(ydl, info, variant)
+                        if info and archive is not None:
+                            archive.record_info(ydl, info)
                     except Exception as e:
                         print(f"Error downloading track {index}: {str(e)}")
                         continue
@@ -54,17 +113,67 @@ def download_playlist(url, output_dir='downloads'):
     except Exception as e:
         print(f"An error occurred: {str(e)}")
 
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} is not a positive number")
+    return number
+
 def main():
+    parser = argparse.ArgumentParser(description="Download a YouTube playlist as MP3 files")
+    parser.add_argument('url', nargs='?', help="Playlist URL (prompted for when omitted)")
+    parser.add_argument('--output-dir', help="Directory to save the MP3 files")
+    parser.add_argument('--workers', type=positive_int, help="Number of parallel downloads")
+    parser.add_argument('--stream', action='store_true',
+                        help="Start downloading while the playlist is still being enumerated")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="Extract MP3s in a process pool while the next tracks download")
+    parser.add_argument('--transcode-cache', help="Directory caching MP3 extractions between runs (with --pipeline)")
+    parser.add_argument('--store', help="Media store directory shared with other downloads")
+    parser.add_argument('--no-archive', action='store_true',
+                        help="Download every track even if the output directory already has it")
+    parser.add_argument('--rate', type=float, help="Bandwidth cap in bytes/sec")
+    args = parser.parse_args()
+    
     # Get playlist URL from user
-    playlist_url = input("Enter YouTube playlist URL: ")
+    playlist_url = args.url or input("Enter YouTube playlist URL: ")
     
     # Get output directory
-    output_dir = input("Enter output directory [default: downloads]: ") or 'downloads'
+    output_dir = args.output_dir or input("Enter output directory [default: downloads]: ") or 'downloads'
+    
+    # Get number of parallel downloads
+    workers = args.workers
+    while workers is None:
+        try:
+            workers = positive_int(input("Enter number of parallel downloads [default: 1]: ").strip() or 1)
+        except (ValueError, argparse.ArgumentTypeError):
+            print("Please enter a whole number of at least 1")
+    
+    scheduler = None
+    if args.rate:
+        from bandwidth import BandwidthScheduler
+        scheduler = BandwidthScheduler(args.rate)
+    store = None
+    if args.store:
+        from mediastore import MediaStore
+        store = MediaStore(args.store)
     
     # Download the playlist
     print(f"\nDownloading playlist to {output_dir} in MP3 format...")
-    download_playlist(playlist_url, output_dir)
+    archive = None
+    try:
+        if not args.no_archive:
+            archive = DownloadArchive(Path(output_dir) / '.download_archive.sqlite3')
+        download_playlist(playlist_url, output_dir, workers, pipeline=args.pipeline, archive=archive,
+                          stream=args.stream, scheduler=scheduler, store=store,
+                          transcode_cache=args.transcode_cache)
+    finally:
+        if archive is not None:
+            archive.close()
+        if store is not None:
+            store.close()
     print("\nDownload complete!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,320 @@
+import csv
+import json
+import queue
+import threading
+import time
+from pathlib import Path
+
+from bandwidth import BandwidthScheduler, throttle_hook
+from mediastore import format_variant
+from ytmeta import METADATA_OPTS, MetadataCatalogue, slim_info
+from ytpool import _default_ydl_class, entry_url, iter_playlist
+
+MODES = ('audio', 'video', 'metadata')
+
+MODE_OPTS = {
+    # Same settings as yt.py
+    'audio': {
+        'format': 'bestaudio/best',
+        'ignoreerrors': True,
+        'quiet': True,
+        'postprocessors': [{
+            'key': 'FFmpegExtractAudio',
+            'preferredcodec': 'mp3',
+            'preferredquality': '192',
+        }],
+    },
+    # Same settings as ytnew.py
+    'video': {
+        'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+        'ignoreerrors': True,
+        'quiet': True,
+        'merge_output_format': 'mp4',
+        'postprocessors': [{'key': 'FFmpegMetadata'}],
+    },
+    'metadata': METADATA_OPTS,
+}
+
+
+class Job:
+    """One manifest row: a video or playlist URL and how to fetch it"""
+
+    __slots__ = ('url', 'mode', 'output_dir', 'format', 'priority', 'line', 'stats')
+
+    def __init__(self, url, mode='video', output_dir='downloads', format=None, priority=0, line=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown mode {mode!r} (expected one of {', '.join(MODES)})")
+        self.url = url
+        self.mode = mode
+        self.output_dir = output_dir or 'downloads'
+        self.format = format or None
+        self.priority = int(priority or 0)
+        self.line = line
+        self.stats = {'items': 0, 'succeeded': 0, 'failed': 0, 'duplicates': 0, 'linked': 0}
+
+    def __repr__(self):
+        return f"Job({self.url!r}, mode={self.mode!r}, output_dir={self.output_dir!r})"
+
+    def ydl_opts(self):
+        """Return the yt-dlp options of this job, minus the output directory"""
+        opts = dict(MODE_OPTS[self.mode], outtmpl='%(title)s [%(id)s].%(ext)s')
+        if self.format:
+            opts['format'] = self.format
+        return opts
+
+    def variant(self):
+        """Return the key two jobs must share to reuse each other's downloads"""
+        return 'metadata' if self.mode == 'metadata' else format_variant(self.ydl_opts())
+
+
+def read_manifest(path):
+    """
+    Read batch jobs from a CSV or JSONL manifest
+
+    CSV files need a header row; both formats use the fields url, mode
+    (audio, video or metadata), output_dir, format and priority. Only url
+    is required. Invalid rows are reported and skipped.
+
+    Args:
+        path (str): Manifest file (.csv, or anything else for JSONL)
+
+    Returns:
+        list: Jobs in file order
+    """
+    jobs = []
+    with open(path, newline='', encoding='utf-8') as f:
+        if str(path).lower().endswith('.csv'):
+            rows = ((line, row) for line, row in enumerate(csv.DictReader(f), 2))
+        else:
+            rows = ((line, json.loads(text)) for line, text in enumerate(f, 1) if text.strip())
+        for line, row in rows:
+            try:
+                if not row.get('url'):
+                    raise ValueError("missing url")
+                jobs.append(Job(row['url'].strip(), (row.get('mode') or 'video').strip(),
+                                row.get('output_dir'), row.get('format'), row.get('priority'), line))
+            except (ValueError, TypeError) as e:
+                print(f"Skipping manifest line {line}: {str(e)}")
+    return jobs
+
+
+def run_batch(jobs, workers=4, ydl_class=None, store=None, scheduler=None, ydl_opts=None):
+    """
+    Run many download and metadata jobs through one worker pool
+
+    Jobs are expanded highest priority first (manifest order breaks ties)
+    and their videos are fed to a single pool as the playlists are listed.
+    A video that several jobs ask for in the same mode and format is only
+    fetched once per output directory; with a media store, downloads are
+    shared across directories too and the other jobs get links to them
+    (a link that cannot be made counts as a failure). Every
+    worker keeps one YoutubeDL per (mode, format) and reuses it for all
+    jobs, so extractor instances and their caches are shared.
+
+    Args:
+        jobs (list): Jobs to run
+        workers (int): Number of parallel downloads
+        ydl_class (type): YoutubeDL-compatible class (defaults to yt_dlp.YoutubeDL)
+        store (MediaStore): Shared store for downloads; enables cross-job links
+        scheduler (BandwidthScheduler): Shared bandwidth caps (one per job)
+        ydl_opts (dict): Extra yt-dlp options applied to every job
+
+    Returns:
+        dict: Aggregated totals, throughput, per-job stats and failures
+    """
+    ydl_class = ydl_class or _default_ydl_class()
+    scheduler = scheduler or BandwidthScheduler()
+    extra_opts = dict(ydl_opts or {})
+    jobs = sorted(jobs, key=lambda job: -job.priority)
+    items = queue.Queue(maxsize=workers * 2)
+    lock = threading.Lock()
+    owners = {}
+    aliases = {}
+    catalogues = {}
+    failures = []
+
+    def fail(job, url, error):
+        with lock:
+            job.stats['failed'] += 1
+            failures.append({'job': job.url, 'url': url, 'error': str(error)})
+
+    hooks = {job: throttle_hook(scheduler.job(job.url)) for job in jobs}
+
+    def charge(d):
+        # One hook for every job: bytes are charged to the job that owns the video
+        owner = owners.get((d.get('info_dict') or {}).get('id'))
+        if owner is not None:
+            hooks[owner](d)
+
+    def catalogue_for(job):
+        path = str(Path(job.output_dir) / 'metadata.sqlite3')
+        with lock:
+            if path not in catalogues:
+                catalogues[path] = MetadataCatalogue(path)
+            return catalogues[path]
+
+    def process(ydls, job, url):
+        key = (job.mode, job.format)
+        ydl = ydls.get(key)
+        if ydl is None:
+            opts = dict(job.ydl_opts(), **extra_opts)
+            opts['progress_hooks'] = list(opts.get('progress_hooks', [])) + [charge]
+            ydl = ydls[key] = ydl_class(opts).__enter__()
+        # Each worker owns its instances, so switching the output directory is safe
+        ydl.params['paths'] = {'home': job.output_dir}
+        if job.mode == 'metadata':
+            info = ydl.extract_info(url, download=False)
+            if info:
+                catalogue_for(job).record(url, slim_info(ydl, info))
+            return info
+        info = ydl.extract_info(url, download=True)
+        if info and store is not None:
+            store.adopt_info(ydl, info, job.variant())
+        return info
+
+    def worker():
+        ydls = {}
+        try:
+            while True:
+                item = items.get()
+                if item is None:
+                    break
+                job, video_id, url = item
+                try:
+                    info = process(ydls, job, url)
+                except Exception as e:
+                    fail(job, url, e)
+                    continue
+                if info is None:
+                    fail(job, url, "extraction failed")
+                    continue
+                with lock:
+                    job.stats['succeeded'] += 1
+        finally:
+            for ydl in ydls.values():
+                ydl.__exit__(None, None, None)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, workers))]
+    for thread in threads:
+        thread.start()
+
+    seen = {}
+    try:
+        with ydl_class(dict(METADATA_OPTS, extract_flat='in_playlist', **extra_opts)) as lister:
+            for job in jobs:
+                Path(job.output_dir).mkdir(parents=True, exist_ok=True)
+                variant = job.variant()
+                # Only the store can hand a file to another directory
+                shared = store is not None and job.mode != 'metadata'
+                try:
+                    for entry in iter_playlist(lister, job.url):
+                        url = entry_url(entry)
+                        video_id = entry.get('id') or url
+                        job.stats['items'] += 1
+                        key = (video_id, variant) if shared else (video_id, variant, job.output_dir)
+                        primary = seen.get(key)
+                        if primary is not None:
+                            job.stats['duplicates'] += 1
+                            if primary.output_dir != job.output_dir:
+                                aliases.setdefault((video_id, variant), []).append(job)
+                            continue
+                        seen[key] = job
+                        if shared and store.link(video_id, variant, job.output_dir):
+                            job.stats['linked'] += 1
+                            job.stats['succeeded'] += 1
+                            continue
+                        owners[video_id] = job
+                        items.put((job, video_id, url))
+                except Exception as e:
+                    fail(job, job.url, e)
+    finally:
+        for _ in threads:
+            items.put(None)
+        for thread in threads:
+            thread.join()
+        for catalogue in catalogues.values():
+            catalogue.close()
+
+    # Jobs that shared a video with an earlier one get a link to its file
+    for (video_id, variant), others in aliases.items():
+        for job in others:
+            if store.link(video_id, variant, job.output_dir):
+                job.stats['linked'] += 1
+                job.stats['succeeded'] += 1
+            else:
+                fail(job, video_id, "shared download failed or was not stored")
+
+    elapsed = time.perf_counter() - start
+    bandwidth = scheduler.stats()
+    processed = sum(job.stats['succeeded'] + job.stats['failed'] for job in jobs)
+    return {
+        'jobs': len(jobs),
+        'items': sum(job.stats['items'] for job in jobs),
+        'succeeded': sum(job.stats['succeeded'] for job in jobs),
+        'failed': sum(job.stats['failed'] for job in jobs),
+        'duplicates': sum(job.stats['duplicates'] for job in jobs),
+        'linked': sum(job.stats['linked'] for job in jobs),
+        'elapsed': elapsed,
+        'items_per_sec': processed / elapsed if elapsed > 0 else 0.0,
+        'bytes': bandwidth['bytes'],
+        'bytes_per_sec': bandwidth['bytes'] / elapsed if elapsed > 0 else 0.0,
+        'per_job': [dict(job.stats, url=job.url, mode=job.mode, output_dir=job.output_dir)
+                    for job in jobs],
+        'failures': failures,
+    }
+
+
+def print_report(report):
+    """
+    Print the aggregated result of run_batch
+
+    Args:
+        report (dict): Result of run_batch
+    """
+    print("\n=== Batch Summary ===")
+    print(f"Jobs: {report['jobs']}, videos: {report['items']} "
+          f"({report['duplicates']} duplicates, {report['linked']} linked from the store)")
+    print(f"Succeeded: {report['succeeded']}, failed: {report['failed']}")
+    print(f"Wall time: {report['elapsed']:.1f}s, {report['items_per_sec']:.2f} videos/s, "
+          f"{report['bytes_per_sec'] / 1e6:.2f} MB/s")
+    for job in report['per_job']:
+        print(f"  [{job['mode']:<8}] {job['url']} -> {job['output_dir']}: "
+              f"{job['succeeded']}/{job['items']} ok, {job['failed']} failed")
+    for failure in report['failures'][:20]:
+        print(f"  FAILED {failure['url']}: {failure['error']}")
+    if len(report['failures']) > 20:
+        print(f"  ... and {len(report['failures']) - 20} more failures")
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run every job in a CSV or JSONL manifest")
+    parser.add_argument('manifest', help="CSV (with header) or JSONL file of url, mode, output_dir, format, priority")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--store', help="Media store directory shared by all jobs")
+    parser.add_argument('--global-rate', type=float, help="Total bandwidth cap in bytes/sec")
+    parser.add_argument('--job-rate', type=float, help="Per-job bandwidth cap in bytes/sec")
+    parser.add_argument('--report', help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    jobs = read_manifest(args.manifest)
+    scheduler = BandwidthScheduler(args.global_rate, args.job_rate)
+    store = None
+    if args.store:
+        from mediastore import MediaStore
+        store = MediaStore(args.store)
+    try:
+        report = run_batch(jobs, args.workers, store=store, scheduler=scheduler)
+    finally:
+        if store is not None:
+            store.close()
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from ytpool import _default_ydl_class, entry_url, iter_playlist, run_pool
+
+# Bulky per-format and per-track lists that a catalogue rarely needs
+HEAVY_FIELDS = ('formats', 'requested_formats', 'thumbnails', 'subtitles',
+                'automatic_captions', 'heatmap', 'requested_downloads')
+
+METADATA_OPTS = {
+    'skip_download': True,
+    'quiet': True,
+    'no_warnings': True,
+    'ignoreerrors': True,
+    'writeinfojson': False,
+    'writethumbnail': False,
+    'writedescription': False,
+    'writesubtitles': False,
+    'writeautomaticsub': False,
+    'postprocessors': [],
+}
+
+
+class MetadataCatalogue:
+    """
+    SQLite catalogue of video metadata keyed by video ID
+
+    Frequently queried fields get their own columns; the rest of the info
+    dict is kept as JSON. Every row records when it was fetched, so a
+    refresh can re-extract only entries older than a given age.
+    """
+
+    def __init__(self, path='metadata.sqlite3'):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                title TEXT,
+                uploader TEXT,
+                duration REAL,
+                upload_date TEXT,
+                view_count INTEGER,
+                fetched_at REAL NOT NULL,
+                info TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS videos_by_url ON videos (url);
+        """)
+        self._pending = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def fetched_at(self):
+        """
+        Return when every catalogued video was last fetched
+
+        Returns:
+            dict: Both video ID and URL -> fetched_at timestamp
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT video_id, url, fetched_at FROM videos").fetchall()
+        fetched = {}
+        for video_id, url, at in rows:
+            fetched[video_id] = fetched[url] = at
+        return fetched
+
+    def record(self, url, info, commit_every=200):
+        """
+        Store or replace the metadata of one video
+
+        Writes are committed in batches; close() commits the remainder.
+
+        Args:
+            url (str): URL the metadata was extracted from
+            info (dict): JSON-serializable info dict
+            commit_every (int): Rows per transaction
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (info['id'], url, info.get('title'), info.get('uploader'), info.get('duration'),
+                 info.get('upload_date'), info.get('view_count'), time.time(),
+                 json.dumps(info, separators=(',', ':'))))
+            self._pending += 1
+            if self._pending >= commit_every:
+                self._conn.commit()
+                self._pending = 0
+
+    def get(self, video_id):
+        """Return the stored info dict of a video, or None"""
+        with self._lock:
+            row = self._conn.execute("SELECT info FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def export_jsonl(self, path):
+        """
+        Write the whole catalogue as one JSON object per line
+
+        Args:
+            path (str): Destination file
+
+        Returns:
+            int: Number of videos written
+        """
+        count = 0
+        with self._lock:
+            self._conn.commit()
+            rows = self._conn.execute("SELECT info FROM videos ORDER BY video_id")
+            with open(path, 'w', encoding='utf-8') as f:
+                for (info,) in rows:
+                    f.write(info + '\n')
+                    count += 1
+        return count
+
+
+def slim_info(ydl, info, keep_heavy=False):
+    """
+    Make an info dict JSON-safe and drop the bulky per-format lists
+
+    Args:
+        ydl (YoutubeDL): Instance that extracted info
+        info (dict): Info dict from extract_info
+        keep_heavy (bool): Keep formats, thumbnails and subtitle lists
+
+    Returns:
+        dict: Catalogue record
+    """
+    info = ydl.sanitize_info(info)
+    if keep_heavy:
+        return info
+    return {key: value for key, value in info.items() if key not in HEAVY_FIELDS}
+
+
+def harvest(items, catalogue, workers=8, max_age=None, ydl_opts=None, ydl_class=None,
+            jsonl=None, keep_heavy=False):
+    """
+    Extract metadata for many videos concurrently without downloading media
+
+    Nothing is written per video: there are no info-JSON, thumbnail or
+    description files and no post-processors run. Results go straight into
+    the catalogue, and optionally to a JSONL stream, in input order.
+
+    Args:
+        items (iterable): Video URLs or playlist entries (dicts with id and url)
+        catalogue (MetadataCatalogue): Where to store the results
+        workers (int): Number of parallel extractions
+        max_age (float): Only re-extract entries older than this many seconds;
+            None re-extracts everything, 0 only fills in missing entries
+        ydl_opts (dict): Extra yt-dlp options (cookies, proxies, ...)
+        ydl_class (type): YoutubeDL-compatible class (defaults to yt_dlp.YoutubeDL)
+        jsonl (file): Open text file that also receives one JSON record per line
+        keep_heavy (bool): Keep formats, thumbnails and subtitle lists
+
+    Returns:
+        dict: Summary with total, succeeded, failed, skipped, elapsed and items_per_sec
+    """
+    ydl_opts = dict(ydl_opts or {}, **METADATA_OPTS)
+    fetched = catalogue.fetched_at() if max_age is not None else {}
+    cutoff = time.time() - max_age if max_age else None
+    skipped = [0]
+
+    def due(item):
+        url = entry_url(item) if isinstance(item, dict) else item
+        video_id = item.get('id') if isinstance(item, dict) else None
+        at = fetched.get(video_id) or fetched.get(url)
+        if at is not None and (cutoff is None or at >= cutoff):
+            skipped[0] += 1
+            return None
+        return url
+
+    def task(ydl, url):
+        info = ydl.extract_info(url, download=False)
+        return slim_info(ydl, info, keep_heavy) if info else None
+
+    def report(index, url, info, error):
+        if error is not None or info is None or not info.get('id'):
+            print(f"Failed to extract {url}: {error or 'no metadata'}")
+            return
+        catalogue.record(url, info)
+        if jsonl is not None:
+            jsonl.write(json.dumps(info, separators=(',', ':')) + '\n')
+
+    items = filter(None, map(due, items))
+    summary = run_pool(items, task, ydl_opts, workers, ydl_class, report)
+    summary['skipped'] = skipped[0]
+    elapsed = summary['elapsed']
+    summary['items_per_sec'] = summary['total'] / elapsed if elapsed > 0 else 0.0
+    print(f"Harvested {summary['succeeded']}/{summary['total']} videos "
+          f"({summary['skipped']} up to date) in {elapsed:.1f}s, "
+          f"{summary['items_per_sec']:.1f} items/s")
+    return summary
+
+
+def expand(urls, ydl_class=None):
+    """
+    Yield the entries of every playlist URL, and video URLs as they are
+
+    Entries come from flat, lazy playlist enumeration, so their IDs are
+    known before any video is resolved.
+    """
+    ydl_class = ydl_class or _default_ydl_class()
+    with ydl_class(dict(METADATA_OPTS, extract_flat='in_playlist')) as ydl:
+        for url in urls:
+            yield from iter_playlist(ydl, url)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Harvest video metadata into a catalogue without downloading")
+    parser.add_argument('urls', nargs='+', help="Video or playlist URLs")
+    parser.add_argument('--catalogue', default='metadata.sqlite3', help="SQLite catalogue to create or update")
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--max-age', type=float,
+                        help="Only refresh entries older than this many hours (0: only missing ones)")
+    parser.add_argument('--jsonl', help="Also append every record to this JSONL file")
+    parser.add_argument('--export', help="Write the whole catalogue to this JSONL file afterwards")
+    args = parser.parse_args()
+
+    max_age = args.max_age * 3600 if args.max_age is not None else None
+    jsonl = open(args.jsonl, 'a', encoding='utf-8') if args.jsonl else None
+    try:
+        with MetadataCatalogue(args.catalogue) as catalogue:
+            harvest(expand(args.urls), catalogue, args.workers, max_age, jsonl=jsonl)
+            if args.export:
+                print(f"Exported {catalogue.export_jsonl(args.export)} videos to {args.export}")
+    finally:
+        if jsonl is not None:
+            jsonl.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import bisect
+import json
+import sys
+import threading
+import time
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative counts, Prometheus style)"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def to_dict(self):
+        cumulative, running = {}, 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            running += count
+            cumulative['+Inf' if bound == float('inf') else str(bound)] = running
+        return {'count': self.count, 'sum': self.total, 'buckets': cumulative}
+
+
+class _Track:
+    __slots__ = ('started', 'finished', 'bytes', 'fragment', 'fragment_at')
+
+    def __init__(self, now):
+        self.started = now
+        self.finished = None
+        self.bytes = 0
+        self.fragment = None
+        self.fragment_at = now
+
+
+class DownloadMetrics:
+    """
+    Metrics collector for yt-dlp downloads
+
+    Plugs into yt-dlp through its progress hooks, post-processor hooks,
+    retry sleep functions and logger (use ydl_options()). Callbacks only
+    update counters; the console line is redrawn at most once per refresh
+    interval and yt-dlp's own progress lines are turned off.
+    """
+
+    def __init__(self, refresh_interval=0.5, stream=None, quiet=False):
+        self.refresh_interval = refresh_interval
+        self.stream = stream or sys.stdout
+        self.quiet = quiet
+        self.started = time.monotonic()
+        self.tracks = {}
+        self.fragment_latency = Histogram()
+        self.postprocessors = {}
+        self.retries = 0
+        self.fragment_retries = 0
+        self.errors = 0
+        self.callbacks = 0
+        self.log_quiet = False
+        self.verbose = False
+        # yt-dlp calls these once per retry to ask how long to sleep
+        self.retry_sleep_functions = {
+            'http': lambda n: self._count_retry('retries'),
+            'extractor': lambda n: self._count_retry('retries'),
+            'fragment': lambda n: self._count_retry('fragment_retries'),
+        }
+        self._pp_started = {}
+        self._last_render = 0.0
+        self._lock = threading.Lock()
+
+    def ydl_options(self, quiet=False, verbose=False):
+        """
+        Return the yt-dlp options that route callbacks into this collector
+
+        yt-dlp hands every message to the logger regardless of its own quiet
+        and verbose options, so pass them here as well.
+
+        Args:
+            quiet (bool): Drop yt-dlp's informational messages
+            verbose (bool): Print yt-dlp's [debug] messages
+
+        Returns:
+            dict: progress_hooks, postprocessor_hooks, retry_sleep_functions,
+                logger and noprogress entries
+        """
+        self.log_quiet = quiet
+        self.verbose = verbose
+        return {
+            'progress_hooks': [self.progress_hook],
+            'postprocessor_hooks': [self.postprocessor_hook],
+            'retry_sleep_functions': self.retry_sleep_functions,
+            'logger': self,
+            # The throttled status line replaces yt-dlp's per-chunk progress output
+            'noprogress': True,
+        }
+
+    def _count_retry(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+        return 0
+
+    def progress_hook(self, d):
+        """Record a yt-dlp progress callback"""
+        now = time.monotonic()
+        filename = d.get('filename') or d.get('tmpfilename') or '?'
+        with self._lock:
+            self.callbacks += 1
+            track = self.tracks.get(filename)
+            if track is None:
+                track = self.tracks[filename] = _Track(now)
+            track.bytes = d.get('downloaded_bytes') or track.bytes
+
+            fragment = d.get('fragment_index')
+            if fragment is not None and fragment != track.fragment:
+                if track.fragment is not None:
+                    self.fragment_latency.observe(now - track.fragment_at)
+                track.fragment = fragment
+                track.fragment_at = now
+
+            if d.get('status') == 'finished':
+                track.finished = now
+            elif d.get('status') == 'error':
+                self.errors += 1
+            render = d.get('status') != 'downloading' or now - self._last_render >= self.refresh_interval
+            if render:
+                self._last_render = now
+        if render:
+            self._render(filename, d.get('status'), now)
+
+    def postprocessor_hook(self, d):
+        """Record a yt-dlp post-processor callback"""
+        now = time.monotonic()
+        key = (d.get('postprocessor'), (d.get('info_dict') or {}).get('filepath'))
+        with self._lock:
+            if d.get('status') == 'started':
+                self._pp_started[key] = now
+            elif d.get('status') == 'finished' and key in self._pp_started:
+                durations = self.postprocessors.setdefault(d.get('postprocessor'), [])
+                durations.append(now - self._pp_started.pop(key))
+
+    # yt-dlp logger interface; info messages arrive through debug as well
+    def debug(self, msg):
+        if msg.startswith('[debug] '):
+            if self.verbose and not self.quiet:
+                print(msg, file=self.stream)
+            return
+        self.info(msg)
+
+    def info(self, msg):
+        if not (self.quiet or self.log_quiet):
+            print(msg, file=self.stream)
+
+    def warning(self, msg):
+        if not self.quiet:
+            print(f"WARNING: {msg}" if not msg.startswith('WARNING') else msg, file=self.stream)
+
+    def error(self, msg):
+        with self._lock:
+            self.errors += 1
+        print(msg, file=self.stream)
+
+    def _render(self, filename, status, now):
+        if self.quiet:
+            return
+        with self._lock:
+            active = sum(1 for t in self.tracks.values() if t.finished is None)
+            done = len(self.tracks) - active
+            rate = self._total_bytes() / max(now - self.started, 1e-9)
+        if status == 'finished':
+            print(f"\rFinished: {filename}", file=self.stream)
+        else:
+            print(f"\r{active} downloading, {done} finished, {rate / 1e6:.2f} MB/s",
+                  end='', file=self.stream, flush=True)
+
+    def _total_bytes(self):
+        return sum(t.bytes for t in self.tracks.values())
+
+    def summary(self):
+        """
+        Return the collected metrics
+
+        Returns:
+            dict: JSON-serializable summary of the run
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            total_bytes = self._total_bytes()
+            return {
+                'elapsed': elapsed,
+                'bytes': total_bytes,
+                'bytes_per_sec': total_bytes / elapsed if elapsed > 0 else 0.0,
+                'callbacks': self.callbacks,
+                'retries': self.retries,
+                'fragment_retries': self.fragment_retries,
+                'errors': self.errors,
+                'fragment_latency': self.fragment_latency.to_dict(),
+                'postprocessors': {
+                    name: {'count': len(d), 'total': sum(d), 'max': max(d)}
+                    for name, d in self.postprocessors.items()
+                },
+                'tracks': {
+                    name: {
+                        'bytes': t.bytes,
+                        'wall_time': (t.finished or time.monotonic()) - t.started,
+                        'finished': t.finished is not None,
+                    }
+                    for name, t in self.tracks.items()
+                },
+            }
+
+    def write_json(self, path):
+        """
+        Write the summary to a JSON file
+
+        Args:
+            path (str): Destination file
+        """
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def prometheus_text(self):
+        """
+        Render the summary in the Prometheus text exposition format
+
+        Returns:
+            str: Metrics text
+        """
+        s = self.summary()
+        lines = [
+            '# TYPE ytdl_downloaded_bytes_total counter',
+            f"ytdl_downloaded_bytes_total {s['bytes']}",
+            '# TYPE ytdl_download_bytes_per_second gauge',
+            f"ytdl_download_bytes_per_second {s['bytes_per_sec']:.3f}",
+            '# TYPE ytdl_retries_total counter',
+            f'ytdl_retries_total{{kind="request"}} {s["retries"]}',
+            f'ytdl_retries_total{{kind="fragment"}} {s["fragment_retries"]}',
+            '# TYPE ytdl_errors_total counter',
+            f"ytdl_errors_total {s['errors']}",
+            '# TYPE ytdl_fragment_latency_seconds histogram',
+        ]
+        latency = s['fragment_latency']
+        for bound, count in latency['buckets'].items():
+            lines.append(f'ytdl_fragment_latency_seconds_bucket{{le="{bound}"}} {count}')
+        lines.append(f"ytdl_fragment_latency_seconds_sum {latency['sum']:.6f}")
+        lines.append(f"ytdl_fragment_latency_seconds_count {latency['count']}")
+        lines.append('# TYPE ytdl_postprocessor_seconds_total counter')
+        for name, pp in s['postprocessors'].items():
+            lines.append(f'ytdl_postprocessor_seconds_total{{postprocessor="{name}"}} {pp["total"]:.6f}')
+        lines.append('# TYPE ytdl_track_wall_seconds gauge')
+        for name, track in s['tracks'].items():
+            escaped = name.replace('\\', '\\\\').replace('"', '\\"')
+            lines.append(f'ytdl_track_wall_seconds{{file="{escaped}"}} {track["wall_time"]:.3f}')
+        return '\n'.join(lines) + '\n'
+
+    def print_summary(self):
+        """Print a short end-of-run report"""
+        s = self.summary()
+        finished = sum(1 for t in s['tracks'].values() if t['finished'])
+        print(f"\nDownloaded {s['bytes'] / 1e6:.1f} MB in {finished} files "
+              f"({s['bytes_per_sec'] / 1e6:.2f} MB/s, {s['retries'] + s['fragment_retries']} retries, "
+              f"{s['errors']} errors)", file=self.stream)
+        for name, pp in s['postprocessors'].items():
+            print(f"  {name}: {pp['count']} runs, {pp['total']:.1f}s total", file=self.stream)
@@ -1,41 +1,70 @@
-import yt_dlp
+import argparse
 import os
 from pathlib import Path
+from ytpool import download_concurrently, entry_url, iter_playlist, shared_ydls
+from download_archive import DownloadArchive
+from bandwidth import add_throttle
+from ytmetrics import DownloadMetrics
 
-def download_videos(url, output_dir='downloads'):
+def download_videos(url, output_dir='downloads', workers=1, archive=None, stream=False,
+                    scheduler=None, metrics=None, store=None):
     """
     Download video(s) from YouTube URL (supports both single videos and playlists)
     
     Args:
         url (str): YouTube URL (video or playlist)
         output_dir (str): Directory to save downloaded video files
+        workers (int): Number of playlist videos to download in parallel
+        archive (DownloadArchive): Index of finished downloads; videos already
+            in it are skipped without being extracted
+        stream (bool): Start downloading while the playlist is still being
+            enumerated instead of resolving every entry first
+        scheduler (BandwidthScheduler): Shared bandwidth caps to download under
+        metrics (DownloadMetrics): Collector for progress and timing metrics
+        store (MediaStore): Shared store of finished downloads; videos already
+            in it are linked into output_dir instead of being downloaded
     """
     # Create output directory if it doesn't exist
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
     
+    if metrics is None:
+        metrics = DownloadMetrics()
+    
     # Configure yt-dlp options
     ydl_opts = {
         'format': 'bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-        'outtmpl': str(output_path / '%(title)s.%(ext)s'),
+        'outtmpl': str(output_path / '%(title)s [%(id)s].%(ext)s'),
         'ignoreerrors': True,
         'quiet': False,
         'merge_output_format': 'mp4',
         'postprocessors': [{
             'key': 'FFmpegMetadata',
         }],
-        # Show download progress
-        'progress_hooks': [
-            lambda d: print(
-                f"\rDownloading: {d['filename']} - "
-                f"{d.get('_percent_str', '').strip() if '_percent_str' in d else d['status']}", 
-                end='\n' if d['status'] == 'finished' else ''
-            )
-        ],
+        # Show download progress and collect metrics
+        **metrics.ydl_options(),
     }
+    if archive is not None or store is not None:
+        # Only list playlist entries, so archived or stored videos are never resolved
+        ydl_opts['extract_flat'] = 'in_playlist'
+    if scheduler is not None:
+        ydl_opts = add_throttle(ydl_opts, scheduler.job(url))
+    variant = store.variant_for(ydl_opts) if store is not None else None
     
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        if stream:
+            with shared_ydls.borrow(ydl_opts) as ydl:
+                print("Streaming video information...")
+                entries = iter_playlist(ydl, url, on_total=lambda n: print(f"\nFound {n} videos"))
+                if store is not None:
+                    entries = store.missing(entries, variant, output_path)
+                video_urls = (entry_url(entry) for entry in entries
+                              if archive is None or entry.get('id') not in archive)
+                download_concurrently(filter(None, video_urls), ydl_opts, workers,
+                                      archive=archive, store=store)
+            return
+        
+        with shared_ydls.borrow(ydl_opts) as ydl:
             # Extract video/playlist info
             print("Extracting video information...")
             result = ydl.extract_info(url, download=False)
@@ -51,13 +80,33 @@ def download_videos(url, output_dir='downloads'):
                 total_videos = len(videos)
                 print(f"\nFound {total_videos} videos in playlist: {result.get('title', 'Unknown Playlist')}")
                 
+                if archive is not None:
+                    videos = [entry for entry in videos if entry.get('id') not in archive]
+                    total_videos = len(videos)
+                    print(f"{total_videos} of them are not in the download archive yet")
+                
+                if store is not None:
+                    videos = list(store.missing(videos, variant, output_path))
+                    print(f"Linked {total_videos - len(videos)} videos from the media store")
+                    total_videos = len(videos)
+                
+                if workers > 1:
+                    video_urls = [entry.get('webpage_url') or entry.get('url') for entry in videos]
+                    download_concurrently(filter(None, video_urls), ydl_opts, workers,
+                                          archive=archive, store=store)
+                    return
+                
                 for index, entry in enumerate(videos, 1):
                     print(f"\nProcessing video {index}/{total_videos}")
                     print(f"Title: {entry.get('title', 'Unknown')}")
                     try:
                         video_url = entry.get('webpage_url') or entry.get('url')
                         if video_url:
-                            ydl.download([video_url])
+                            info = ydl.extract_info(video_url, download=True)
+                            if info and store is not None:
+                                store.adopt_info(ydl, info, variant)
+                            if info and archive is not None:
+                                archive.record_info(ydl, info)
                         else:
                             print(f"Skipping video {index}: Could not get video URL")
                     except Exception as e:
@@ -65,19 +114,37 @@ def download_videos(url, output_dir='downloads'):
                         continue
             else:
                 # This is a single video
+                if archive is not None and result.get('id') in archive:
+                    print(f"\nAlready downloaded: {result.get('title', 'Unknown')}")
+                    return
+                if store is not None and store.link(result.get('id'), variant, output_path):
+                    print(f"\nLinked from the media store: {result.get('title', 'Unknown')}")
+                    return
                 print(f"\nDownloading single video: {result.get('title', 'Unknown')}")
                 try:
-                    ydl.download([url])
+                    info = ydl.extract_info(url, download=True)
+                    if info and store is not None:
+                        store.adopt_info(ydl, info, variant)
+                    if info and archive is not None:
+                        archive.record_info(ydl, info)
                 except Exception as e:
                     print(f"Error downloading video: {str(e)}")
                 
     except Exception as e:
         print(f"\nAn error occurred: {str(e)}")
         print("Make sure the URL is correct and the video/playlist is accessible.")
+    finally:
+        metrics.print_summary()
 
 def main():
+    parser = argparse.ArgumentParser(description="Download a YouTube video or playlist in the best available quality")
+    parser.add_argument('url', nargs='?', help="Video or playlist URL (prompted for when omitted)")
+    parser.add_argument('--output-dir', help="Directory to save the videos")
+    parser.add_argument('--workers', type=int, help="Number of parallel downloads")
+    args = parser.parse_args()
+    
     # Get video/playlist URL
-    url = input("Enter YouTube URL (video or playlist): ").strip()
+    url = (args.url or input("Enter YouTube URL (video or playlist): ")).strip()
     
     # Basic URL validation
     if not url.startswith(('http://', 'https://')):
@@ -85,11 +152,17 @@ def main():
         return
     
     # Get output directory
-    output_dir = input("Enter output directory [default: downloads]: ").strip() or 'downloads'
+    output_dir = args.output_dir or input("Enter output directory [default: downloads]: ").strip() or 'downloads'
+    
+    # Get number of parallel downloads
+    workers = args.workers or int(input("Enter number of parallel downloads [default: 1]: ").strip() or 1)
     
     # Download video(s)
     print(f"\nDownloading to {output_dir} in best available quality...")
-    download_videos(url, output_dir)
+    metrics = DownloadMetrics()
+    with DownloadArchive(Path(output_dir) / '.download_archive.sqlite3') as archive:
+        download_videos(url, output_dir, workers, archive, metrics=metrics)
+    metrics.write_json(Path(output_dir) / '.download_metrics.json')
     print("\nProcess complete!")
 
 if __name__ == "__main__":
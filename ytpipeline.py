@@ -0,0 +1,180 @@
+import os
+import queue
+import threading
+import time
+
+from ppcache import TranscodeCache, run_chain
+from ytpool import downloaded_filepath, run_pool
+
+
+def transcode(filepath, info, postprocessors, cache_dir=None):
+    """
+    Run yt-dlp post-processors on an already downloaded file
+
+    Meant to run inside a worker process, so it builds its own YoutubeDL.
+    With a cache_dir, every step's output is cached and steps whose output
+    is already cached are skipped (see ppcache.run_chain).
+
+    Args:
+        filepath (str): Downloaded media file
+        info (dict): Sanitized info dict of the video
+        postprocessors (list): yt-dlp post-processor definitions
+        cache_dir (str): Transcode cache directory, or None to always run ffmpeg
+
+    Returns:
+        tuple: (final file path, seconds spent transcoding)
+    """
+    start = time.perf_counter()
+    if cache_dir is not None:
+        with TranscodeCache(cache_dir) as cache:
+            info, _ = run_chain(cache, filepath, info, postprocessors)
+        return info.get('filepath', filepath), time.perf_counter() - start
+
+    import yt_dlp
+
+    with yt_dlp.YoutubeDL({'postprocessors': postprocessors, 'quiet': True}) as ydl:
+        info = ydl.post_process(filepath, info)
+    return info.get('filepath', filepath), time.perf_counter() - start
+
+
+def download_pipelined(video_urls, ydl_opts, fetch_workers=2, transcode_workers=None,
+                       queue_size=None, ydl_class=None, transcode_func=transcode, executor=None,
+                       cache_dir=None, archive=None, store=None, variant=None):
+    """
+    Download videos and post-process them as two overlapping stages
+
+    Network fetchers download without post-processors and feed a bounded
+    queue; a process pool sized to the CPU count drains it and runs the
+    transcodes. When transcoding falls behind the queue fills up and the
+    fetchers block, so downloaded-but-unprocessed files never pile up.
+
+    Args:
+        video_urls (iterable): Video URLs to download
+        ydl_opts (dict): yt-dlp options, including the post-processors to run
+        fetch_workers (int): Number of parallel network fetchers
+        transcode_workers (int): Number of transcode processes (defaults to CPU count)
+        queue_size (int): Files allowed to wait between stages (defaults to transcode_workers)
+        ydl_class (type): YoutubeDL-compatible class (defaults to yt_dlp.YoutubeDL)
+        transcode_func (callable): Called as transcode_func(filepath, info, postprocessors)
+        executor (Executor): Pool for the transcode stage (defaults to a ProcessPoolExecutor)
+        cache_dir (str): Transcode cache directory passed on to transcode_func
+        archive (DownloadArchive): Records every track once its transcode succeeds
+        store (MediaStore): Adopts every track once its transcode succeeds
+        variant (str): Store variant of the tracks (defaults to store.variant_for(ydl_opts))
+
+    Returns:
+        dict: Per-stage timing summary
+    """
+    transcode_workers = transcode_workers or os.cpu_count() or 1
+    postprocessors = list(ydl_opts.get('postprocessors', []))
+    fetch_opts = dict(ydl_opts, ignoreerrors=True)
+    fetch_opts.pop('postprocessors', None)
+    transcode_opts = {'cache_dir': cache_dir} if cache_dir is not None else {}
+    if store is not None and variant is None:
+        variant = store.variant_for(ydl_opts)
+
+    handoff = queue.Queue(maxsize=queue_size or transcode_workers)
+    slots = threading.BoundedSemaphore(transcode_workers)
+    lock = threading.Lock()
+    stats = {'fetch_busy': 0.0, 'fetch_stalled': 0.0, 'transcode_busy': 0.0,
+             'transcoded': 0, 'transcode_failed': 0}
+
+    def fetch(ydl, video_url):
+        start = time.perf_counter()
+        info = ydl.extract_info(video_url, download=True)
+        fetched = time.perf_counter()
+        if info is None:
+            return None
+        filepath = downloaded_filepath(ydl, info)
+        sanitize = getattr(ydl, 'sanitize_info', None)
+        handoff.put((filepath, sanitize(info) if sanitize else info))
+        with lock:
+            stats['fetch_busy'] += fetched - start
+            stats['fetch_stalled'] += time.perf_counter() - fetched
+        return info
+
+    def report(index, video_url, result, error):
+        if error is not None:
+            print(f"Error downloading track {index}: {str(error)}")
+        elif result is None:
+            print(f"Track {index} failed: {video_url}")
+        else:
+            print(f"Fetched track {index}: {result.get('title', video_url)}")
+
+    def finished(info, future):
+        slots.release()
+        try:
+            filepath, seconds = future.result()
+        except Exception as e:
+            print(f"Error post-processing: {str(e)}")
+            with lock:
+                stats['transcode_failed'] += 1
+            return
+        with lock:
+            stats['transcode_busy'] += seconds
+            stats['transcoded'] += 1
+        if info.get('id') and os.path.exists(filepath):
+            try:
+                if store is not None:
+                    store.adopt(info['id'], variant, filepath)
+                if archive is not None:
+                    archive.record(info['id'], filepath)
+            except Exception as e:
+                print(f"Error recording {filepath}: {str(e)}")
+        print(f"Post-processed: {filepath}")
+
+    def dispatch(pool):
+        while True:
+            job = handoff.get()
+            if job is None:
+                break
+            slots.acquire()
+            filepath, info = job
+            future = pool.submit(transcode_func, filepath, info, postprocessors, **transcode_opts)
+            future.add_done_callback(lambda future, info=info: finished(info, future))
+
+    start = time.perf_counter()
+    pool = executor
+    if pool is None:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=transcode_workers)
+    dispatcher = threading.Thread(target=dispatch, args=(pool,), daemon=True)
+    dispatcher.start()
+    try:
+        summary = run_pool(video_urls, fetch, fetch_opts, fetch_workers, ydl_class, report)
+    finally:
+        handoff.put(None)
+        dispatcher.join()
+        pool.shutdown(wait=True)
+    wall = time.perf_counter() - start
+
+    summary.update(stats)
+    summary['elapsed'] = wall
+    summary['fetch_utilization'] = stats['fetch_busy'] / (wall * fetch_workers) if wall else 0.0
+    summary['transcode_utilization'] = stats['transcode_busy'] / (wall * transcode_workers) if wall else 0.0
+    print_stage_summary(summary, fetch_workers, transcode_workers)
+    return summary
+
+
+def print_stage_summary(summary, fetch_workers, transcode_workers):
+    """
+    Print per-stage timings and name the stage that limited throughput
+
+    Args:
+        summary (dict): Result of download_pipelined
+        fetch_workers (int): Number of fetcher threads used
+        transcode_workers (int): Number of transcode processes used
+    """
+    print("\n=== Pipeline Summary ===")
+    print(f"Wall time: {summary['elapsed']:.1f}s")
+    print(f"Fetch     ({fetch_workers} workers): {summary['fetch_busy']:.1f}s busy, "
+          f"{summary['fetch_stalled']:.1f}s blocked on full queue, "
+          f"{summary['fetch_utilization'] * 100:.0f}% utilized")
+    print(f"Transcode ({transcode_workers} workers): {summary['transcode_busy']:.1f}s busy, "
+          f"{summary['transcode_utilization'] * 100:.0f}% utilized")
+    print(f"Tracks: {summary['succeeded']}/{summary['total']} fetched, "
+          f"{summary['transcoded']} post-processed, {summary['transcode_failed']} failed")
+    if summary['fetch_stalled'] > summary['fetch_busy'] * 0.1:
+        print("Bottleneck: transcode stage (fetchers were waiting on backpressure)")
+    else:
+        print("Bottleneck: fetch stage")
@@ -0,0 +1,340 @@
+import atexit
+import contextlib
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+
+MAX_REDIRECTS = 5
+
+
+def _default_ydl_class():
+    import yt_dlp
+    return yt_dlp.YoutubeDL
+
+
+def options_key(ydl_opts):
+    """
+    Return a hashable key for a yt-dlp option set
+
+    Plain values are compared by content; objects such as loggers or
+    callables are compared by identity.
+    """
+    return json.dumps(ydl_opts, sort_keys=True, default=lambda value: f"<{type(value).__name__} {id(value)}>")
+
+
+class YoutubeDLCache:
+    """
+    Configured YoutubeDL instances cached by option set
+
+    Building a YoutubeDL loads extractors, cookies and post-processors, and
+    extractors keep per-instance caches (e.g. YouTube player code) that are
+    lost with the instance. Repeated calls in one process with the same
+    options get the same instance back instead. progress_hooks,
+    postprocessor_hooks, logger and retry_sleep_functions are not part of
+    the key: the cached instance forwards to whatever the latest call
+    passed. YoutubeDL is not
+    thread-safe, so every thread gets its own instances, at most max_size
+    of them, least recently used evicted first. Instances of threads that
+    have exited are closed the next time an instance is built.
+    """
+
+    PER_CALL = ('progress_hooks', 'postprocessor_hooks', 'logger', 'retry_sleep_functions')
+
+    def __init__(self, ydl_class=None, max_size=8):
+        self.ydl_class = ydl_class
+        self.max_size = max_size
+        self.created = 0
+        self.reused = 0
+        self._instances = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ydl_opts):
+        """
+        Return a ready YoutubeDL for ydl_opts, building it on first use
+
+        Args:
+            ydl_opts (dict): yt-dlp options
+
+        Returns:
+            YoutubeDL: Instance owned by the cache; do not close it
+        """
+        base = {k: v for k, v in ydl_opts.items() if k not in self.PER_CALL}
+        thread = threading.get_ident()
+        key = (thread, options_key(base))
+        evicted = []
+        with self._lock:
+            entry = self._instances.get(key)
+            if entry is not None:
+                self._instances.move_to_end(key)
+                self.reused += 1
+        if entry is None:
+            hooks = {'progress_hooks': [], 'postprocessor_hooks': []}
+            opts = dict(base,
+                        progress_hooks=[lambda d: [hook(d) for hook in hooks['progress_hooks']]],
+                        postprocessor_hooks=[lambda d: [hook(d) for hook in hooks['postprocessor_hooks']]])
+            ydl_class = self.ydl_class or _default_ydl_class()
+            entry = (ydl_class(opts).__enter__(), hooks)
+            with self._lock:
+                self._instances[key] = entry
+                self.created += 1
+                # Only this thread's instances and those of exited threads
+                # can be evicted safely
+                own = [k for k in self._instances if k[0] == thread]
+                live = {t.ident for t in threading.enumerate()}
+                dead = [k for k in self._instances if k[0] not in live]
+                for old in own[:max(0, len(own) - self.max_size)] + dead:
+                    evicted.append(self._instances.pop(old)[0])
+        for ydl in evicted:
+            ydl.__exit__(None, None, None)
+
+        ydl, hooks = entry
+        for name in hooks:
+            hooks[name][:] = ydl_opts.get(name) or []
+        # yt-dlp looks these up on every message and every retry
+        ydl.params['logger'] = ydl_opts.get('logger')
+        ydl.params['retry_sleep_functions'] = ydl_opts.get('retry_sleep_functions') or {}
+        return ydl
+
+    @contextlib.contextmanager
+    def borrow(self, ydl_opts):
+        """Use a cached instance in a with block; it stays open afterwards"""
+        yield self.get(ydl_opts)
+
+    def close(self):
+        """Close every cached instance"""
+        with self._lock:
+            instances = [ydl for ydl, _ in self._instances.values()]
+            self._instances.clear()
+        for ydl in instances:
+            ydl.__exit__(None, None, None)
+
+
+shared_ydls = YoutubeDLCache()
+# Closing saves the cookie jar and releases the HTTP handlers
+atexit.register(shared_ydls.close)
+
+
+def downloaded_filepath(ydl, info):
+    """
+    Return the path of the file yt-dlp wrote for info
+
+    Args:
+        ydl (YoutubeDL): Instance that performed the download
+        info (dict): Info dict returned by extract_info(download=True)
+
+    Returns:
+        str: Path of the downloaded media file
+    """
+    for download in info.get('requested_downloads') or []:
+        if download.get('filepath'):
+            return download['filepath']
+    return info.get('filepath') or ydl.prepare_filename(info)
+
+
+def iter_playlist(ydl, url, on_total=None):
+    """
+    Yield playlist entries one at a time as the extractor resolves them
+
+    The playlist is extracted with process=False, so entries come straight
+    from the extractor's (usually paged) generator instead of being resolved
+    up front. url and url_transparent results are followed first. A single
+    video yields one entry.
+
+    Args:
+        ydl (YoutubeDL): Instance used for enumeration
+        url (str): Playlist or video URL
+        on_total (callable): Called with the entry count as soon as it is known
+
+    Yields:
+        dict: Unresolved entry with at least a url or webpage_url
+    """
+    info = ydl.extract_info(url, download=False, process=False)
+    # Follow redirects (watch?v=...&list=..., playlist -> tab) to the real playlist
+    for _ in range(MAX_REDIRECTS):
+        if not info or info.get('_type') not in ('url', 'url_transparent') or not info.get('url'):
+            break
+        url = info['url']
+        info = ydl.extract_info(url, download=False, process=False)
+    if not info:
+        return
+    if 'entries' not in info:
+        if on_total:
+            on_total(1)
+        yield dict(info, url=url)
+        return
+
+    total = info.get('playlist_count')
+    if total is not None and on_total:
+        on_total(total)
+    count = 0
+    for entry in info['entries']:
+        if entry:
+            count += 1
+            yield entry
+    if total is None and on_total:
+        on_total(count)
+
+
+def entry_url(entry):
+    """Return the URL to download for a playlist entry"""
+    return entry.get('webpage_url') or entry.get('url')
+
+
+def fetch_track(ydl, video_url):
+    """
+    Download a single track and return its info dict
+
+    Args:
+        ydl (YoutubeDL): Instance owned by the calling worker
+        video_url (str): URL of the video to download
+
+    Returns:
+        dict: Info dict of the downloaded video, or None on failure
+    """
+    return ydl.extract_info(video_url, download=True)
+
+
+def run_pool(items, task, ydl_opts, workers=4, ydl_class=None, report=None):
+    """
+    Run task(ydl, item) over items on a bounded pool of worker threads
+
+    Every worker owns its own YoutubeDL instance for its whole lifetime, so
+    extractor state is never shared between threads. Items are consumed
+    lazily and at most three per worker are in flight - queued, running or
+    finished but waiting for an earlier item to be reported - which keeps
+    memory flat for long (or streaming) inputs even behind a slow item.
+    Results are handed to report in input order regardless of completion
+    order.
+
+    Args:
+        items (iterable): Work items, typically video URLs
+        task (callable): Called as task(ydl, item); its return value is the result
+        ydl_opts (dict): Options used to build each worker's YoutubeDL
+        workers (int): Number of worker threads
+        ydl_class (type): YoutubeDL-compatible class (defaults to yt_dlp.YoutubeDL)
+        report (callable): Called as report(index, item, result, error) in order
+
+    Returns:
+        dict: Summary with total, succeeded, failed and elapsed seconds
+    """
+    ydl_class = ydl_class or _default_ydl_class()
+    workers = max(1, int(workers))
+    jobs = queue.Queue(maxsize=workers * 2)
+    # Released by flush, so finished results cannot pile up behind a slow item
+    in_flight = threading.Semaphore(workers * 3)
+    done = {}
+    lock = threading.Lock()
+    state = {'next': 1, 'succeeded': 0, 'failed': 0}
+
+    def flush():
+        # Emit every finished result that is next in line
+        while state['next'] in done:
+            index = state['next']
+            item, result, error = done.pop(index)
+            if error is None and result is not None:
+                state['succeeded'] += 1
+            else:
+                state['failed'] += 1
+            state['next'] += 1
+            in_flight.release()
+            if report:
+                try:
+                    report(index, item, result, error)
+                except Exception as e:
+                    print(f"Error reporting item {index}: {str(e)}")
+
+    def worker():
+        # A worker that cannot build its YoutubeDL still drains the queue,
+        # failing its items, so the producer never blocks on a dead pool
+        ydl, setup_error = None, None
+        try:
+            ydl = ydl_class(dict(ydl_opts)).__enter__()
+        except Exception as e:
+            setup_error = e
+        try:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    break
+                index, item = job
+                result, error = None, setup_error
+                if ydl is not None:
+                    try:
+                        result = task(ydl, item)
+                    except Exception as e:
+                        error = e
+                with lock:
+                    done[index] = (item, result, error)
+                    flush()
+        finally:
+            if ydl is not None:
+                ydl.__exit__(None, None, None)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    total = 0
+    try:
+        for total, item in enumerate(items, 1):
+            in_flight.acquire()
+            jobs.put((total, item))
+    finally:
+        for _ in threads:
+            jobs.put(None)
+        for thread in threads:
+            thread.join()
+
+    return {
+        'total': total,
+        'succeeded': state['succeeded'],
+        'failed': state['failed'],
+        'elapsed': time.perf_counter() - start,
+    }
+
+
+def download_concurrently(video_urls, ydl_opts, workers=4, ydl_class=None, archive=None, store=None):
+    """
+    Download many videos in parallel, printing progress in playlist order
+
+    Args:
+        video_urls (iterable): Video URLs to download
+        ydl_opts (dict): yt-dlp options shared by every worker
+        workers (int): Number of parallel downloads
+        ydl_class (type): YoutubeDL-compatible class (defaults to yt_dlp.YoutubeDL)
+        archive (DownloadArchive): Records every completed download when given
+        store (MediaStore): Moves every completed download into the store
+            and links it back in place when given
+
+    Returns:
+        dict: Summary with total, succeeded, failed, elapsed and throughput
+    """
+    ydl_opts = dict(ydl_opts, ignoreerrors=True)
+    variant = store.variant_for(ydl_opts) if store is not None else None
+
+    def report(index, video_url, result, error):
+        if error is not None:
+            print(f"Error downloading track {index}: {str(error)}")
+        elif result is None:
+            print(f"Track {index} failed: {video_url}")
+        else:
+            print(f"Finished track {index}: {result.get('title', video_url)}")
+
+    def task(ydl, video_url):
+        info = fetch_track(ydl, video_url)
+        if info is not None and store is not None:
+            store.adopt_info(ydl, info, variant)
+        if info is not None and archive is not None:
+            archive.record_info(ydl, info)
+        return info
+
+    summary = run_pool(video_urls, task, ydl_opts, workers, ydl_class, report)
+    elapsed = summary['elapsed']
+    summary['throughput'] = summary['total'] / elapsed if elapsed > 0 else 0.0
+    print(f"\nDownloaded {summary['succeeded']}/{summary['total']} tracks "
+          f"with {workers} workers in {elapsed:.1f}s "
+          f"({summary['throughput']:.2f} tracks/s)")
+    return summary
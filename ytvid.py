@@ -1,13 +1,20 @@
+import argparse
+import os
 
-from yt_dlp import YoutubeDL
+from ytpipeline import download_pipelined
+from ytpool import shared_ydls
+from rangedl import download_ranged
+from bandwidth import add_throttle
+from ytmetrics import DownloadMetrics
 
-def configure_yt_dlp(output_path='downloads', 
-                    format='bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
-                    subtitle_languages=['en'],
-                    write_thumbnail=True,
-                    write_description=True):
+def build_ydl_opts(output_path='downloads', 
+                   format='bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best',
+                   subtitle_languages=['en'],
+                   write_thumbnail=True,
+                   write_description=True,
+                   metrics=None):
     """
-    Configure yt-dlp options for video downloads
+    Build the yt-dlp options dict used for video downloads
     
     Args:
         output_path (str): Directory to save downloaded files
@@ -15,14 +22,17 @@ def configure_yt_dlp(output_path='downloads',
         subtitle_languages (list): List of subtitle language codes
         write_thumbnail (bool): Whether to download video thumbnail
         write_description (bool): Whether to download video description
+        metrics (DownloadMetrics): Collector for progress and timing metrics
         
     Returns:
-        YoutubeDL: Configured YoutubeDL instance
+        dict: yt-dlp options
     """
+    if metrics is None:
+        metrics = DownloadMetrics()
     
     ydl_opts = {
         # Output options
-        'outtmpl': f'{output_path}/%(title)s.%(ext)s',
+        'outtmpl': f'{output_path}/%(title)s [%(id)s].%(ext)s',
         'paths': {'home': output_path},
         
         # Video format options
@@ -54,35 +64,188 @@ def configure_yt_dlp(output_path='downloads',
         ],
         
         # Progress options
-        'progress_hooks': [lambda d: print(f'Downloading: {d["filename"]} - {d["status"]}')],
+        **metrics.ydl_options(verbose=True),
         'verbose': True,
     }
     
-    return YoutubeDL(ydl_opts)
+    return ydl_opts
+
+def configure_yt_dlp(**kwargs):
+    """
+    Configure yt-dlp options for video downloads
+    
+    Args:
+        **kwargs: Options passed to build_ydl_opts
+        
+    Returns:
+        YoutubeDL: Configured YoutubeDL instance
+    """
+    from yt_dlp import YoutubeDL
+    
+    return YoutubeDL(build_ydl_opts(**kwargs))
+
+def download_chunked(ydl, url, workers=4, chunk_size=None, job=None, info=None):
+    """
+    Download a single direct-HTTP format over parallel byte ranges
+    
+    The file is written in place and checkpointed chunk by chunk (see
+    rangedl.download_ranged), so re-running after a crash only fetches the
+    missing ranges. The info JSON, description, subtitles and thumbnail are
+    written through yt-dlp first, exactly as for a normal download, and the
+    configured post-processors then run as usual.
+    
+    Args:
+        ydl (YoutubeDL): Configured YoutubeDL instance
+        url (str): Video URL to download
+        workers (int): Number of parallel range requests
+        chunk_size (int): Bytes per range request (defaults to rangedl's)
+        job (JobThrottle): Bandwidth throttle the range requests are charged to
+        info (dict): Result of extract_info(url, process=False) to reuse
+            instead of extracting again
+        
+    Returns:
+        dict: Processed info dict, or None if the selected format is not a
+            single direct-HTTP file (e.g. separate video and audio streams)
+    """
+    if info is not None:
+        info = ydl.process_ie_result(dict(info), download=False)
+    else:
+        info = ydl.extract_info(url, download=False)
+    if info.get('requested_formats') or info.get('protocol') not in ('http', 'https') or not info.get('url'):
+        return None
+    
+    # process_info with skip_download writes every side file but the media
+    skip_download = ydl.params.get('skip_download')
+    ydl.params['skip_download'] = True
+    try:
+        ydl.process_info(info)
+    finally:
+        ydl.params['skip_download'] = skip_download
+    if info.get('__write_download_archive') == 'ignore':
+        # Rejected by the configured filters (match_filter, archive, ...)
+        return info
+    
+    filepath = info.get('_filename') or ydl.prepare_filename(info)
+    os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
+    hooks = ydl.params.get('progress_hooks') or []
+    
+    def progress(d):
+        for hook in hooks:
+            hook(dict(d, info_dict=info))
+    
+    options = {'chunk_size': chunk_size} if chunk_size else {}
+    download_ranged(info['url'], filepath, workers, job=job, headers=info.get('http_headers'),
+                    progress=progress, **options)
+    return ydl.post_process(filepath, info)
 
 # Example usage
-def download_video(url, **kwargs):
+def download_video(url, scheduler=None, metrics=None, chunked=False, chunk_workers=4, store=None, **kwargs):
     """
     Download a video using configured yt-dlp
     
+    Calls with the same configuration reuse one cached YoutubeDL instance.
+    
     Args:
         url (str): Video URL to download
+        scheduler (BandwidthScheduler): Shared bandwidth caps to download under
+        metrics (DownloadMetrics): Collector for progress and timing metrics
+        chunked (bool): Fetch single-file HTTP formats over parallel, resumable
+            byte ranges; other formats fall back to a normal download
+        chunk_workers (int): Number of parallel range requests when chunked
+        store (MediaStore): Shared store of finished downloads; a video already
+            in it is linked into output_path instead of being downloaded
         **kwargs: Additional configuration options to pass to configure_yt_dlp
     """
+    metrics = metrics or DownloadMetrics()
     try:
-        with configure_yt_dlp(**kwargs) as ydl:
-            ydl.download([url])
+        ydl_opts = build_ydl_opts(metrics=metrics, **kwargs)
+        job = scheduler.job(url) if scheduler is not None else None
+        variant = store.variant_for(ydl_opts) if store is not None else None
+        info = None
+        if store is not None:
+            # An unprocessed extraction is enough to learn the ID and is reused below
+            with shared_ydls.borrow(ydl_opts) as ydl:
+                info = ydl.extract_info(url, download=False, process=False)
+            output_path = kwargs.get('output_path', 'downloads')
+            if info and info.get('id') and store.link(info['id'], variant, output_path):
+                print(f"Linked {info.get('title', info['id'])} from the media store")
+                return
+        
+        result = None
+        if chunked:
+            # Range requests are charged to the job directly, not through a hook
+            with shared_ydls.borrow(ydl_opts) as ydl:
+                result = download_chunked(ydl, url, chunk_workers, job=job, info=info)
+            if result is None:
+                print("Format is not a single HTTP file; downloading normally")
+        if result is None:
+            with shared_ydls.borrow(add_throttle(ydl_opts, job)) as ydl:
+                if info is not None:
+                    result = ydl.process_ie_result(info, download=True)
+                else:
+                    result = ydl.extract_info(url, download=True)
+        if result and store is not None:
+            with shared_ydls.borrow(ydl_opts) as ydl:
+                store.adopt_info(ydl, result, variant)
     except Exception as e:
         print(f"Error downloading video: {str(e)}")
+    finally:
+        metrics.print_summary()
 
-# Example calls
-if __name__ == "__main__":
-    # Basic usage
-    download_video('https://www.youtube.com/watch?v=example')
+def download_videos_pipelined(urls, fetch_workers=2, transcode_workers=None, scheduler=None,
+                              transcode_cache=None, **kwargs):
+    """
+    Download several videos, overlapping network fetches with ffmpeg post-processing
     
-    # Custom configuration
-    download_video('https://www.youtube.com/watch?v=example',
-                  output_path='custom_downloads',
-                  format='bestvideo[height<=1080]+bestaudio/best',
-                  subtitle_languages=['en', 'es'],
-                  write_thumbnail=False)
\ No newline at end of file
+    Args:
+        urls (list): Video URLs to download
+        fetch_workers (int): Number of parallel network fetchers
+        transcode_workers (int): Number of post-processing processes (defaults to CPU count)
+        scheduler (BandwidthScheduler): Shared bandwidth caps to download under
+        transcode_cache (str): Directory caching post-processor outputs, so
+            re-runs skip every ffmpeg step whose inputs did not change
+        **kwargs: Additional configuration options to pass to build_ydl_opts
+        
+    Returns:
+        dict: Per-stage timing summary
+    """
+    ydl_opts = build_ydl_opts(**kwargs)
+    if scheduler is not None:
+        ydl_opts = add_throttle(ydl_opts, scheduler.job('pipeline'))
+    return download_pipelined(urls, ydl_opts, fetch_workers, transcode_workers, cache_dir=transcode_cache)
+
+def main():
+    parser = argparse.ArgumentParser(description="Download videos with subtitles, thumbnail and metadata")
+    parser.add_argument('urls', nargs='+', help="Video URLs")
+    parser.add_argument('--output-path', default='downloads')
+    parser.add_argument('--format', default='bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best')
+    parser.add_argument('--subs', nargs='+', default=['en'], help="Subtitle language codes")
+    parser.add_argument('--no-thumbnail', action='store_true')
+    parser.add_argument('--chunked', action='store_true',
+                        help="Fetch single-file HTTP formats over parallel, resumable byte ranges")
+    parser.add_argument('--store', help="Media store directory shared with other downloads")
+    args = parser.parse_args()
+    
+    store = None
+    if args.store:
+        from mediastore import MediaStore
+        store = MediaStore(args.store)
+    # One metrics collector keeps the cached YoutubeDL shared between URLs
+    metrics = DownloadMetrics()
+    try:
+        for url in args.urls:
+            download_video(url, metrics=metrics, chunked=args.chunked, store=store,
+                           output_path=args.output_path,
+                           format=args.format,
+                           subtitle_languages=args.subs,
+                           write_thumbnail=not args.no_thumbnail)
+    finally:
+        if store is not None:
+            store.close()
+
+# Example calls:
+#   python ytvid.py 'https://www.youtube.com/watch?v=example'
+#   python ytvid.py 'https://www.youtube.com/watch?v=example' --output-path custom_downloads \
+#       --format 'bestvideo[height<=1080]+bestaudio/best' --subs en es --no-thumbnail
+if __name__ == "__main__":
+    main()
\ No newline at end of file